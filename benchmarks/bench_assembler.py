@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Compares assembling large programs in a single streaming pass against parsing, naming and resolving them in turn.
+
+Usage: python -m benchmarks.bench_assembler
+"""
+
+import time
+import tracemalloc
+
+from worm.slim import namer, parser, resolver
+from worm.slim.decoder import decode
+from worm.slim.stream import assemble_lines
+from worm.test.slim.programs import make_code
+from worm.util.validation import Success, flatmap
+
+SIZES = [10000, 100000, 1000000]
+# the passes are only timed up to this size, as they take far longer
+MAX_PASSES_SIZE = 100000
+
+
+def assemble_in_passes(lines):
+    named_val = flatmap(parser.parse(lines), namer.do_name)
+    return flatmap(named_val, lambda named: flatmap(
+        resolver.resolve(named), lambda commands: Success(decode(commands, named.registers, named.labels))))
+
+
+def measure(assemble, lines):
+    """Assembles the lines twice, once for the time taken and once for the peak memory allocated."""
+    start = time.perf_counter()
+    assert isinstance(assemble(lines), Success)
+    seconds = time.perf_counter() - start
+    tracemalloc.start()
+    assemble(lines)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return seconds, peak
+
+
+def main():
+    print(f"{'instructions':>14}{'assembler':>12}{'seconds':>10}{'peak bytes':>16}")
+    for size in SIZES:
+        lines = make_code(size).splitlines()
+        assemblers = [("streaming", assemble_lines)]
+        if size <= MAX_PASSES_SIZE:
+            assemblers.append(("passes", assemble_in_passes))
+        for name, assemble in assemblers:
+            seconds, peak = measure(assemble, lines)
+            print(f"{size:>14}{name:>12}{seconds:>10.3f}{peak:>16,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Compares the consoles on a program echoing many integers back, run on the translated engine.
+
+The standard and buffered consoles read a file of the integers and write to /dev/null, the former with stdin and
+stdout redirected to them. The static and integer consoles pass the values in the same process.
+
+Usage: python -m benchmarks.bench_console
+"""
+
+import os
+import pathlib
+import sys
+import tempfile
+import time
+from typing import Callable, List
+
+from worm.slim.decoder import Program
+from worm.slim.interpreter import assemble_program
+from worm.slim.translator import TranslatedSLIM
+from worm.util.console import BufferedConsole, Console, IntConsole, StaticConsole, StdIoConsole
+from worm.util.validation import Success
+
+VALUES = 1000000
+
+ECHO = pathlib.Path(__file__).parent.parent.joinpath("worm", "test", "slim", "resources", "echo.slim").read_text()
+
+
+def run(program: Program, make_console: Callable[[], Console]) -> float:
+    console = make_console()
+    start = time.perf_counter()
+    TranslatedSLIM(program, console).execute()
+    console.flush()
+    return time.perf_counter() - start
+
+
+def main():
+    program_val = assemble_program(ECHO)
+    assert isinstance(program_val, Success)
+    program = program_val.value
+    values: List[int] = [VALUES] + [(i * 7919) % 2 ** 31 - 2 ** 30 for i in range(VALUES)]
+    lines = [str(value) for value in values]
+
+    with tempfile.TemporaryDirectory() as directory, open(os.devnull, "w") as devnull:
+        path = pathlib.Path(directory).joinpath("input.txt")
+        path.write_text("\n".join(lines) + "\n")
+
+        stdin, stdout = sys.stdin, sys.stdout
+        try:
+            with open(path) as input_file:
+                sys.stdin, sys.stdout = input_file, devnull
+                standard = run(program, lambda: StdIoConsole(""))
+        finally:
+            sys.stdin, sys.stdout = stdin, stdout
+        buffered = run(program, lambda: BufferedConsole.from_file(str(path), devnull))
+        static = run(program, lambda: StaticConsole(lines))
+        native = run(program, lambda: IntConsole(values))
+
+    print(f"echoing {VALUES:,} integers")
+    print(f"{'console':>10}{'seconds':>10}{'values/s':>14}")
+    for name, seconds in [("stdio", standard), ("buffered", buffered), ("static", static), ("int", native)]:
+        print(f"{name:>10}{seconds:>10.3f}{VALUES / seconds:>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
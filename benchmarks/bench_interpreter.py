@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Measures instructions per second of each SLIM execution engine, with a dictionary and with a flat memory.
+
+Usage: python -m benchmarks.bench_interpreter
+"""
+
+import pathlib
+import time
+from typing import List, Tuple
+
+from worm.compiler.compiler import Compiler
+from worm.slim.decoder import Program
+from worm.slim.engine import DecodedSLIM
+from worm.slim.interpreter import ENGINES, assemble_program
+from worm.slim.memory import FlatMemory
+from worm.util.console import StaticConsole
+from worm.util.validation import Success
+
+RESOURCES = pathlib.Path(__file__).parent.parent.joinpath("worm", "test", "slim", "resources")
+
+FIBONACCI = """
+def fib(x):
+    if x <= 1:
+        return x
+    else:
+        return fib(x - 1) + fib(x - 2)
+
+print(int(fib(int(input()))))
+"""
+
+# (name, SLIM code, input); inputs are chosen so that each run executes a few hundred thousand instructions
+PROGRAMS: List[Tuple[str, str, List[str]]] = [
+    ("iterative-factorial.slim", RESOURCES.joinpath("iterative-factorial.slim").read_text(), ["100000"]),
+    ("recursive-factorial.slim", RESOURCES.joinpath("recursive-factorial.slim").read_text(), ["20000"]),
+    ("fibonacci (compiled Worm)", Compiler().compile(FIBONACCI), ["15"]),
+]
+
+REPEATS = 5
+
+
+def load(code: str) -> Program:
+    assembled = assemble_program(code)
+    assert isinstance(assembled, Success)
+    return assembled.value
+
+
+def count_instructions(program: Program, in_lines: List[str]) -> int:
+    machine = DecodedSLIM(program, StaticConsole(in_lines))
+    machine.execute()
+    return machine.steps
+
+
+def run(engine: str, flat: bool, program: Program, in_lines: List[str]) -> Tuple[float, str]:
+    """Runs the program on the engine repeatedly, returning the best time and the number of dispatches if counted."""
+    times = []
+    for _ in range(REPEATS):
+        machine = ENGINES[engine](program, StaticConsole(in_lines), FlatMemory() if flat else {})
+        start = time.perf_counter()
+        machine.execute()
+        times.append(time.perf_counter() - start)
+    dispatches = getattr(machine, "steps", None) if engine in ("decoded", "fused") else None
+    return min(times), "-" if dispatches is None else str(dispatches)
+
+
+def main():
+    print(f"{'program':<28}{'engine':<12}{'memory':<8}{'instructions':>14}{'dispatches':>12}{'seconds':>10}"
+          f"{'instr/s':>14}{'speedup':>9}")
+    for name, code, in_lines in PROGRAMS:
+        program = load(code)
+        steps = count_instructions(program, in_lines)
+        baseline = None
+        for engine in ENGINES:
+            for flat in (False, True):
+                seconds, dispatches = run(engine, flat, program, in_lines)
+                baseline = baseline or seconds
+                memory = "flat" if flat else "dict"
+                print(f"{name:<28}{engine:<12}{memory:<8}{steps:>14}{dispatches:>12}{seconds:>10.3f}"
+                      f"{steps / seconds:>14,.0f}{baseline / seconds:>8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Reports the memory each stage of the SLIM pipeline takes per instruction of a large program.
+
+For each stage, the bytes retained are those allocated for its result and still held once it is built, and the peak
+is the most allocated at once while building it, both over and above the results of the stages before. It then
+reports the bytes per address the memory of a machine holds after a deep recursion, as a dictionary and flat.
+
+Usage: python -m benchmarks.bench_memory
+"""
+
+import pathlib
+import tracemalloc
+
+from worm.slim import namer, objfile, parser, resolver
+from worm.slim.decoder import decode
+from worm.slim.engine import DecodedSLIM
+from worm.slim.fusion import fuse
+from worm.slim.interpreter import assemble_program
+from worm.slim.memory import FlatMemory
+from worm.slim.stream import assemble_lines
+from worm.test.slim.programs import make_code
+from worm.util.console import StaticConsole
+from worm.util.validation import Success
+
+INSTRUCTIONS = 100000
+# the input to the recursive factorial, which pushes two values per level
+DEPTH = 50000
+
+RESOURCES = pathlib.Path(__file__).parent.parent.joinpath("worm", "test", "slim", "resources")
+RECURSIVE_FACTORIAL = RESOURCES.joinpath("recursive-factorial.slim").read_text()
+
+
+def measure(build, *args):
+    """Builds a stage's result from the args, measuring the bytes allocated for it and the peak while building it."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    tracemalloc.reset_peak()
+    result = build(*args)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current - before, peak - before
+
+
+def main():
+    code = make_code(INSTRUCTIONS)
+    lines, _, _ = measure(code.splitlines)
+    parsed, parsed_bytes, parsed_peak = measure(parser.parse, lines)
+    assert isinstance(parsed, Success)
+    named, named_bytes, named_peak = measure(namer.do_name, parsed.value)
+    assert isinstance(named, Success)
+    resolved, resolved_bytes, resolved_peak = measure(resolver.resolve, named.value)
+    assert isinstance(resolved, Success)
+    program, decoded_bytes, decoded_peak = measure(decode, resolved.value, named.value.registers, named.value.labels)
+    size = len(program)
+    # the later stages are measured without the results of the passes held
+    del parsed, named, resolved
+
+    streamed, streamed_bytes, streamed_peak = measure(assemble_lines, lines)
+    assert isinstance(streamed, Success)
+    fused, fused_bytes, fused_peak = measure(fuse, program)
+    dumped, dumped_bytes, dumped_peak = measure(objfile.dumps, program)
+
+    print(f"{size:,} instructions, {len(code) / size:.1f} bytes of source per instruction")
+    print(f"{'stage':>10}{'retained bytes/instr':>24}{'peak bytes/instr':>20}")
+    for stage, retained, peak in [("parsed", parsed_bytes, parsed_peak), ("named", named_bytes, named_peak),
+                                  ("resolved", resolved_bytes, resolved_peak), ("decoded", decoded_bytes, decoded_peak),
+                                  ("streamed", streamed_bytes, streamed_peak), ("fused", fused_bytes, fused_peak),
+                                  ("object", dumped_bytes, dumped_peak)]:
+        print(f"{stage:>10}{retained / size:>24.1f}{peak / size:>20.1f}")
+
+    factorial = assemble_program(RECURSIVE_FACTORIAL)
+    assert isinstance(factorial, Success)
+    print()
+    print(f"recursive factorial of {DEPTH:,}")
+    print(f"{'memory':>10}{'addresses':>12}{'retained bytes/address':>26}")
+    for name, make_memory in [("dict", dict), ("flat", FlatMemory)]:
+        machine = DecodedSLIM(factorial.value, StaticConsole([str(DEPTH)]), make_memory())
+        _, machine_bytes, _ = measure(machine.execute)
+        print(f"{name:>10}{len(machine.mem):>12,}{machine_bytes / len(machine.mem):>26.1f}")
+
+
+if __name__ == "__main__":
+    main()
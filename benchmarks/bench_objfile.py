@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Compares loading a large program from SLIM text against loading it from an object file.
+
+Usage: python -m benchmarks.bench_objfile
+"""
+
+import pathlib
+import tempfile
+import time
+
+from worm.slim import objfile
+from worm.slim.interpreter import assemble_program
+from worm.test.slim.programs import make_code
+from worm.util.validation import Success
+
+INSTRUCTIONS = 100000
+
+
+def main():
+    code = make_code(INSTRUCTIONS)
+    with tempfile.TemporaryDirectory() as directory:
+        path = pathlib.Path(directory).joinpath("large" + objfile.SUFFIX)
+
+        start = time.perf_counter()
+        program_val = assemble_program(code)
+        assemble_seconds = time.perf_counter() - start
+        assert isinstance(program_val, Success)
+        objfile.dump(program_val.value, path)
+
+        start = time.perf_counter()
+        loaded = objfile.load(path)
+        load_seconds = time.perf_counter() - start
+        assert loaded.code == program_val.value.code
+
+        print(f"{'instructions':>14}{'format':>10}{'seconds':>10}{'bytes':>12}")
+        print(f"{len(loaded):>14}{'text':>10}{assemble_seconds:>10.3f}{len(code):>12,}")
+        print(f"{len(loaded):>14}{'object':>10}{load_seconds:>10.3f}{path.stat().st_size:>12,}")
+
+
+if __name__ == "__main__":
+    main()
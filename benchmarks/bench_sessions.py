@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Compares running many sessions of one program at once on an event loop against running them one after another.
+
+Each session computes a Fibonacci number compiled from Worm, with its input fed only once all sessions have started.
+
+Usage: python -m benchmarks.bench_sessions
+"""
+
+import asyncio
+import time
+
+from worm.compiler.compiler import Compiler
+from worm.slim.engine import DecodedSLIM
+from worm.slim.interpreter import assemble_program
+from worm.slim.sessions import QUANTUM, AsyncInterpreter
+from worm.util.console import QueueConsole, StaticConsole
+from worm.util.validation import Success
+
+FIBONACCI = """
+def fib(x):
+    if x <= 1:
+        return x
+    else:
+        return fib(x - 1) + fib(x - 2)
+
+print(int(fib(int(input()))))
+"""
+
+SESSIONS = 2000
+ARGUMENT = "12"
+
+
+async def run_sessions(interpreter: AsyncInterpreter) -> int:
+    consoles = [QueueConsole() for _ in range(SESSIONS)]
+    tasks = [asyncio.create_task(interpreter.run(console)) for console in consoles]
+    await asyncio.sleep(0)
+    for console in consoles:
+        console.feed(ARGUMENT)
+    machines = await asyncio.gather(*tasks)
+    return sum(machine.steps for machine in machines)
+
+
+def main():
+    program_val = assemble_program(Compiler().compile(FIBONACCI))
+    assert isinstance(program_val, Success)
+    program = program_val.value
+
+    start = time.perf_counter()
+    steps = 0
+    for _ in range(SESSIONS):
+        machine = DecodedSLIM(program, StaticConsole([ARGUMENT]))
+        machine.execute()
+        steps += machine.steps
+    sequential = time.perf_counter() - start
+
+    print(f"{SESSIONS:,} sessions, {steps // SESSIONS:,} instructions each")
+    print(f"{'run':>24}{'seconds':>10}{'instr/s':>14}")
+    print(f"{'one after another':>24}{sequential:>10.3f}{steps / sequential:>14,.0f}")
+    for quantum in [100, 1000, QUANTUM]:
+        start = time.perf_counter()
+        asyncio.run(run_sessions(AsyncInterpreter(program, quantum=quantum)))
+        seconds = time.perf_counter() - start
+        print(f"{f'at once, quantum {quantum}':>24}{seconds:>10.3f}{steps / seconds:>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
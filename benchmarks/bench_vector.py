@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Compares program runs per minute of lane-parallel batch execution against running inputs one at a time.
+
+Usage: python -m benchmarks.bench_vector
+"""
+
+import time
+
+from worm.compiler.compiler import Compiler
+from worm.slim.decoder import decode
+from worm.slim.engine import DecodedSLIM
+from worm.slim.interpreter import assemble
+from worm.slim.vector import run_batch
+from worm.util.console import StaticConsole
+from worm.util.validation import Success
+
+GRADING = """
+def digit_sum(n):
+    total = 0
+    while n > 0:
+        total += n % 10
+        n = n // 10
+    return total
+
+x = int(input())
+if x % 2 == 0:
+    print(int(digit_sum(x)))
+else:
+    print(int(x * 3 + 1))
+"""
+
+LANES = [1000, 10000]
+
+
+def main():
+    resolved = assemble(Compiler().compile(GRADING))
+    assert isinstance(resolved, Success)
+    program = decode(resolved.value)
+    print(f"{'inputs':>8}{'engine':>10}{'seconds':>10}{'runs/minute':>14}")
+    for lanes in LANES:
+        inputs = [[str(i * 7919)] for i in range(lanes)]
+
+        start = time.perf_counter()
+        for in_lines in inputs:
+            DecodedSLIM(program, StaticConsole(in_lines)).execute()
+        seconds = time.perf_counter() - start
+        print(f"{lanes:>8}{'decoded':>10}{seconds:>10.3f}{lanes / seconds * 60:>14,.0f}")
+
+        start = time.perf_counter()
+        run_batch(program, inputs)
+        seconds = time.perf_counter() - start
+        print(f"{lanes:>8}{'vector':>10}{seconds:>10.3f}{lanes / seconds * 60:>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
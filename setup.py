@@ -1,6 +1,8 @@
-from distutils.core import setup
+from setuptools import setup
 
 setup(name="Worm",
       version="1.0",
-      packages=["worm.slim", "worm.compiler", "worm.util"]
+      packages=["worm.slim", "worm.compiler", "worm.util", "worm.batch"],
+      # worm.slim.vector runs programs over many inputs at once with NumPy
+      extras_require={"vector": ["numpy"]}
       )
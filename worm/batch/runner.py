@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import pathlib
+import queue
+import sys
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from worm.compiler.cache import CompileCache
+from worm.compiler.compiler import Compiler
+from worm.slim.engine import DecodedSLIM
+from worm.slim.interpreter import assemble_program
+from worm.util.console import StaticConsole
+from worm.util.validation import Failure, Success
+
+# (source path, input path or None)
+Job = Tuple[str, Optional[str]]
+Result = Dict[str, Any]
+
+SOURCE_SUFFIXES = (".py", ".worm", ".slim")
+INPUT_SUFFIX = ".in"
+
+
+def find_jobs(directory: pathlib.Path) -> List[Job]:
+    """Finds a job per source in the directory, reading input from the file with the same stem and a .in suffix."""
+    jobs: List[Job] = []
+    for source in sorted(directory.iterdir()):
+        if source.suffix in SOURCE_SUFFIXES:
+            input_file = source.with_suffix(INPUT_SUFFIX)
+            jobs.append((str(source), str(input_file) if input_file.exists() else None))
+    return jobs
+
+
+def read_manifest(manifest: pathlib.Path) -> List[Job]:
+    """
+    Reads jobs from a manifest of JSON lines such as {"source": "a.py", "input": "a.in"}.
+
+    The input is optional, and relative paths are resolved against the manifest's directory.
+    """
+    jobs: List[Job] = []
+    for line in manifest.read_text().splitlines():
+        if line.strip():
+            entry = json.loads(line)
+            source = manifest.parent.joinpath(entry["source"])
+            input_file = manifest.parent.joinpath(entry["input"]) if entry.get("input") else None
+            jobs.append((str(source), str(input_file) if input_file else None))
+    return jobs
+
+
+# one cache per directory in each process, so that its in-memory layer lasts across chunks
+CACHES: Dict[str, CompileCache] = {}
+
+
+def get_cache(directory: str) -> CompileCache:
+    if directory not in CACHES:
+        CACHES[directory] = CompileCache(directory)
+    return CACHES[directory]
+
+
+def run_job(job: Job, cache: Optional[CompileCache] = None) -> Result:
+    """Compiles the job's source unless it is already SLIM, then runs it on the job's input."""
+    source, input_file = job
+    result: Result = {"source": source, "input": input_file, "output": [], "errors": [], "instructions": None}
+    start = time.perf_counter()
+    # the compiler reports errors on stderr before exiting
+    stderr = io.StringIO()
+    try:
+        with contextlib.redirect_stderr(stderr):
+            code = pathlib.Path(source).read_text()
+            in_lines = pathlib.Path(input_file).read_text().splitlines() if input_file else []
+            if source.endswith(".slim"):
+                program_val = assemble_program(code)
+            else:
+                program_val = Compiler(cache).compile_program(code)
+            console = StaticConsole(in_lines)
+            if isinstance(program_val, Failure):
+                result["errors"].extend(error.get_message() for error in program_val.value)
+            elif isinstance(program_val, Success):
+                machine = DecodedSLIM(program_val.value, console)
+                try:
+                    machine.execute()
+                finally:
+                    result["output"] = console.output
+                    result["instructions"] = machine.steps
+    except (Exception, SystemExit) as e:
+        result["errors"].extend(line for line in stderr.getvalue().splitlines() if line)
+        if not isinstance(e, SystemExit):
+            result["errors"].append(f"{type(e).__name__}: {e}")
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+
+# the queue each worker process puts a result on as each of its jobs finishes, with the index of the job
+RESULTS: "Optional[multiprocessing.Queue[Tuple[int, Result]]]" = None
+
+
+def init_worker(results: "multiprocessing.Queue[Tuple[int, Result]]") -> None:
+    global RESULTS
+    RESULTS = results
+    # results left unread once the batch is abandoned must not keep the process from exiting
+    results.cancel_join_thread()
+
+
+def run_chunk(jobs: List[Tuple[int, Job]], cache_directory: Optional[str] = None) -> None:
+    cache = get_cache(cache_directory) if cache_directory is not None else None
+    assert RESULTS is not None
+    for index, job in jobs:
+        RESULTS.put((index, run_job(job, cache)))
+
+
+def next_result(results: "multiprocessing.Queue[Tuple[int, Result]]", futures: List[Future]) -> Tuple[int, Result]:
+    """Waits for the next result, raising the error of any chunk which failed rather than waiting forever."""
+    while True:
+        try:
+            return results.get(timeout=0.1)
+        except queue.Empty:
+            for future in futures:
+                if future.done():
+                    # raises the chunk's error, if any
+                    future.result()
+
+
+def run_jobs(jobs: List[Job], workers: Optional[int] = None, chunk_size: Optional[int] = None,
+             ordered: bool = False, cache_directory: Optional[str] = None) -> Iterator[Result]:
+    """
+    Runs the jobs across a pool of processes, yielding each result as soon as its job finishes.
+    :param jobs: the jobs to run
+    :param workers: the number of processes, by default the number of cores
+    :param chunk_size: the number of jobs sent to a process at once, by default about four chunks per process
+    :param ordered: whether to yield results in the order the jobs were given rather than as they finish
+    :param cache_directory: a directory to cache compiled programs in across processes and runs, if any
+    :return: an iterator over the results
+    """
+    workers = workers or os.cpu_count() or 1
+    chunk_size = chunk_size or max(1, len(jobs) // (workers * 4))
+    indexed = list(enumerate(jobs))
+    chunks = [indexed[i:i + chunk_size] for i in range(0, len(indexed), chunk_size)]
+    results: "multiprocessing.Queue[Tuple[int, Result]]" = multiprocessing.Queue()
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(results,)) as executor:
+        futures = [executor.submit(run_chunk, chunk, cache_directory) for chunk in chunks]
+        # results which finished before an earlier job, when ordered
+        waiting: Dict[int, Result] = {}
+        next_index = 0
+        for _ in range(len(jobs)):
+            index, result = next_result(results, futures)
+            if not ordered:
+                yield result
+                continue
+            waiting[index] = result
+            while next_index in waiting:
+                yield waiting.pop(next_index)
+                next_index += 1
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Compile and run many Worm programs, writing results as JSON lines.")
+    arg_parser.add_argument("jobs", help="a directory of sources with optional .in input files, or a manifest file")
+    arg_parser.add_argument("--workers", type=int, help="the number of processes (default: the number of cores)")
+    arg_parser.add_argument("--chunk-size", type=int, help="the number of jobs sent to a process at once")
+    arg_parser.add_argument("--ordered", action="store_true", help="write results in job order, not completion order")
+    arg_parser.add_argument("--cache-dir", help="a directory to cache compiled programs in between runs")
+    args = arg_parser.parse_args()
+
+    path = pathlib.Path(args.jobs)
+    jobs = find_jobs(path) if path.is_dir() else read_manifest(path)
+    for result in run_jobs(jobs, args.workers, args.chunk_size, args.ordered, args.cache_dir):
+        sys.stdout.write(json.dumps(result) + "\n")
+        sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
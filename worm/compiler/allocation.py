@@ -0,0 +1,299 @@
+"""
+Assigns the registers named by the compiler's Visitor to SLIM's physical registers.
+
+Each definition of a register is joined with the others reaching the same uses into a web, the unit of allocation, so
+that a variable's unrelated values may live in different registers. Webs interfere where one is written while the
+other is live, and are coloured by optimistic graph colouring, preferring the colour of a web copied to or from.
+
+Webs which cannot be coloured are spilled to fixed slots at the bottom of memory, and the stack starts above them.
+Spilled webs are loaded into scratch registers before each use and stored after each definition. As the caller saves
+its registers around calls by pushing them, spilled values are saved and restored with the rest.
+"""
+
+from typing import Dict, Iterable, List, Set, Tuple
+
+from worm.compiler.flow import (
+    Arg, Instruction, Line, bounded_registers, defs, is_copy, liveness, successors, uses,
+)
+from worm.slim.decoder import NUM_REGISTERS
+
+SPILL_ADDRESS = "spill-address"
+SPILL_VALUES = ("spill-0", "spill-1")
+SCRATCH = (SPILL_ADDRESS,) + SPILL_VALUES
+
+
+class Allocation:
+    def __init__(self, lines: List[Line], registers: Set[str], spill_slots: int):
+        """
+        :param lines: the lines using physical registers
+        :param registers: the names of the physical registers used
+        :param spill_slots: the number of memory slots holding spilled registers, which the stack must start above
+        """
+        self.lines = lines
+        self.registers = registers
+        self.spill_slots = spill_slots
+
+
+def operand_positions(instruction: Instruction) -> Tuple[range, range]:
+    """Gets the positions of the registers the instruction writes and reads among its arguments."""
+    defined = len(defs(instruction))
+    return range(defined), range(defined, defined + len(uses(instruction)))
+
+
+def web_name(web: int) -> str:
+    return f"web-{web}"
+
+
+def find(parents: Dict[int, int], item: int) -> int:
+    while parents[item] != item:
+        parents[item] = parents[parents[item]]
+        item = parents[item]
+    return item
+
+
+def bits(value: int) -> List[int]:
+    """Gets the positions of the bits set in the value."""
+    positions = []
+    while value:
+        lowest = value & -value
+        positions.append(lowest.bit_length() - 1)
+        value ^= lowest
+    return positions
+
+
+def build_webs(lines: List[Line], fixed: Set[str]) -> List[Line]:
+    """
+    Renames each register not among the fixed ones to the web its value belongs to, by joining the definitions
+    reaching each use.
+    """
+    # every register not fixed gets a definition at the start of the program, standing for its initial value of zero
+    registers = sorted({arg for line in lines if isinstance(line, Instruction)
+                        for positions in operand_positions(line) for position in positions
+                        for arg in (line.args[position],) if arg not in fixed})
+    definitions: List[Arg] = list(registers)
+    entry = 0
+    kill: Dict[Arg, int] = {register: 1 << i for i, register in enumerate(registers)}
+    generates: Dict[int, int] = {}
+    for i, line in enumerate(lines):
+        if isinstance(line, Instruction):
+            for register in defs(line):
+                if register not in fixed:
+                    bit = 1 << len(definitions)
+                    generates[i] = len(definitions)
+                    definitions.append(register)
+                    kill[register] |= bit
+    for i in range(len(registers)):
+        entry |= 1 << i
+
+    # forward dataflow of the reaching definitions as bit sets
+    following = successors(lines)
+    predecessors: List[List[int]] = [[] for _ in range(len(lines) + 1)]
+    for i, indices in enumerate(following):
+        for j in indices:
+            predecessors[j].append(i)
+    reach_in = [0] * len(lines)
+    reach_out = [0] * len(lines)
+    worklist = list(reversed(range(len(lines))))
+    pending = set(worklist)
+    while worklist:
+        i = worklist.pop()
+        pending.discard(i)
+        incoming = entry if i == 0 else 0
+        for j in predecessors[i]:
+            incoming |= reach_out[j]
+        reach_in[i] = incoming
+        outgoing = incoming
+        if i in generates:
+            outgoing = (outgoing & ~kill[definitions[generates[i]]]) | (1 << generates[i])
+        if outgoing != reach_out[i]:
+            reach_out[i] = outgoing
+            for j in following[i]:
+                if j < len(lines) and j not in pending:
+                    pending.add(j)
+                    worklist.append(j)
+
+    parents = {i: i for i in range(len(definitions))}
+    use_webs: Dict[Tuple[int, int], int] = {}
+    for i, line in enumerate(lines):
+        if not isinstance(line, Instruction):
+            continue
+        for position in operand_positions(line)[1]:
+            register = line.args[position]
+            if register in fixed:
+                continue
+            reaching = reach_in[i] & kill[register]
+            if reaching == 0:
+                # never run, or reading only the initial value
+                reaching = kill[register] & entry
+            indices = bits(reaching)
+            root = find(parents, indices[0])
+            for index in indices[1:]:
+                other = find(parents, index)
+                if other != root:
+                    parents[other] = root
+            use_webs[i, position] = indices[0]
+
+    result: List[Line] = []
+    for i, line in enumerate(lines):
+        if not isinstance(line, Instruction):
+            result.append(line)
+            continue
+        args = list(line.args)
+        defined, used = operand_positions(line)
+        for position in defined:
+            if args[position] not in fixed:
+                args[position] = web_name(find(parents, generates[i]))
+        for position in used:
+            if args[position] not in fixed:
+                args[position] = web_name(find(parents, use_webs[i, position]))
+        result.append(Instruction(line.op, tuple(args)))
+    return result
+
+
+def interference(lines: List[Line], fixed: Set[str], zero: str) -> Tuple[Dict[Arg, Set[Arg]], Dict[Arg, Set[Arg]]]:
+    """
+    Builds the interference graph of the webs, and the webs copied to or from each.
+    :return: the webs each web interferes with, and the webs each web is copied to or from
+    """
+    webs = {arg for line in lines if isinstance(line, Instruction)
+            for positions in operand_positions(line) for position in positions
+            for arg in (line.args[position],) if arg not in fixed}
+    graph: Dict[Arg, Set[Arg]] = {web: set() for web in webs}
+    copies: Dict[Arg, Set[Arg]] = {web: set() for web in webs}
+    bounded = bounded_registers(lines, webs)
+
+    def interfere(a: Arg, b: Arg) -> None:
+        if a != b and a in graph and b in graph:
+            graph[a].add(b)
+            graph[b].add(a)
+
+    live = liveness(lines)
+    for line, live_out in zip(lines, live):
+        if not isinstance(line, Instruction):
+            continue
+        source = is_copy(line, zero)
+        for register in defs(line):
+            for other in live_out:
+                # a copy of a 32-bit value may share its source's register, as both hold the same value
+                if not (other == source and source in bounded):
+                    interfere(register, other)
+            if source is not None and source in graph and register in graph:
+                copies[register].add(source)
+                copies[source].add(register)
+    # the webs holding their initial values interfere with each other
+    if lines:
+        first = lines[0]
+        live_in = set(live[0])
+        if isinstance(first, Instruction):
+            live_in = (live_in - set(defs(first))) | set(uses(first))
+        for a in live_in:
+            for b in live_in:
+                interfere(a, b)
+    return graph, copies
+
+
+def color(graph: Dict[Arg, Set[Arg]], copies: Dict[Arg, Set[Arg]], costs: Dict[Arg, int],
+          colors: int) -> Tuple[Dict[Arg, int], List[Arg]]:
+    """
+    Colours the graph with optimistic simplification.
+    :return: the colour of each web coloured, and the webs left to spill
+    """
+    degrees = {web: len(neighbours) for web, neighbours in graph.items()}
+    remaining = set(graph)
+    stack: List[Arg] = []
+    while remaining:
+        low = [web for web in remaining if degrees[web] < colors]
+        if low:
+            chosen = min(low, key=str)
+        else:
+            chosen = min(remaining, key=lambda web: (costs[web] / (degrees[web] + 1), str(web)))
+        remaining.discard(chosen)
+        stack.append(chosen)
+        for neighbour in graph[chosen]:
+            if neighbour in remaining:
+                degrees[neighbour] -= 1
+
+    assigned: Dict[Arg, int] = {}
+    spilled: List[Arg] = []
+    for web in reversed(stack):
+        taken = {assigned[neighbour] for neighbour in graph[web] if neighbour in assigned}
+        preferred = [assigned[other] for other in sorted(copies[web], key=str)
+                     if other in assigned and assigned[other] not in taken]
+        free = [c for c in range(colors) if c not in taken]
+        if preferred:
+            assigned[web] = preferred[0]
+        elif free:
+            assigned[web] = free[0]
+        else:
+            spilled.append(web)
+    return assigned, spilled
+
+
+def physical_name(color: int) -> str:
+    return f"reg-{color}"
+
+
+def rewrite(lines: List[Line], assigned: Dict[Arg, int], slots: Dict[Arg, int]) -> List[Line]:
+    """Replaces each web with its register, loading spilled webs before their uses and storing them after."""
+    result: List[Line] = []
+    for line in lines:
+        if not isinstance(line, Instruction):
+            result.append(line)
+            continue
+        args = list(line.args)
+        defined, used = operand_positions(line)
+        before: List[Line] = []
+        after: List[Line] = []
+        loaded: Dict[Arg, str] = {}
+        for position in used:
+            web = args[position]
+            if web in slots:
+                if web not in loaded:
+                    loaded[web] = SPILL_VALUES[len(loaded)]
+                    before.append(Instruction("li", (SPILL_ADDRESS, slots[web])))
+                    before.append(Instruction("ld", (loaded[web], SPILL_ADDRESS)))
+                args[position] = loaded[web]
+            elif web in assigned:
+                args[position] = physical_name(assigned[web])
+        for position in defined:
+            web = args[position]
+            if web in slots:
+                args[position] = SPILL_VALUES[0]
+                after.append(Instruction("li", (SPILL_ADDRESS, slots[web])))
+                after.append(Instruction("st", (SPILL_VALUES[0], SPILL_ADDRESS)))
+            elif web in assigned:
+                args[position] = physical_name(assigned[web])
+        result.extend(before)
+        result.append(Instruction(line.op, tuple(args)))
+        result.extend(after)
+    return result
+
+
+def allocate(lines: List[Line], fixed: Iterable[str], zero: str) -> Allocation:
+    """
+    Allocates physical registers to the registers named in the lines.
+    :param lines: the lines as emitted
+    :param fixed: the registers with a fixed meaning, which keep their own physical registers
+    :param zero: the register which always holds zero
+    :return: the lines using physical registers
+    """
+    fixed = set(fixed)
+    renamed = build_webs(lines, fixed)
+    graph, copies = interference(renamed, fixed, zero)
+    costs = {web: 0 for web in graph}
+    for line in renamed:
+        if isinstance(line, Instruction):
+            for positions in operand_positions(line):
+                for position in positions:
+                    if line.args[position] in costs:
+                        costs[line.args[position]] += 1
+
+    available = NUM_REGISTERS - len(fixed)
+    assigned, spilled = color(graph, copies, costs, available)
+    if spilled:
+        # keep back the scratch registers that spilled webs are loaded into
+        assigned, spilled = color(graph, copies, costs, available - len(SCRATCH))
+    slots = {web: slot for slot, web in enumerate(sorted(spilled, key=str))}
+    result = rewrite(renamed, assigned, slots)
+    registers = fixed | {physical_name(c) for c in assigned.values()} | (set(SCRATCH) if slots else set())
+    return Allocation(result, registers, len(slots))
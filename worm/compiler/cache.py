@@ -0,0 +1,196 @@
+"""
+Caches compiled SLIM code by a hash of the Worm source, the compiler version and the compiler options.
+
+Entries are kept in a bounded in-process LRU layer and, if a directory is given, in an on-disk layer shared between
+processes. Each entry holds the SLIM text and, once it has been assembled, the program as an object file.
+"""
+
+import collections
+import hashlib
+import json
+import os
+import pathlib
+import tempfile
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from worm.slim import objfile
+from worm.slim.decoder import Program
+
+TEXT_SUFFIX = ".slim"
+
+Path = Union[str, pathlib.Path]
+
+
+def cache_key(code: str, version: int, options: Dict[str, Any]) -> str:
+    """Hashes the source together with everything else that affects the compiled output."""
+    header = json.dumps({"version": version, "options": options}, sort_keys=True)
+    return hashlib.sha256(f"{header}\0{code}".encode()).hexdigest()
+
+
+class CacheStats:
+    def __init__(self):
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+
+    @property
+    def hits(self) -> int:
+        return self.memory_hits + self.disk_hits
+
+    def as_dict(self) -> Dict[str, int]:
+        return {"memory_hits": self.memory_hits, "disk_hits": self.disk_hits, "misses": self.misses,
+                "writes": self.writes, "evictions": self.evictions}
+
+    def __repr__(self) -> str:
+        return f"CacheStats({', '.join(f'{name}={value}' for name, value in self.as_dict().items())})"
+
+
+class CompileCache:
+    def __init__(self, directory: Optional[Path] = None, max_entries: int = 256, max_bytes: int = 64 * 2 ** 20):
+        """
+        :param directory: the directory of the on-disk layer, or None to cache in memory only
+        :param max_entries: the number of entries kept in memory
+        :param max_bytes: the total size of the files kept on disk, beyond which the least recently used are removed
+        """
+        self.directory = pathlib.Path(directory) if directory is not None else None
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.stats = CacheStats()
+        # the size of the disk layer as last scanned plus what this process has written since
+        self.disk_bytes: Optional[int] = None
+        # key -> (SLIM text, assembled program or None)
+        self.entries: "collections.OrderedDict[str, Tuple[str, Optional[Program]]]" = collections.OrderedDict()
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+
+    def get(self, key: str) -> Optional[str]:
+        """Gets the SLIM text cached under the key, if any."""
+        entry = self.lookup(key)
+        return entry[0] if entry is not None else None
+
+    def get_program(self, key: str) -> Optional[Program]:
+        """
+        Gets the assembled program stored under the key, if any.
+
+        This does not count towards the statistics, as it is only asked for after get has found the SLIM text.
+        """
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        text, program = entry
+        if program is None and self.directory is not None:
+            path = self.path(key, objfile.SUFFIX)
+            try:
+                program = objfile.load(path)
+                os.utime(path)
+            except (OSError, objfile.ObjectFileError):
+                return None
+            self.remember(key, text, program)
+        return program
+
+    def put(self, key: str, text: str) -> None:
+        self.remember(key, text, None)
+        self.write(key, TEXT_SUFFIX, text.encode())
+
+    def put_program(self, key: str, text: str, program: Program) -> None:
+        self.remember(key, text, program)
+        self.write(key, TEXT_SUFFIX, text.encode())
+        try:
+            self.write(key, objfile.SUFFIX, objfile.dumps(program))
+        except objfile.ObjectFileError:
+            pass  # kept in memory only, as its operands do not fit the object format
+
+    def lookup(self, key: str) -> Optional[Tuple[str, Optional[Program]]]:
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.stats.memory_hits += 1
+            return self.entries[key]
+        if self.directory is not None:
+            path = self.path(key, TEXT_SUFFIX)
+            try:
+                text = path.read_text()
+                # mark the entry as recently used for eviction
+                os.utime(path)
+            except OSError:
+                pass
+            else:
+                self.stats.disk_hits += 1
+                self.remember(key, text, None)
+                return text, None
+        self.stats.misses += 1
+        return None
+
+    def remember(self, key: str, text: str, program: Optional[Program]) -> None:
+        self.entries[key] = (text, program)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def path(self, key: str, suffix: str) -> pathlib.Path:
+        assert self.directory is not None
+        return self.directory.joinpath(key[:2], key + suffix)
+
+    def write(self, key: str, suffix: str, data: bytes) -> None:
+        """Writes the file under a temporary name and renames it, so that readers never see it half written."""
+        if self.directory is None:
+            return
+        path = self.path(key, suffix)
+        path.parent.mkdir(exist_ok=True)
+        descriptor, temporary = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(descriptor, "wb") as file:
+                file.write(data)
+            os.replace(temporary, path)
+        except BaseException:
+            os.unlink(temporary)
+            raise
+        self.stats.writes += 1
+        if self.disk_bytes is None:
+            self.disk_bytes = sum(size for _, size, _ in self.scan())
+        else:
+            self.disk_bytes += len(data)
+        if self.disk_bytes > self.max_bytes:
+            self.evict()
+
+    def scan(self) -> List[Tuple[float, int, pathlib.Path]]:
+        """Lists the modification time, size and path of each file in the disk layer."""
+        assert self.directory is not None
+        files = []
+        for path in self.directory.glob("*/*"):
+            if path.name.startswith(".tmp-"):
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue  # removed by another process
+            files.append((stat.st_mtime, stat.st_size, path))
+        return files
+
+    def evict(self) -> None:
+        """
+        Removes the least recently used files until the disk layer is back under three quarters of max_bytes.
+
+        The disk layer is only rescanned once the files written by this process may have taken it over max_bytes,
+        so other processes writing to the same directory can take it over the limit until then.
+        """
+        files = self.scan()
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes * 3 // 4:
+                break
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            total -= size
+            self.stats.evictions += 1
+        self.disk_bytes = total
+
+    def clear(self) -> None:
+        self.entries.clear()
+        if self.directory is not None:
+            for _, _, path in self.scan():
+                path.unlink()
+            self.disk_bytes = 0
@@ -0,0 +1,90 @@
+"""
+Removes the saves and restores of registers around calls where they are not needed.
+
+The compiler's Visitor pushes every arg and local register in use before each call and pops them all afterwards. A
+register need only be saved if it is live after the call and may be written between the saves and the restores,
+either while the arguments are evaluated or by the callee or the functions it calls in turn. Other registers keep
+their values through the call, and the flow analyses see them live across it.
+
+The writes of restores themselves are not counted, since a register restored by a call holds the value it had before.
+"""
+
+from typing import Dict, Iterable, List, NamedTuple, Set, Tuple
+
+from worm.compiler.flow import Arg, Instruction, Line, defs, liveness
+
+
+class CallSite(NamedTuple):
+    # the label of the function called; calls in tail position have no saves or restores
+    callee: str
+    # each register saved, with the index of the st pushing it, followed by the add moving the stack pointer
+    saves: List[Tuple[Arg, int]]
+    # each register restored, with the index of the ld popping it, preceded by the sub moving the stack pointer
+    restores: List[Tuple[Arg, int]]
+    # the indices from the first line after the saves to the jump to the callee
+    start: int
+    jump: int
+
+
+class Function(NamedTuple):
+    label: str
+    # the indices of the lines making up the function's body
+    start: int
+    end: int
+
+
+def writes(lines: List[Line], start: int, end: int, restores: Set[int], fixed: Set[str]) -> Set[Arg]:
+    """Gets the registers written by the lines between the indices, other than by restores."""
+    return {register for i, line in enumerate(lines[start:end], start) if i not in restores
+            and isinstance(line, Instruction) for register in defs(line) if register not in fixed}
+
+
+def clobbers(lines: List[Line], sites: List[CallSite], functions: List[Function],
+             fixed: Set[str]) -> Dict[str, Set[Arg]]:
+    """Gets the registers each function may write, including through the functions it calls."""
+    restores = {i for site in sites for _, i in site.restores}
+    result = {function.label: writes(lines, function.start, function.end, restores, fixed) for function in functions}
+    callees = {function.label: {site.callee for site in sites if function.start <= site.jump < function.end}
+               for function in functions}
+    changed = True
+    while changed:
+        changed = False
+        for label, called in callees.items():
+            for callee in called:
+                added = result.get(callee, set()) - result[label]
+                if added:
+                    result[label] |= added
+                    changed = True
+    return result
+
+
+def prune_saves(lines: List[Line], sites: List[CallSite], functions: List[Function],
+                fixed: Iterable[str]) -> List[Line]:
+    """
+    Removes the pushes and pops of registers which are dead after a call or which the call leaves untouched.
+    :param lines: the lines as emitted, which the indices of the call sites and functions refer to
+    :param sites: the calls in the lines
+    :param functions: the functions defined in the lines
+    :param fixed: the registers with a fixed meaning, which are never saved
+    :return: the lines without the pushes and pops not needed
+    """
+    fixed = set(fixed)
+    function_clobbers = clobbers(lines, sites, functions, fixed)
+    # calls to functions not defined may write anything
+    everything = {arg for line in lines if isinstance(line, Instruction) for arg in line.args}
+    restores = {i for site in sites for _, i in site.restores}
+    live = liveness(lines)
+
+    removed: Set[int] = set()
+    for site in sites:
+        clobbered = writes(lines, site.start, site.jump + 1, restores, fixed)
+        for other in sites:
+            if site.start <= other.jump <= site.jump:
+                clobbered |= function_clobbers.get(other.callee, everything)
+        saves = dict(site.saves)
+        for register, restore in site.restores:
+            if register in clobbered and register in live[restore]:
+                continue
+            save = saves[register]
+            removed.update((save, save + 1, restore - 1, restore))
+    return [line for i, line in enumerate(lines) if i not in removed]
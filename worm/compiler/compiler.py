@@ -5,13 +5,31 @@ import ast
 import fileinput
 import collections
 
+from worm.compiler import allocation, peephole
+from worm.compiler.calls import CallSite, Function, prune_saves
+from worm.compiler.cache import cache_key
+from worm.compiler.folding import fold
+from worm.compiler.flow import Comment, Instruction, Label
+from worm.compiler.jumps import thread_jumps
+from worm.compiler.loops import loop_invariants
+from worm.slim.interpreter import assemble_program
+from worm.util.validation import Success
+
+# bump whenever a change to the compiler changes its output, so that cached output is not reused
+VERSION = 12
+
 # constants
 RESULT = "result"
 JUMP_LABEL = "jump-label"
+LINK = "link"  # holds the return address of leaf functions
 ZERO = "zero"
 ONE = "one"
 STACK_POINTER = "stack-pointer"  # always points at next empty slot in stack
 MAIN_SCOPE = ""
+# the size in AST nodes up to which functions are inlined by default
+INLINE_THRESHOLD = 40
+# the registers with a fixed meaning, which the allocator leaves in place
+FIXED_REGISTERS = (RESULT, JUMP_LABEL, LINK, ZERO, ONE, STACK_POINTER)
 
 # TODO: update to distinguish input files
 
@@ -31,10 +49,14 @@ def panic(message, line):
 
 
 class Namespace:
-    def __init__(self, visitor):
+    def __init__(self, visitor, frame=None):
+        """
+        :param frame: the namespace among whose locals this one's are allocated, as for an inlined call, or None
+        """
         self.visitor = visitor
         self.names = {}
         self.local_count = 0
+        self.frame = self if frame is None else frame
 
     def get_or_create_name(self, name):
         """Gets the register for the name, allocating a new one if necessary."""
@@ -47,6 +69,8 @@ class Namespace:
 
     def add_local(self):
         """Adds an anonymous local variable to the namespace."""
+        if self.frame is not self:
+            return self.frame.add_local()
 
         local_name = self.visitor.local(self.local_count)
         self.local_count += 1
@@ -62,8 +86,135 @@ class Namespace:
         self.names[item] = value
 
 
+def called_functions(node):
+    """Gets the names of the Worm functions called within the node."""
+    return {child.func.id for child in ast.walk(node)
+            if isinstance(child, ast.Call) and isinstance(child.func, ast.Name)
+            and child.func.id not in ("print", "int", "input")}
+
+
+def inlinable_functions(module, threshold):
+    """
+    Finds the functions defined in the module which may be inlined: those defined once, taking only positional
+    arguments, not defining functions themselves, not recursive even through other functions, and of at most
+    threshold AST nodes.
+    :return: the definition of each function to inline, by name
+    """
+    definitions = collections.Counter(node.name for node in module.body if isinstance(node, ast.FunctionDef))
+    functions = {node.name: node for node in module.body
+                 if isinstance(node, ast.FunctionDef) and definitions[node.name] == 1}
+    calls = {name: called_functions(node) for name, node in functions.items()}
+
+    def recursive(name):
+        seen = set()
+        pending = list(calls[name])
+        while pending:
+            callee = pending.pop()
+            if callee == name:
+                return True
+            if callee in calls and callee not in seen:
+                seen.add(callee)
+                pending.extend(calls[callee])
+        return False
+
+    return {name: node for name, node in functions.items()
+            if sum(1 for _ in ast.walk(node)) <= threshold and node.body
+            and not node.args.vararg and not node.args.kwarg and not node.args.kwonlyargs and not node.args.defaults
+            and not any(isinstance(child, ast.FunctionDef) for child in ast.walk(node) if child is not node)
+            and not recursive(name)}
+
+
+def leaf_functions(module, inlinable):
+    """
+    Finds the functions defined in the module which call no other function, other than those inlined into them which
+    call none either.
+    """
+    functions = {node.name: node for node in module.body if isinstance(node, ast.FunctionDef)}
+    leaves = set()
+    changed = True
+    while changed:
+        changed = False
+        for name, node in functions.items():
+            callees = called_functions(node)
+            if name not in leaves and all(callee in inlinable and callee in leaves for callee in callees):
+                leaves.add(name)
+                changed = True
+    return leaves
+
+
+def used_functions(module, inlinable):
+    """
+    Finds the functions defined in the module which are reachable over the call graph from the module's own
+    statements, and are not inlined wherever they are called.
+    """
+    definitions = collections.defaultdict(list)
+    for node in module.body:
+        if isinstance(node, ast.FunctionDef):
+            definitions[node.name].append(node)
+    pending = set()
+    for node in module.body:
+        if not isinstance(node, ast.FunctionDef):
+            pending |= called_functions(node)
+    reached = set()
+    while pending:
+        name = pending.pop()
+        if name not in reached:
+            reached.add(name)
+            for node in definitions[name]:
+                pending |= called_functions(node)
+    return {name for name in reached if name not in inlinable}
+
+
+def breaks_out(statements):
+    """Checks whether any of the statements may break out of the loop they are directly in."""
+    for statement in statements:
+        if isinstance(statement, ast.Break):
+            return True
+        elif isinstance(statement, ast.If) and (breaks_out(statement.body) or breaks_out(statement.orelse)):
+            return True
+    return False
+
+
+def terminates(statement):
+    """Checks whether control never passes from the statement to the one after it."""
+    if isinstance(statement, (ast.Return, ast.Break, ast.Continue)):
+        return True
+    elif isinstance(statement, ast.If):
+        return any(map(terminates, statement.body)) and any(map(terminates, statement.orelse))
+    elif isinstance(statement, ast.While):
+        return isinstance(statement.test, ast.Constant) and bool(statement.test.value) \
+            and not breaks_out(statement.body)
+    return False
+
+
 class Visitor(ast.NodeVisitor):
-    def __init__(self):
+    def __init__(self, tail_calls=True, inline_threshold=0, leaf_calls=False, dead_code=False,
+                 branch_conditions=False, rotate_loops=False, hoist_invariants=False):
+        """
+        :param tail_calls: whether calls in tail position jump to the callee, reusing the current return address
+        :param inline_threshold: the size in AST nodes up to which non-recursive functions are inlined
+        :param leaf_calls: whether functions calling no others get their return address in the link register
+        :param dead_code: whether to leave out functions never called and statements never reached
+        :param branch_conditions: whether the tests of ifs and whiles jump straight to their targets, short-circuiting
+            without building boolean values
+        :param rotate_loops: whether while loops test their condition once before the loop and then at the bottom
+        :param hoist_invariants: whether expressions which do not change in a while loop are computed before it
+        """
+        self.tail_calls = tail_calls
+        self.inline_threshold = inline_threshold
+        self.leaf_calls = leaf_calls
+        self.dead_code = dead_code
+        self.branch_conditions = branch_conditions
+        self.rotate_loops = rotate_loops
+        self.hoist_invariants = hoist_invariants
+        # the register holding the value of each expression hoisted out of the loops being visited, by the node's id
+        self.hoisted = {}
+        # the names of the functions returning through the link register
+        self.leaves = set()
+        # the definitions of the functions to inline, by name
+        self.inlinable = {}
+        # the namespace and end label of each call being inlined
+        self.inlines = []
         self.namespaces = {MAIN_SCOPE: Namespace(self)}
         self.scope = MAIN_SCOPE
         self.registers = set([RESULT, ZERO, ONE, JUMP_LABEL, STACK_POINTER])
@@ -72,6 +223,9 @@ class Visitor(ast.NodeVisitor):
         self.break_labels = []
         self.continue_labels = []
         self.label_counts = collections.Counter()
+        self.stack_base = 0
+        self.call_sites = []
+        self.functions = []
 
     def arg(self, n):
         """Gets the name for an arg register and allocate it if necessary."""
@@ -106,6 +260,8 @@ class Visitor(ast.NodeVisitor):
         self.arg_count -= 1
 
     def get_local_namespace(self):
+        if self.inlines:
+            return self.inlines[-1][0]
         if self.scope in self.namespaces:
             return self.namespaces[self.scope]
         else:
@@ -192,6 +348,10 @@ class Visitor(ast.NodeVisitor):
         self.j_to(self.break_labels[-1])
 
     def visit_Compare(self, node):
+        self.compare(node)
+
+    def compare(self, node, negate=False):
+        """Evaluates the comparison into the result register, or its negation if negate is set."""
         if len(node.ops) != 1:
             panic("Chained comparison.", node.lineno)
         self.visit(node.left)
@@ -199,22 +359,74 @@ class Visitor(ast.NodeVisitor):
         self.cp(arg, RESULT)
         self.visit(node.comparators[0])
         op = node.ops[0]
-        if isinstance(op, ast.Eq):
+        if isinstance(op, ast.Eq if not negate else ast.NotEq):
             self.seq(RESULT, arg, RESULT)
-        elif isinstance(op, ast.NotEq):
+        elif isinstance(op, ast.NotEq if not negate else ast.Eq):
             self.sne(RESULT, arg, RESULT)
-        elif isinstance(op, ast.Lt):
+        elif isinstance(op, ast.Lt if not negate else ast.GtE):
             self.slt(RESULT, arg, RESULT)
-        elif isinstance(op, ast.Gt):
+        elif isinstance(op, ast.Gt if not negate else ast.LtE):
             self.sgt(RESULT, arg, RESULT)
-        elif isinstance(op, ast.LtE):
+        elif isinstance(op, ast.LtE if not negate else ast.Gt):
             self.sle(RESULT, arg, RESULT)
-        elif isinstance(op, ast.GtE):
+        elif isinstance(op, ast.GtE if not negate else ast.Lt):
             self.sge(RESULT, arg, RESULT)
         else:
             panic("Unsupported comparison operator.", node.lineno)
         self.rem_arg()
 
+    def branch_if_false(self, node, label):
+        """Jumps to the label if the condition is false, and falls through otherwise."""
+        if not self.branch_conditions or id(node) in self.hoisted:
+            self.visit(node)
+            self.jeqz_to(RESULT, label)
+        elif isinstance(node, ast.Constant) and isinstance(node.value, int):
+            if not node.value:
+                self.j_to(label)
+        elif isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+            self.branch_if_true(node.operand, label)
+        elif isinstance(node, ast.BoolOp) and isinstance(node.op, ast.And):
+            for value in node.values:
+                self.branch_if_false(value, label)
+        elif isinstance(node, ast.BoolOp) and isinstance(node.op, ast.Or):
+            true_label = self.add_label("or-true")
+            for value in node.values[:-1]:
+                self.branch_if_true(value, true_label)
+            self.branch_if_false(node.values[-1], label)
+            self.label(true_label)
+        else:
+            self.visit(node)
+            self.jeqz_to(RESULT, label)
+
+    def branch_if_true(self, node, label):
+        """Jumps to the label if the condition is true, and falls through otherwise."""
+        if not self.branch_conditions or id(node) in self.hoisted:
+            self.visit(node)
+            self.seq(RESULT, ZERO, RESULT)
+            self.jeqz_to(RESULT, label)
+        elif isinstance(node, ast.Constant) and isinstance(node.value, int):
+            if node.value:
+                self.j_to(label)
+        elif isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+            self.branch_if_false(node.operand, label)
+        elif isinstance(node, ast.BoolOp) and isinstance(node.op, ast.And):
+            false_label = self.add_label("and-false")
+            for value in node.values[:-1]:
+                self.branch_if_false(value, false_label)
+            self.branch_if_true(node.values[-1], label)
+            self.label(false_label)
+        elif isinstance(node, ast.BoolOp) and isinstance(node.op, ast.Or):
+            for value in node.values:
+                self.branch_if_true(value, label)
+        elif isinstance(node, ast.Compare):
+            # SLIM only jumps on zero, so jump when the negated comparison is false
+            self.compare(node, negate=True)
+            self.jeqz_to(RESULT, label)
+        else:
+            self.visit(node)
+            self.seq(RESULT, ZERO, RESULT)
+            self.jeqz_to(RESULT, label)
+
     def visit_Constant(self, node):
         if not(isinstance(node.value, int)):
             panic("Non-integer literal.", node.lineno)
@@ -258,43 +470,68 @@ class Visitor(ast.NodeVisitor):
             elif inner_func != "input":
                 panic("Int call not wrapping input.", node.lineno)
             self.read(RESULT)
+        elif func in self.inlinable:
+            self.inline(node)
         else:
             return_label = self.add_label("return")
             func_label = self.get_func_label(func)
-            for i in range(self.arg_count):
-                self.push(self.arg(i))
-            for i in range(self.get_local_namespace().local_count):
-                self.push(self.local(i))
-            self.li(JUMP_LABEL, return_label)
-            self.push(JUMP_LABEL)
+            saved = [self.arg(i) for i in range(self.arg_count)] + \
+                [self.local(i) for i in range(self.get_local_namespace().frame.local_count)]
+            saves = []
+            for register in saved:
+                saves.append((register, len(self.lines)))
+                self.push(register)
+            start = len(self.lines)
+            if func not in self.leaves:
+                self.li(JUMP_LABEL, return_label)
+                self.push(JUMP_LABEL)
             for i, arg in enumerate(node.args):
                 self.visit(arg)
                 self.cp(self.local(i), RESULT)
+            if func in self.leaves:
+                # set only once the arguments are evaluated, as they may call other leaves
+                self.li(LINK, return_label)
             self.j_to(func_label)
+            jump = len(self.lines) - 1
             self.label(return_label)
-            for i in reversed(range(self.get_local_namespace().local_count)):
-                self.pop(self.local(i))
-            for i in reversed(range(self.arg_count)):
-                self.pop(self.arg(i))
+            restores = []
+            for register in reversed(saved):
+                self.pop(register)
+                restores.append((register, len(self.lines) - 1))
+            self.call_sites.append(CallSite(func_label, saves, restores, start, jump))
 
     def visit_FunctionDef(self, node):
-        func_label = self.get_func_label(node.name)
         end_label = self.add_label(f"end-{node.name}")
+        self.j_to(end_label)  # don't execute when defining function
+        self.emit_function(node)
+        self.label(end_label)
+
+    def emit_function(self, node):
+        func_label = self.get_func_label(node.name)
         self.enter_scope(node.name)
 
-        self.j_to(end_label)  # don't execute when defining function
         self.label(func_label)
+        start = len(self.lines)
         for arg in node.args.args:  # TODO handle kwargs, defaults, etc.
             # NB: these must be the first names created in this NS
             self.get_or_create_name(arg.arg)
-        for subnode in node.body:
-            self.visit(subnode)
-        self.pop(JUMP_LABEL)
-        self.j(JUMP_LABEL)
-        self.label(end_label)
+        if not self.visit_statements(node.body):
+            self.return_from(node.name)
+        self.functions.append(Function(func_label, start, len(self.lines)))
 
         self.exit_scope()
 
+    def visit_statements(self, statements):
+        """
+        Visits the statements in order, stopping after one which never passes control on if dead code is left out.
+        :return: whether control never passes beyond the statements
+        """
+        for statement in statements:
+            self.visit(statement)
+            if self.dead_code and terminates(statement):
+                return True
+        return False
+
     def visit_Name(self, node):
         namespace = self.get_local_namespace()
         if (node.id not in namespace):
@@ -311,23 +548,107 @@ class Visitor(ast.NodeVisitor):
         self.cp(reg, RESULT)
 
     def visit_If(self, node):
-        self.visit(node.test)
         false_label = self.add_label("else")
         end_label = self.add_label("end-if")
 
-        self.jeqz_to(RESULT, false_label)
-        for subnode in node.body:
-            self.visit(subnode)
-        self.j_to(end_label)
+        self.branch_if_false(node.test, false_label)
+        if not self.visit_statements(node.body):
+            self.j_to(end_label)
         self.label(false_label)
-        for subnode in node.orelse:
-            self.visit(subnode)
+        self.visit_statements(node.orelse)
         self.label(end_label)
 
     def visit_Return(self, node):
+        if self.inlines:
+            self.visit(node.value)
+            self.j_to(self.inlines[-1][1])
+            return
+        if self.tail_calls and self.scope != MAIN_SCOPE and self.is_function_call(node.value) \
+                and node.value.func.id not in self.inlinable:
+            self.tail_call(node.value)
+            return
         self.visit(node.value)
-        self.pop(JUMP_LABEL)
-        self.j(JUMP_LABEL)
+        self.return_from(self.scope)
+
+    def is_function_call(self, node):
+        """Checks whether the node calls a function defined in the program, rather than a built-in."""
+        return isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id not in ("print", "int")
+
+    def tail_call(self, node):
+        """
+        Calls a function in tail position by moving the arguments into its parameters and jumping to it, leaving the
+        current return address on the stack for the callee to return to.
+        """
+        func_label = self.get_func_label(node.func.id)
+        # evaluate every argument before any parameter is overwritten, as the arguments may read them
+        args = []
+        for arg in node.args:
+            self.visit(arg)
+            args.append(self.add_arg())
+            self.cp(args[-1], RESULT)
+        for i, arg in enumerate(args):
+            self.cp(self.local(i), arg)
+        for _ in args:
+            self.rem_arg()
+        start = len(self.lines)
+        if node.func.id in self.leaves:
+            # leaves return through the link register rather than the stack
+            self.pop(LINK)
+        self.j_to(func_label)
+        self.call_sites.append(CallSite(func_label, [], [], start, len(self.lines) - 1))
+
+    def visit_Module(self, node):
+        self.inlinable = inlinable_functions(node, self.inline_threshold)
+        if self.leaf_calls:
+            self.leaves = leaf_functions(node, self.inlinable)
+            if self.leaves:
+                self.registers.add(LINK)
+        if not self.dead_code:
+            self.generic_visit(node)
+            return
+        # emit the functions used after the module's own statements, so that they need not be jumped over
+        used = used_functions(node, self.inlinable)
+        self.visit_statements([subnode for subnode in node.body if not isinstance(subnode, ast.FunctionDef)])
+        definitions = [subnode for subnode in node.body
+                       if isinstance(subnode, ast.FunctionDef) and subnode.name in used]
+        if definitions:
+            self.do("halt")
+        for definition in definitions:
+            self.emit_function(definition)
+
+    def return_from(self, func):
+        """Returns from the function to the address its caller left in the link register or on the stack."""
+        if func in self.leaves:
+            self.j(LINK)
+        else:
+            self.pop(JUMP_LABEL)
+            self.j(JUMP_LABEL)
+
+    def inline(self, node):
+        """Substitutes the body of the called function for the call, with its names bound to fresh locals."""
+        definition = self.inlinable[node.func.id]
+        caller = self.get_local_namespace()
+        params = [caller.add_local() for _ in definition.args.args]
+        for param, arg in zip(params, node.args):
+            self.visit(arg)
+            self.cp(param, RESULT)
+        namespace = Namespace(self, caller.frame)
+        for arg, param in zip(definition.args.args, params):
+            namespace[arg.arg] = param
+        end_label = self.add_label(f"end-inline-{node.func.id}")
+        self.inlines.append((namespace, end_label))
+        body = definition.body
+        if self.dead_code:
+            body = next((body[:i + 1] for i, subnode in enumerate(body) if terminates(subnode)), body)
+        for subnode in body[:-1]:
+            self.visit(subnode)
+        if isinstance(body[-1], ast.Return):
+            # the last return falls through to the end
+            self.visit(body[-1].value)
+        else:
+            self.visit(body[-1])
+        self.inlines.pop()
+        self.label(end_label)
 
     def visit_UnaryOp(self, node):
         if isinstance(node.op, ast.UAdd):
@@ -344,20 +665,61 @@ class Visitor(ast.NodeVisitor):
     def visit_While(self, node):
         start_label = self.add_label("start-while")
         end_label = self.add_label("end-while")
+        infinite = isinstance(node.test, ast.Constant) and node.test.value
+        rotated = self.rotate_loops and not infinite
+
+        if rotated:
+            # guard the loop once, then test at the bottom; continue goes to the test
+            test_label = self.add_label("test-while")
+            self.branch_if_false(node.test, end_label)
+        else:
+            test_label = start_label
+        hoisted = self.hoist(node) if self.hoist_invariants else []
 
-        self.continue_labels.append(start_label)
+        self.continue_labels.append(test_label)
         self.break_labels.append(end_label)
 
         self.label(start_label)
-        self.visit(node.test)
-        self.jeqz_to(RESULT, end_label)
-        for subnode in node.body:
-            self.visit(subnode)
-        self.j_to(start_label)
+        if not rotated and not infinite:
+            self.branch_if_false(node.test, end_label)
+        terminated = self.visit_statements(node.body)
+        if rotated:
+            self.label(test_label)
+            self.branch_if_true(node.test, start_label)
+        elif not terminated:
+            self.j_to(start_label)
         self.label(end_label)
 
         self.continue_labels.pop()
         self.break_labels.pop()
+        for invariant in hoisted:
+            del self.hoisted[invariant]
+
+    def hoist(self, node):
+        """
+        Computes the invariant expressions of the loop into fresh locals, which are read in their place while the
+        loop is visited.
+        :return: the ids of the nodes hoisted
+        """
+        hoisted = []
+        for occurrences in loop_invariants(node).values():
+            if id(occurrences[0]) in self.hoisted:
+                # already hoisted out of an enclosing loop
+                continue
+            register = self.get_local_namespace().add_local()
+            self.visit(occurrences[0])
+            self.cp(register, RESULT)
+            for occurrence in occurrences:
+                self.hoisted[id(occurrence)] = register
+                hoisted.append(id(occurrence))
+        return hoisted
+
+    def visit(self, node):
+        register = self.hoisted.get(id(node))
+        if register is not None:
+            self.cp(RESULT, register)
+        else:
+            super().visit(node)
 
     # === SLIM Instructions === #
 
@@ -442,28 +804,135 @@ class Visitor(ast.NodeVisitor):
         self.ld(dest, STACK_POINTER)
 
     def do(self, cmd, *args):
-        self.lines.append(cmd + " " + ", ".join(str(arg) for arg in args))
+        self.lines.append(Instruction(cmd, args))
 
     def label(self, name):
-        self.lines.append(f"{name}:")
+        self.lines.append(Label(name))
 
     def comment(self, text):
-        self.lines.append(f";; {text}")
+        self.lines.append(Comment(text))
+
+    def prune_saves(self):
+        """Saves only the registers live across each call and written before it returns."""
+        self.lines = prune_saves(self.lines, self.call_sites, self.functions, FIXED_REGISTERS)
+        self.call_sites = []
+        self.functions = []
+
+    def thread_jumps(self):
+        """Redirects jumps to jumps to their final targets, and removes jumps to the next line and unused labels."""
+        self.lines = thread_jumps(self.lines, JUMP_LABEL)
+
+    def optimize(self):
+        """Removes redundant instructions from the lines emitted so far."""
+        self.lines = peephole.optimize(self.lines, self.registers, ZERO)
+
+    def allocate(self):
+        """Assigns physical registers to the registers named in the lines, spilling to memory if there are too few."""
+        fixed = [register for register in FIXED_REGISTERS if register in self.registers]
+        allocated = allocation.allocate(self.lines, fixed, ZERO)
+        self.lines = allocated.lines
+        self.registers = allocated.registers
+        self.stack_base = allocated.spill_slots
 
     def get_code(self):
         if len(self.registers) > 32:
             panic("Expression stack overflow.", -1)
         allo_regs = ["allocate-registers " + ", ".join(sorted(self.registers))]
-        loads = [f"li {ZERO}, 0", f"li {ONE}, 1", f"li {STACK_POINTER}, 0"]
-        halt = ["halt"]
-        return allo_regs + loads + self.lines + halt
+        loads = [f"li {ZERO}, 0", f"li {ONE}, 1", f"li {STACK_POINTER}, {self.stack_base}"]
+        # control never reaches the end of lines finishing with a return
+        halt = [] if self.lines and isinstance(self.lines[-1], Instruction) and self.lines[-1].op == "j" else ["halt"]
+        return allo_regs + loads + [str(line) for line in self.lines] + halt
 
 
 class Compiler:
+    def __init__(self, cache=None, peephole=True, fold=True, allocate=True, prune_saves=True, tail_calls=True,
+                 inline_threshold=INLINE_THRESHOLD, leaf_calls=True,
+                 dead_code=True, branch_conditions=True, rotate_loops=True, hoist_invariants=True,
+                 thread_jumps=True):
+        """
+        :param cache: a CompileCache to look up and store compiled code in, or None to always compile
+        :param peephole: whether to remove redundant instructions from the emitted code
+        :param fold: whether to fold constant expressions before emitting code
+        :param allocate: whether to allocate physical registers, rather than giving each variable its own
+        :param prune_saves: whether to save only the registers live across a call and written by it
+        :param tail_calls: whether to compile calls in tail position as jumps
+        :param inline_threshold: the size in AST nodes up to which non-recursive functions are inlined, or 0 for none
+        :param leaf_calls: whether to pass the return address of functions calling no others in a register
+        :param dead_code: whether to leave out functions never called and statements never reached
+        :param branch_conditions: whether to compile the tests of ifs and whiles to jumps rather than boolean values
+        :param rotate_loops: whether to test the condition of while loops at the bottom, guarded once before the loop
+        :param hoist_invariants: whether to compute expressions which do not change in a while loop before it
+        :param thread_jumps: whether to redirect jumps to jumps to their final targets and remove jumps to the next line
+        """
+        self.cache = cache
+        self.peephole = peephole
+        self.fold = fold
+        self.allocate = allocate
+        self.prune_saves = prune_saves
+        self.tail_calls = tail_calls
+        self.inline_threshold = inline_threshold
+        self.leaf_calls = leaf_calls
+        self.dead_code = dead_code
+        self.branch_conditions = branch_conditions
+        self.rotate_loops = rotate_loops
+        self.hoist_invariants = hoist_invariants
+        self.thread_jumps = thread_jumps
+
+    def options(self):
+        """Gets the options affecting the compiled output, which form part of the cache key."""
+        return {"peephole": self.peephole, "fold": self.fold, "allocate": self.allocate,
+                "prune_saves": self.prune_saves, "tail_calls": self.tail_calls,
+                "inline_threshold": self.inline_threshold, "leaf_calls": self.leaf_calls,
+                "dead_code": self.dead_code, "branch_conditions": self.branch_conditions,
+                "rotate_loops": self.rotate_loops, "hoist_invariants": self.hoist_invariants,
+                "thread_jumps": self.thread_jumps}
+
     def compile(self, code):
-        visitor = Visitor()
+        if self.cache is None:
+            return self.do_compile(code)
+        key = cache_key(code, VERSION, self.options())
+        compiled = self.cache.get(key)
+        if compiled is None:
+            compiled = self.do_compile(code)
+            self.cache.put(key, compiled)
+        return compiled
+
+    def compile_program(self, code):
+        """Compiles and assembles the code, reusing a cached program if there is one."""
+        if self.cache is None:
+            return assemble_program(self.do_compile(code))
+        key = cache_key(code, VERSION, self.options())
+        compiled = self.cache.get(key)
+        if compiled is None:
+            compiled = self.do_compile(code)
+        else:
+            program = self.cache.get_program(key)
+            if program is not None:
+                return Success(program)
+        program_val = assemble_program(compiled)
+        if isinstance(program_val, Success):
+            self.cache.put_program(key, compiled, program_val.value)
+        else:
+            self.cache.put(key, compiled)
+        return program_val
+
+    def do_compile(self, code):
+        visitor = Visitor(self.tail_calls, self.inline_threshold, self.leaf_calls, self.dead_code,
+                          self.branch_conditions, self.rotate_loops, self.hoist_invariants)
         tree = ast.parse(code)
+        if self.fold:
+            tree = fold(tree)
         visitor.visit(tree)
+        if self.prune_saves:
+            visitor.prune_saves()
+        if self.thread_jumps:
+            visitor.thread_jumps()
+        if self.peephole:
+            visitor.optimize()
+        if self.allocate:
+            visitor.allocate()
+            if self.peephole:
+                visitor.optimize()
         return "".join(line + "\n" for line in visitor.get_code())
 
 
@@ -0,0 +1,215 @@
+"""
+Structured SLIM lines as emitted by the compiler's Visitor, and the control- and data-flow analyses over them that
+the optimization passes share.
+"""
+
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple, Union
+
+# a register or label name, or an integer literal
+Arg = Union[str, int]
+
+
+class Instruction(NamedTuple):
+    op: str
+    args: Tuple[Arg, ...]
+
+    def __str__(self) -> str:
+        if not self.args:
+            return self.op
+        return self.op + " " + ", ".join(str(arg) for arg in self.args)
+
+
+class Label(NamedTuple):
+    name: str
+
+    def __str__(self) -> str:
+        return f"{self.name}:"
+
+
+class Comment(NamedTuple):
+    text: str
+
+    def __str__(self) -> str:
+        return f";; {self.text}"
+
+
+Line = Union[Instruction, Label, Comment]
+
+ARITHMETIC = {"add", "sub", "mul", "div", "quo", "rem"}
+COMPARISONS = {"seq", "sne", "slt", "sgt", "sle", "sge"}
+# the operations whose results are wrapped to 32 bits modulo 2 ** 32
+MODULAR = {"add", "sub", "mul"}
+# the operations without side effects, which may be removed if their result is never used;
+# the divisions are not among them as they raise an error on division by zero, nor are loads from addresses never
+# stored to, which raise a KeyError
+PURE = {"add", "sub", "mul", "li"} | COMPARISONS
+JUMPS = {"j", "jeqz"}
+
+INT_MIN = -2 ** 31
+INT_MAX = 2 ** 31 - 1
+
+
+def wrap(value: int) -> int:
+    """Wraps the value to 32 bits as SLIM does for the results of arithmetic."""
+    return (value - INT_MIN) % 2 ** 32 + INT_MIN
+
+
+def defs(instruction: Instruction) -> Tuple[Arg, ...]:
+    """Gets the registers the instruction writes."""
+    if instruction.op in ARITHMETIC or instruction.op in COMPARISONS or instruction.op in ("ld", "li", "read"):
+        return instruction.args[:1]
+    return ()
+
+
+def uses(instruction: Instruction) -> Tuple[Arg, ...]:
+    """Gets the registers the instruction reads."""
+    op, args = instruction
+    if op in ARITHMETIC or op in COMPARISONS or op == "ld":
+        return args[1:]
+    elif op in ("st", "write", "j", "jeqz"):
+        return args
+    return ()
+
+
+def is_copy(instruction: Instruction, zero: str) -> Optional[Arg]:
+    """Gets the source register if the instruction copies one register into another, as add dest, zero, src does."""
+    op, args = instruction
+    if op == "add" and args[1] == zero:
+        return args[2]
+    elif op in ("add", "sub") and args[2] == zero:
+        return args[1]
+    return None
+
+
+def address_taken(lines: List[Line]) -> Set[str]:
+    """
+    Gets the labels whose addresses escape, and are therefore the possible targets of any jump not resolved by
+    jump_targets.
+
+    A label loaded into a register escapes if the register is read other than as the target of a jump, or still holds
+    it at a label or an unconditional jump, since the value may then be read elsewhere. The register a jump goes
+    through is assumed not to be read as a value at the target, as the compiler never does so.
+    """
+    escaped: Set[str] = set()
+    held: Dict[Arg, str] = {}
+    for line in lines:
+        if isinstance(line, Label):
+            escaped.update(held.values())
+            held = {}
+        elif isinstance(line, Instruction):
+            target = line.args[-1] if line.op in JUMPS else None
+            for register in uses(line):
+                if register in held and register != target:
+                    escaped.add(held[register])
+            for register in defs(line):
+                held.pop(register, None)
+            if line.op == "li" and isinstance(line.args[1], str):
+                held[line.args[0]] = line.args[1]
+            elif line.op in ("j", "halt"):
+                escaped.update(label for register, label in held.items() if register != target)
+                held = {}
+    escaped.update(held.values())
+    return escaped
+
+
+def jump_targets(lines: List[Line]) -> Dict[int, Optional[str]]:
+    """
+    Finds the label each jump goes to where it is loaded by an li earlier in the same extended basic block, that is,
+    with no label in between.
+    :return: the target label of each jump by index, or None where it is only known at run time
+    """
+    targets: Dict[int, Optional[str]] = {}
+    values: Dict[Arg, Arg] = {}
+    for i, line in enumerate(lines):
+        if isinstance(line, Label):
+            values = {}
+        elif isinstance(line, Instruction):
+            if line.op in JUMPS:
+                target = values.get(line.args[-1])
+                targets[i] = target if isinstance(target, str) else None
+            for register in defs(line):
+                values.pop(register, None)
+            if line.op == "li":
+                values[line.args[0]] = line.args[1]
+    return targets
+
+
+def successors(lines: List[Line]) -> List[List[int]]:
+    """Gets the indices of the lines that may run after each line, where len(lines) stands for the end of the program."""
+    label_indices = {line.name: i for i, line in enumerate(lines) if isinstance(line, Label)}
+    dynamic = sorted(label_indices[label] for label in address_taken(lines) if label in label_indices)
+    targets = jump_targets(lines)
+    result: List[List[int]] = []
+    for i, line in enumerate(lines):
+        if isinstance(line, Instruction) and line.op in JUMPS:
+            target = targets[i]
+            following = [label_indices[target]] if target is not None and target in label_indices else dynamic
+            result.append(following + [i + 1] if line.op == "jeqz" else following)
+        elif isinstance(line, Instruction) and line.op == "halt":
+            result.append([len(lines)])
+        else:
+            result.append([i + 1])
+    return result
+
+
+def liveness(lines: List[Line], live_at_end: Iterable[Arg] = ()) -> List[Set[Arg]]:
+    """
+    Computes the registers live after each line, that is, those which may be read before they are next written.
+    :param lines: the lines of the program
+    :param live_at_end: the registers live once the lines have run to the end
+    :return: the registers live after each line
+    """
+    following = successors(lines)
+    predecessors: List[List[int]] = [[] for _ in range(len(lines) + 1)]
+    for i, indices in enumerate(following):
+        for j in indices:
+            predecessors[j].append(i)
+
+    live_in: List[Set[Arg]] = [set() for _ in range(len(lines))] + [set(live_at_end)]
+    live_out: List[Set[Arg]] = [set() for _ in range(len(lines))]
+    worklist = list(range(len(lines)))
+    pending = set(worklist)
+    while worklist:
+        i = worklist.pop()
+        pending.discard(i)
+        out = set().union(*(live_in[j] for j in following[i]))
+        live_out[i] = out
+        line = lines[i]
+        if isinstance(line, Instruction):
+            new_in = (out - set(defs(line))) | set(uses(line))
+        else:
+            new_in = out
+        if new_in != live_in[i]:
+            live_in[i] = new_in
+            for j in predecessors[i]:
+                if j not in pending:
+                    pending.add(j)
+                    worklist.append(j)
+    return live_out
+
+
+def bounded_registers(lines: List[Line], registers: Iterable[Arg]) -> Set[Arg]:
+    """
+    Finds the registers which always hold 32-bit values, as everything written to them is the result of arithmetic,
+    a small constant, or a load of memory which only ever holds 32-bit values.
+
+    Reads and large constants are not wrapped, so the registers they are written to are not among them, and neither
+    is memory once such a register is stored.
+    """
+    instructions = [line for line in lines if isinstance(line, Instruction)]
+    bounded = set(registers)
+    memory_bounded = True
+    changed = True
+    while changed:
+        changed = False
+        for instruction in instructions:
+            op, args = instruction
+            if op == "read" or (op == "li" and isinstance(args[1], int) and not INT_MIN <= args[1] <= INT_MAX) \
+                    or (op == "ld" and not memory_bounded):
+                if args[0] in bounded:
+                    bounded.discard(args[0])
+                    changed = True
+            elif op == "st" and args[0] not in bounded and memory_bounded:
+                memory_bounded = False
+                changed = True
+    return bounded
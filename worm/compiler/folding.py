@@ -0,0 +1,222 @@
+"""
+Folds constant expressions in the Python AST before the compiler's Visitor runs, and propagates constants assigned
+to names through straight-line code.
+
+Each folded expression is replaced by the constant the Visitor's code would leave in the result register, so SLIM's
+semantics are kept rather than Python's: the results of arithmetic wrap to 32 bits, the left operand of a binary
+operator is wrapped as it is copied into an arg register, and remainders take the sign of the dividend. Divisions by
+zero are left to fail at run time.
+"""
+
+import ast
+from typing import Dict, List, Optional, Set
+
+from worm.slim.interpreter import bound_int, swap_sign
+
+
+def constant_value(node: ast.AST) -> Optional[int]:
+    """Gets the integer value of a constant node, or None if the node is not an integer constant."""
+    if isinstance(node, ast.Constant) and isinstance(node.value, int):
+        return int(node.value)
+    return None
+
+
+def binary(op: ast.operator, left: int, right: int) -> Optional[int]:
+    """Evaluates a binary operator on the value held in an arg register and the value in the result register."""
+    if isinstance(op, ast.Add):
+        return bound_int(left + right)
+    elif isinstance(op, ast.Sub):
+        return bound_int(left - right)
+    elif isinstance(op, ast.Mult):
+        return bound_int(left * right)
+    elif isinstance(op, ast.FloorDiv) and right != 0:
+        return bound_int(left // right)
+    elif isinstance(op, ast.Mod) and right != 0:
+        a, b = swap_sign(left, right)
+        return bound_int(a % b)
+    return None
+
+
+def compare(op: ast.cmpop, left: int, right: int) -> Optional[int]:
+    if isinstance(op, ast.Eq):
+        return int(left == right)
+    elif isinstance(op, ast.NotEq):
+        return int(left != right)
+    elif isinstance(op, ast.Lt):
+        return int(left < right)
+    elif isinstance(op, ast.Gt):
+        return int(left > right)
+    elif isinstance(op, ast.LtE):
+        return int(left <= right)
+    elif isinstance(op, ast.GtE):
+        return int(left >= right)
+    return None
+
+
+def unary(op: ast.unaryop, operand: int) -> Optional[int]:
+    if isinstance(op, ast.UAdd):
+        return operand
+    elif isinstance(op, ast.USub):
+        return bound_int(-operand)
+    elif isinstance(op, ast.Not):
+        return int(operand == 0)
+    return None
+
+
+def assigned_names(node: ast.AST) -> Set[str]:
+    """Gets the names assigned anywhere within the node."""
+    return {child.id for child in ast.walk(node) if isinstance(child, ast.Name) and isinstance(child.ctx, ast.Store)}
+
+
+class ConstantFolder(ast.NodeTransformer):
+    def __init__(self):
+        # the value each name is known to hold at the point being visited
+        self.constants: Dict[str, int] = {}
+
+    def constant(self, value: int, node: ast.AST) -> ast.Constant:
+        return ast.copy_location(ast.Constant(value), node)
+
+    def assign(self, name: str, value: ast.AST) -> None:
+        """Records the value of a name after it is assigned, as copied into its register."""
+        folded = constant_value(value)
+        if folded is None:
+            self.constants.pop(name, None)
+        else:
+            self.constants[name] = bound_int(folded)
+
+    def forget(self, names: Set[str]) -> None:
+        for name in names:
+            self.constants.pop(name, None)
+
+    # === Expressions === #
+
+    def visit_BinOp(self, node):
+        self.generic_visit(node)
+        left, right = constant_value(node.left), constant_value(node.right)
+        if left is not None and right is not None:
+            value = binary(node.op, bound_int(left), right)
+            if value is not None:
+                return self.constant(value, node)
+        return node
+
+    def visit_BoolOp(self, node):
+        if len(node.values) != 2:
+            self.generic_visit(node)
+            self.forget(assigned_names(node))
+            return node
+        left = self.visit(node.values[0])
+        left_value = constant_value(left)
+        if left_value is not None:
+            if isinstance(node.op, ast.And) and left_value == 0 or isinstance(node.op, ast.Or) and left_value != 0:
+                return left
+            return self.visit(node.values[1])
+        right = self.visit(node.values[1])
+        # the right operand is only evaluated some of the time
+        self.forget(assigned_names(right))
+        node.values = [left, right]
+        return node
+
+    def visit_Compare(self, node):
+        self.generic_visit(node)
+        if len(node.ops) != 1:
+            return node
+        left, right = constant_value(node.left), constant_value(node.comparators[0])
+        if left is not None and right is not None:
+            value = compare(node.ops[0], bound_int(left), right)
+            if value is not None:
+                return self.constant(value, node)
+        return node
+
+    def visit_Name(self, node):
+        if isinstance(node.ctx, ast.Load) and node.id in self.constants:
+            return self.constant(self.constants[node.id], node)
+        return node
+
+    def visit_NamedExpr(self, node):
+        node.value = self.visit(node.value)
+        self.assign(node.target.id, node.value)
+        return node
+
+    def visit_UnaryOp(self, node):
+        self.generic_visit(node)
+        operand = constant_value(node.operand)
+        if operand is not None:
+            value = unary(node.op, operand)
+            if value is not None:
+                return self.constant(value, node)
+        return node
+
+    # === Statements === #
+
+    def visit_Assign(self, node):
+        node.value = self.visit(node.value)
+        for target in node.targets:
+            if isinstance(target, ast.Name):
+                self.assign(target.id, node.value)
+        return node
+
+    def visit_AugAssign(self, node):
+        node.value = self.visit(node.value)
+        name = node.target.id
+        current, operand = self.constants.get(name), constant_value(node.value)
+        if current is not None and operand is not None:
+            value = binary(node.op, current, operand)
+            if value is not None:
+                self.constants[name] = value
+                target = ast.copy_location(ast.Name(name, ast.Store()), node.target)
+                return ast.copy_location(ast.Assign([target], self.constant(value, node)), node)
+        self.constants.pop(name, None)
+        return node
+
+    def visit_FunctionDef(self, node):
+        # functions have their own registers, and start knowing nothing of their arguments
+        outer = self.constants
+        self.constants = {}
+        node.body = self.visit_body(node.body)
+        self.constants = outer
+        return node
+
+    def visit_If(self, node):
+        node.test = self.visit(node.test)
+        test = constant_value(node.test)
+        if test is not None:
+            return self.visit_body(node.body if test != 0 else node.orelse)
+        before = self.constants
+        self.constants = dict(before)
+        node.body = self.visit_body(node.body)
+        after_body = self.constants
+        self.constants = dict(before)
+        node.orelse = self.visit_body(node.orelse)
+        self.constants = {name: value for name, value in self.constants.items() if after_body.get(name) == value}
+        return node
+
+    def visit_While(self, node):
+        # names assigned in the loop may hold any of their values at the start of an iteration or after it
+        self.forget(assigned_names(node))
+        before = dict(self.constants)
+        node.test = self.visit(node.test)
+        if constant_value(node.test) == 0:
+            self.constants = before
+            return node.orelse
+        node.body = self.visit_body(node.body)
+        self.constants = before
+        return node
+
+    def visit_body(self, body: List[ast.stmt]) -> List[ast.stmt]:
+        result: List[ast.stmt] = []
+        for statement in body:
+            visited = self.visit(statement)
+            if isinstance(visited, list):
+                result.extend(visited)
+            elif visited is not None:
+                result.append(visited)
+        return result
+
+    def visit_Module(self, node):
+        node.body = self.visit_body(node.body)
+        return node
+
+
+def fold(tree: ast.AST) -> ast.AST:
+    """Folds the constant expressions in the tree, modifying it in place."""
+    return ConstantFolder().visit(tree)
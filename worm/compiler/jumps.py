@@ -0,0 +1,144 @@
+"""
+Simplifies the jumps between the blocks of the lines emitted by the compiler's Visitor.
+
+The Visitor jumps by loading a label into the jump register and jumping through it, and each statement ends with jumps
+and labels of its own, so nested statements leave chains of jumps to jumps, jumps to the very next line, and runs of
+labels marking the same place. Labels in a run are merged into the first, references to a label followed only by a
+jump are redirected to that jump's target, jumps to the next line are removed, and so are the lines after an
+unconditional jump which no label leads to and the labels nothing refers to.
+
+A label is only referred to by the instructions loading it, so redirecting a reference is sound wherever the label is
+loaded, as the code at the label would only have jumped on.
+"""
+
+from typing import Dict, List, Optional, Set
+
+from worm.compiler.flow import JUMPS, Instruction, Label, Line
+
+
+def next_instruction(lines: List[Line], start: int) -> Optional[int]:
+    """Gets the index of the first instruction at or after the start, skipping labels and comments."""
+    for i in range(start, len(lines)):
+        if isinstance(lines[i], Instruction):
+            return i
+    return None
+
+
+def loaded_label(line: Line, register: str) -> Optional[str]:
+    """Gets the label the line loads into the register, if it does."""
+    if isinstance(line, Instruction) and line.op == "li" and line.args[0] == register and isinstance(line.args[1], str):
+        return line.args[1]
+    return None
+
+
+def jumps_through(line: Line, register: str) -> bool:
+    return isinstance(line, Instruction) and line.op in JUMPS and line.args[-1] == register
+
+
+def rename_labels(lines: List[Line], names: Dict[str, str]) -> List[Line]:
+    """Replaces the labels loaded by the instructions according to the names."""
+    result: List[Line] = []
+    for line in lines:
+        if isinstance(line, Instruction) and line.op == "li":
+            label = line.args[1]
+            if isinstance(label, str) and label in names:
+                line = Instruction("li", (line.args[0], names[label]))
+        result.append(line)
+    return result
+
+
+def merge_labels(lines: List[Line]) -> List[Line]:
+    """Merges each run of labels with only comments between them into the first."""
+    names: Dict[str, str] = {}
+    result: List[Line] = []
+    first: Optional[str] = None
+    for line in lines:
+        if isinstance(line, Label):
+            if first is None:
+                first = line.name
+                result.append(line)
+            else:
+                names[line.name] = first
+        else:
+            if isinstance(line, Instruction):
+                first = None
+            result.append(line)
+    return rename_labels(result, names)
+
+
+def thread(lines: List[Line], register: str) -> List[Line]:
+    """Redirects the references to labels followed only by a jump to the final target of the jump."""
+    hops: Dict[str, str] = {}
+    for i, line in enumerate(lines):
+        if isinstance(line, Label):
+            j = next_instruction(lines, i)
+            if j is None or j + 1 >= len(lines):
+                continue
+            target = loaded_label(lines[j], register)
+            jump = lines[j + 1]
+            if target is not None and isinstance(jump, Instruction) and jump.op == "j" \
+                    and jumps_through(jump, register):
+                hops[line.name] = target
+
+    names: Dict[str, str] = {}
+    for label in hops:
+        seen: Set[str] = {label}
+        target = hops[label]
+        while target in hops and target not in seen:
+            seen.add(target)
+            target = hops[target]
+        if target in seen:
+            # a loop jumping to itself forever is left as it is
+            continue
+        names[label] = target
+    return rename_labels(lines, names)
+
+
+def remove_jumps_to_next(lines: List[Line], register: str) -> List[Line]:
+    """Removes the jumps, conditional or not, to labels which the jump would fall through to anyway."""
+    removed: Set[int] = set()
+    for i in range(len(lines) - 1):
+        label = loaded_label(lines[i], register)
+        if label is None or not jumps_through(lines[i + 1], register):
+            continue
+        j = i + 2
+        while j < len(lines) and not isinstance(lines[j], Instruction):
+            following = lines[j]
+            if isinstance(following, Label) and following.name == label:
+                removed.update((i, i + 1))
+                break
+            j += 1
+    return [line for i, line in enumerate(lines) if i not in removed]
+
+
+def remove_unreachable(lines: List[Line]) -> List[Line]:
+    """Removes the instructions after an unconditional jump or halt up to the next label, and unused labels."""
+    referenced = {line.args[1] for line in lines if isinstance(line, Instruction) and line.op == "li"}
+    result: List[Line] = []
+    reachable = True
+    for line in lines:
+        if isinstance(line, Label):
+            if line.name not in referenced:
+                continue
+            reachable = True
+        elif isinstance(line, Instruction):
+            if not reachable:
+                continue
+            if line.op in ("j", "halt"):
+                reachable = False
+        result.append(line)
+    return result
+
+
+def thread_jumps(lines: List[Line], register: str) -> List[Line]:
+    """
+    Simplifies the jumps in the lines until there are none left to simplify.
+    :param lines: the lines as emitted
+    :param register: the register which the Visitor loads the target of each jump into just before jumping
+    :return: the lines with fewer jumps and labels
+    """
+    while True:
+        simplified = remove_unreachable(remove_jumps_to_next(thread(merge_labels(lines), register), register))
+        if simplified == lines:
+            return simplified
+        lines = simplified
@@ -0,0 +1,58 @@
+"""
+Finds the expressions in a while loop which may be computed once before it rather than on every iteration.
+
+An expression is invariant if it has no side effects, reads no name assigned anywhere in the loop, and cannot fail,
+so that computing it before the loop changes nothing but the number of times it is computed. Divisions and remainders
+are never hoisted, as they fail on division by zero where the loop might not have reached them.
+"""
+
+import ast
+from typing import Dict, List
+
+from worm.compiler.folding import assigned_names
+
+
+def is_pure(node: ast.AST) -> bool:
+    """Checks whether the expression reads only names and integer constants, and can neither fail nor write."""
+    if isinstance(node, ast.Name):
+        return isinstance(node.ctx, ast.Load)
+    elif isinstance(node, ast.Constant):
+        return isinstance(node.value, int)
+    elif isinstance(node, ast.BinOp):
+        return isinstance(node.op, (ast.Add, ast.Sub, ast.Mult)) and is_pure(node.left) and is_pure(node.right)
+    elif isinstance(node, ast.UnaryOp):
+        return isinstance(node.op, (ast.UAdd, ast.USub, ast.Not)) and is_pure(node.operand)
+    elif isinstance(node, ast.Compare):
+        return len(node.ops) == 1 and is_pure(node.left) and is_pure(node.comparators[0])
+    elif isinstance(node, ast.BoolOp):
+        return len(node.values) == 2 and all(map(is_pure, node.values))
+    return False
+
+
+def read_names(node: ast.AST) -> List[str]:
+    return [child.id for child in ast.walk(node) if isinstance(child, ast.Name) and isinstance(child.ctx, ast.Load)]
+
+
+def loop_invariants(loop: ast.While) -> Dict[str, List[ast.expr]]:
+    """
+    Finds the largest invariant expressions in the loop which compute something from at least one name.
+    :return: the occurrences of each invariant expression in the loop, by its dump
+    """
+    assigned = assigned_names(loop)
+    invariants: Dict[str, List[ast.expr]] = {}
+
+    def search(node: ast.AST) -> None:
+        if isinstance(node, ast.FunctionDef):
+            return
+        if isinstance(node, (ast.BinOp, ast.UnaryOp, ast.Compare, ast.BoolOp)) and is_pure(node):
+            names = read_names(node)
+            if names and not assigned.intersection(names):
+                invariants.setdefault(ast.dump(node), []).append(node)
+                return
+        for child in ast.iter_child_nodes(node):
+            search(child)
+
+    search(loop.test)
+    for statement in loop.body:
+        search(statement)
+    return invariants
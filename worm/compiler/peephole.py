@@ -0,0 +1,109 @@
+"""
+Removes redundant instructions from the lines emitted by the compiler's Visitor.
+
+Within each extended basic block, that is, the lines between two labels, copies are propagated into the instructions
+using them, copies of known constants become loads of those constants, and reloads of a register with the value it
+already holds are dropped. Instructions after an unconditional jump and before the next label are never run, and are
+dropped too. Finally, instructions without side effects whose results are never used are removed, and the whole is
+repeated until nothing changes.
+
+As SLIM wraps the results of arithmetic but not of reads or loads of constants, a copy only holds exactly the value of
+its source if the source is known to be a 32-bit value. Otherwise the copy is only propagated into additions,
+subtractions and multiplications, whose results are the same either way.
+"""
+
+from typing import Dict, Iterable, List, Set
+
+from worm.compiler.flow import (
+    ARITHMETIC, COMPARISONS, INT_MAX, INT_MIN, MODULAR, PURE, Arg, Instruction, Label, Line, bounded_registers, defs,
+    is_copy, liveness, wrap,
+)
+
+
+def propagate(lines: List[Line], zero: str, bounded: Set[Arg]) -> List[Line]:
+    result: List[Line] = []
+    # the constant or label each register is known to hold
+    values: Dict[Arg, Arg] = {}
+    # the register each register is known to be a copy of
+    copies: Dict[Arg, Arg] = {}
+    local_bounded = set(bounded)
+    reachable = True
+    for line in lines:
+        if isinstance(line, Label):
+            values, copies, local_bounded = {}, {}, set(bounded)
+            reachable = True
+        elif not isinstance(line, Instruction):
+            pass
+        elif not reachable:
+            continue
+        else:
+            line = substitute(line, copies, local_bounded)
+            source = is_copy(line, zero)
+            if source is not None and source in values:
+                value = values[source]
+                line = Instruction("li", (line.args[0], wrap(value) if isinstance(value, int) else value))
+            elif source is not None and source == line.args[0] and source in local_bounded:
+                continue
+            if line.op == "li" and line.args[0] in values and values[line.args[0]] == line.args[1] \
+                    and type(values[line.args[0]]) is type(line.args[1]):
+                continue
+
+            for register in defs(line):
+                values.pop(register, None)
+                copies.pop(register, None)
+                copies = {copy: original for copy, original in copies.items() if original != register}
+                if line.op in ARITHMETIC or line.op in COMPARISONS or (line.op == "ld" and register in bounded) \
+                        or (line.op == "li" and (isinstance(line.args[1], str) or INT_MIN <= line.args[1] <= INT_MAX)):
+                    local_bounded.add(register)
+                else:
+                    local_bounded.discard(register)
+            source = is_copy(line, zero)
+            if line.op == "li":
+                values[line.args[0]] = line.args[1]
+            elif source is not None and source != line.args[0]:
+                copies[line.args[0]] = source
+            if line.op in ("j", "halt"):
+                reachable = False
+        result.append(line)
+    return result
+
+
+def substitute(instruction: Instruction, copies: Dict[Arg, Arg], bounded: Set[Arg]) -> Instruction:
+    """Replaces the registers the instruction reads with the registers they are copies of, where that is exact."""
+    op, args = instruction
+    if op in ("li", "read"):
+        return instruction
+    first_use = 1 if defs(instruction) else 0
+    new_args = list(args)
+    for i in range(first_use, len(args)):
+        original = copies.get(args[i])
+        if original is not None and (op in MODULAR or original in bounded):
+            new_args[i] = original
+    return Instruction(op, tuple(new_args))
+
+
+def remove_dead(lines: List[Line], live_at_end: Iterable[Arg]) -> List[Line]:
+    live = liveness(lines, live_at_end)
+    return [line for line, live_out in zip(lines, live)
+            if not (isinstance(line, Instruction) and line.op in PURE and not set(defs(line)) & live_out)]
+
+
+def count_instructions(lines: List[Line]) -> int:
+    return sum(1 for line in lines if isinstance(line, Instruction))
+
+
+def optimize(lines: List[Line], registers: Iterable[Arg], zero: str, live_at_end: Iterable[Arg] = ()) -> List[Line]:
+    """
+    Removes redundant instructions from the lines until there are none left to remove.
+    :param lines: the lines as emitted
+    :param registers: the names of all registers the lines use
+    :param zero: the register which always holds zero
+    :param live_at_end: the registers read after the last line
+    :return: the optimized lines
+    """
+    bounded = bounded_registers(lines, registers)
+    while True:
+        optimized = remove_dead(propagate(lines, zero, bounded), live_at_end)
+        if optimized == lines:
+            return optimized
+        lines = optimized
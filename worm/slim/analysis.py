@@ -0,0 +1,374 @@
+"""
+Control-flow and register analyses of decoded SLIM programs, shared by the optimizations and execution engines.
+
+SLIM only jumps through registers. A jump through a register loaded by an li earlier in the same basic block, or
+through a register which every write loads with the same constant, goes to a known address and gives a static edge.
+Any other jump is dynamic, like a return through an address popped off the stack, and may go to any address an li
+loads which escapes, that is, whose register is read other than by the jump it feeds or still holds it at the end of
+its block. Addresses computed by arithmetic are assumed never to be jumped to.
+When the program's labels are known, only the constants equal to a label's address are taken for addresses.
+
+For dominators and loops, a block ending in a static jump which lets an address escape is taken for a call: it
+flows to the blocks at the escaping addresses, where the callee returns to, and the callee's entry is a root of its
+own. Other escaping addresses are roots as well, so that dominance is never claimed over a dynamic jump.
+
+Every analysis takes time linear in the size of the program, but for the dominators, which take near-linear time on
+the graphs compiled code gives, and the loops, which take time linear in the total size of their bodies.
+"""
+
+from bisect import bisect_right
+from typing import Dict, FrozenSet, List, NamedTuple, Optional, Set, Tuple, Union
+
+from worm.slim import resolver
+from worm.slim.decoder import (Instruction, Program, ADD, SUB, MUL, DIV, QUO, REM, SEQ, SNE, SLT, SGT, SLE, SGE, LD, ST,
+                               LI, WRITE, J, JEQZ, HALT, decode, normalize)
+from worm.slim.fusion import WRITERS
+from worm.slim.namer import NamedProgram
+from worm.util.validation import Success
+
+# opcodes reading the registers named by their second and third operands
+BINARY = {ADD, SUB, MUL, DIV, QUO, REM, SEQ, SNE, SLT, SGT, SLE, SGE}
+# opcodes ending a basic block
+ENDS = {J, JEQZ, HALT}
+
+
+class Loop(NamedTuple):
+    # the block every iteration starts at, which dominates the others
+    header: int
+    # the blocks of the loop, including the header
+    blocks: FrozenSet[int]
+
+
+def defs(instruction: Instruction) -> Tuple[int, ...]:
+    """Gets the registers a normalized instruction writes."""
+    op, a, b, c = instruction
+    return (a,) if op in WRITERS else ()
+
+
+def uses(instruction: Instruction) -> Tuple[int, ...]:
+    """Gets the registers a normalized instruction reads."""
+    op, a, b, c = instruction
+    if op in BINARY:
+        return b, c
+    elif op == LD:
+        return (b,)
+    elif op in (ST, JEQZ):
+        return a, b
+    elif op in (WRITE, J):
+        return (a,)
+    return ()
+
+
+def jump_register(instruction: Instruction) -> Optional[int]:
+    """Gets the register holding the target of a normalized jump, or None for any other instruction."""
+    op, a, b, c = instruction
+    if op == J:
+        return a
+    elif op == JEQZ:
+        return b
+    return None
+
+
+def find_starts(code: List[Instruction], addresses: Set[int]) -> List[int]:
+    """Finds the first address of each basic block, given the addresses which may be jumped to."""
+    size = len(code)
+    starts = {0} if size else set()
+    for i, instruction in enumerate(code):
+        if instruction[0] in ENDS and i + 1 < size:
+            starts.add(i + 1)
+    starts.update(address for address in addresses if 0 <= address < size)
+    return sorted(starts)
+
+
+def constant_registers(code: List[Instruction]) -> Dict[int, int]:
+    """
+    Finds the registers which are only ever written by an li of the same constant, as hand-written programs load
+    their labels once at the start. Such a register is taken to hold its constant throughout.
+    """
+    constants: Dict[int, int] = {}
+    varying: Set[int] = set()
+    for instruction in code:
+        for register in defs(instruction):
+            if instruction[0] != LI or constants.get(register, instruction[2]) != instruction[2]:
+                varying.add(register)
+            else:
+                constants[register] = instruction[2]
+    return {register: value for register, value in constants.items() if register not in varying}
+
+
+def scan(code: List[Instruction], reads: List[Tuple[int, ...]], starts: List[int], constants: Dict[int, int],
+         is_address) -> Tuple[List[Optional[int]], List[List[int]]]:
+    """
+    Follows the constants loaded into registers through each block.
+    :param reads: the registers each instruction reads
+    :return: the static target of the jump ending each block, if any, and the addresses escaping each block
+    """
+    targets: List[Optional[int]] = []
+    escapes: List[List[int]] = []
+    for block, start in enumerate(starts):
+        end = starts[block + 1] if block + 1 < len(starts) else len(code)
+        # the constant each register holds from an li earlier in the block
+        known: Dict[int, int] = dict(constants)
+        escaped: List[int] = []
+        target = None
+        through = None
+        for pc in range(start, end):
+            op, a, b, c = code[pc]
+            through = a if op == J else b if op == JEQZ else None
+            for register in reads[pc]:
+                if register in known and register != through:
+                    escaped.append(known[register])
+            if through is not None:
+                target = known.get(through)
+            elif op == LI:
+                known[a] = b
+            elif op in WRITERS:
+                known.pop(a, None)
+        # the register a jump goes through is assumed not to be read as a value where it lands, and the reads of
+        # constant registers are seen wherever they are, so neither lets an address escape here
+        escaped.extend(value for register, value in known.items() if register != through and register not in constants)
+        targets.append(target)
+        escapes.append([value for value in escaped if is_address(value)])
+    return targets, escapes
+
+
+class ControlFlowGraph:
+    """
+    The basic blocks of a program, numbered in address order, with their edges and the registers they define and use.
+
+    Registers are given as bit sets, with bit i standing for register i.
+    """
+
+    def __init__(self, program: Program):
+        if any(not 0 <= instruction[0] <= HALT for instruction in program.code):
+            raise ValueError("Cannot analyze a fused program.")
+        code = [normalize(instruction) for instruction in program.code]
+        reads = [uses(instruction) for instruction in code]
+        size = len(code)
+        if program.labels:
+            label_addresses = set(program.labels.values())
+            is_address = lambda value: value in label_addresses  # noqa: E731
+        else:
+            is_address = lambda value: 0 <= value < size  # noqa: E731
+
+        # first split at every constant which may be an address, then only where the scan found one used as such
+        constants = constant_registers(code)
+        loaded = {instruction[2] for instruction in code if instruction[0] == LI and is_address(instruction[2])}
+        targets, escapes = scan(code, reads, find_starts(code, loaded), constants, is_address)
+        addresses = {target for target in targets if target is not None}
+        addresses.update(value for escaped in escapes for value in escaped)
+        self.code = code
+        self.starts = find_starts(code, addresses)
+        targets, escapes = scan(code, reads, self.starts, constants, is_address)
+
+        self.successors: List[List[int]] = []
+        # the addresses of the jumps whose targets are only known at run time, and whether each block ends in one
+        self.dynamic_jumps: List[int] = []
+        self.dynamic: List[bool] = []
+        self.defs: List[int] = []
+        self.uses: List[int] = []
+        for block, start in enumerate(self.starts):
+            end = self.end(block)
+            last = code[end - 1]
+            following: List[int] = []
+            target = targets[block]
+            self.dynamic.append(last[0] in (J, JEQZ) and target is None)
+            if last[0] in (J, JEQZ):
+                if target is None:
+                    self.dynamic_jumps.append(end - 1)
+                elif 0 <= target < size:
+                    following.append(self.block_of(target))
+            if last[0] not in (J, HALT) and end < size and block + 1 not in following:
+                following.append(block + 1)
+            self.successors.append(following)
+
+            defined = used = 0
+            for pc in range(start, end):
+                for register in reads[pc]:
+                    if not defined >> register & 1:
+                        used |= 1 << register
+                if code[pc][0] in WRITERS:
+                    defined |= 1 << code[pc][1]
+            self.defs.append(defined)
+            self.uses.append(used)
+
+        # the blocks a dynamic jump may go to
+        self.entries = sorted({self.block_of(value) for escaped in escapes for value in escaped if 0 <= value < size})
+        # the blocks each call returns to, by the calling block
+        self.calls: Dict[int, List[int]] = {}
+        for block, escaped in enumerate(escapes):
+            last = code[self.end(block) - 1]
+            if last[0] == J and targets[block] is not None and escaped:
+                self.calls[block] = sorted({self.block_of(value) for value in escaped if 0 <= value < size})
+
+        self._flow: Optional[Tuple[List[List[int]], List[int]]] = None
+        self._predecessors: Optional[List[List[int]]] = None
+        self._idom: Optional[List[Optional[int]]] = None
+        self._order: Optional[Tuple[List[int], List[int]]] = None
+        self._loops: Optional[List[Loop]] = None
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def end(self, block: int) -> int:
+        """Gets the address just past the last instruction of the block."""
+        return self.starts[block + 1] if block + 1 < len(self.starts) else len(self.code)
+
+    def block_of(self, address: int) -> int:
+        """Gets the block holding the instruction at the address."""
+        return bisect_right(self.starts, address) - 1
+
+    # === Dominators and loops === #
+
+    def flow(self) -> Tuple[List[List[int]], List[int]]:
+        """
+        Gets the edges that dominators and loops are found over, with calls flowing to the blocks they return to.
+        :return: the successors of each block, and the roots control may enter at
+        """
+        if self._flow is None:
+            following = [list(successors) for successors in self.successors]
+            roots = {0} if self.starts else set()
+            returns: Set[int] = set()
+            for block, sites in self.calls.items():
+                roots.update(following[block])
+                following[block] = sites
+                returns.update(sites)
+            roots.update(entry for entry in self.entries if entry not in returns)
+            self._flow = following, sorted(roots)
+        return self._flow
+
+    def predecessors(self) -> List[List[int]]:
+        if self._predecessors is None:
+            following, _ = self.flow()
+            self._predecessors = [[] for _ in self.starts]
+            for block, successors in enumerate(following):
+                for successor in successors:
+                    self._predecessors[successor].append(block)
+        return self._predecessors
+
+    def dominators(self) -> List[Optional[int]]:
+        """
+        Gets the immediate dominator of each block, by the iterative algorithm of Cooper, Harvey and Kennedy over the
+        blocks in reverse postorder.
+        :return: the immediate dominator of each block, or None for roots and blocks that cannot be reached
+        """
+        if self._idom is not None:
+            return self._idom
+        following, roots = self.flow()
+        predecessors = self.predecessors()
+        count = len(self.starts)
+        # a virtual root, numbered after the blocks, flows to every root
+        root = count
+        postorder: List[int] = []
+        visited = [False] * (count + 1)
+        visited[root] = True
+        stack: List[Tuple[int, int]] = [(root, 0)]
+        while stack:
+            block, index = stack[-1]
+            successors = roots if block == root else following[block]
+            if index < len(successors):
+                stack[-1] = (block, index + 1)
+                successor = successors[index]
+                if not visited[successor]:
+                    visited[successor] = True
+                    stack.append((successor, 0))
+            else:
+                stack.pop()
+                postorder.append(block)
+        number = [-1] * (count + 1)
+        for i, block in enumerate(postorder):
+            number[block] = i
+
+        idom: List[int] = [-1] * (count + 1)
+        idom[root] = root
+        root_set = set(roots)
+        changed = True
+        while changed:
+            changed = False
+            for block in reversed(postorder[:-1]):
+                candidates = [p for p in predecessors[block] if idom[p] != -1]
+                if block in root_set:
+                    candidates.append(root)
+                new = candidates[0]
+                for other in candidates[1:]:
+                    a, b = new, other
+                    while a != b:
+                        while number[a] < number[b]:
+                            a = idom[a]
+                        while number[b] < number[a]:
+                            b = idom[b]
+                    new = a
+                if idom[block] != new:
+                    idom[block] = new
+                    changed = True
+        self._idom = [None if dominator in (-1, root) else dominator for dominator in idom[:count]]
+        return self._idom
+
+    def dominator_order(self) -> Tuple[List[int], List[int]]:
+        """Numbers the blocks in pre- and postorder of the dominator tree, to check dominance in constant time."""
+        if self._order is None:
+            idom = self.dominators()
+            count = len(self.starts)
+            children: List[List[int]] = [[] for _ in range(count)]
+            tops: List[int] = []
+            for block, dominator in enumerate(idom):
+                (tops if dominator is None else children[dominator]).append(block)
+            pre = [0] * count
+            post = [0] * count
+            clock = 0
+            for top in tops:
+                stack = [(top, False)]
+                while stack:
+                    block, done = stack.pop()
+                    if done:
+                        post[block] = clock
+                    else:
+                        pre[block] = clock
+                        stack.append((block, True))
+                        stack.extend((child, False) for child in reversed(children[block]))
+                    clock += 1
+            self._order = pre, post
+        return self._order
+
+    def dominates(self, a: int, b: int) -> bool:
+        """Checks whether every path from a root to block b passes through block a."""
+        pre, post = self.dominator_order()
+        return pre[a] <= pre[b] and post[b] <= post[a]
+
+    def loops(self) -> List[Loop]:
+        """Finds the natural loops, merging the loops sharing a header, in the order of their headers."""
+        if self._loops is None:
+            following, _ = self.flow()
+            predecessors = self.predecessors()
+            pre, post = self.dominator_order()
+            bodies: Dict[int, Set[int]] = {}
+            for block, successors in enumerate(following):
+                for header in successors:
+                    if pre[header] <= pre[block] and post[block] <= post[header]:
+                        body = bodies.setdefault(header, {header})
+                        stack = [block] if block not in body else []
+                        body.add(block)
+                        while stack:
+                            for predecessor in predecessors[stack.pop()]:
+                                if predecessor not in body and pre[header] <= pre[predecessor] \
+                                        and post[predecessor] <= post[header]:
+                                    body.add(predecessor)
+                                    stack.append(predecessor)
+            self._loops = [Loop(header, frozenset(bodies[header])) for header in sorted(bodies)]
+        return self._loops
+
+
+def analyze(program: Union[Program, NamedProgram]) -> ControlFlowGraph:
+    """
+    Gets the control-flow graph of a decoded or named program, caching it on the program.
+    Named programs are resolved and decoded first, and raise a ValueError if they cannot be.
+    """
+    if "analysis" not in program.cache:
+        if isinstance(program, NamedProgram):
+            resolved = resolver.resolve(program)
+            if not isinstance(resolved, Success):
+                raise ValueError("Cannot analyze a program which does not resolve.")
+            program.cache["analysis"] = analyze(decode(resolved.value, program.registers, program.labels))
+        else:
+            program.cache["analysis"] = ControlFlowGraph(program)
+    return program.cache["analysis"]  # type: ignore
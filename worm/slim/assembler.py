@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+
+import pathlib
+import sys
+
+from worm.slim import objfile
+from worm.slim.stream import assemble_lines
+from worm.util.validation import Failure, Success
+
+
+def main():
+    if len(sys.argv) not in (2, 3):
+        print(f"Usage: {sys.argv[0]} INPUT.slim [OUTPUT{objfile.SUFFIX}]", file=sys.stderr)
+        exit(2)
+    source = pathlib.Path(sys.argv[1])
+    target = pathlib.Path(sys.argv[2]) if len(sys.argv) == 3 else source.with_suffix(objfile.SUFFIX)
+    with source.open() as source_file:
+        program_val = assemble_lines(source_file)
+    if isinstance(program_val, Failure):
+        for error in program_val.value:
+            print(error.get_message(), file=sys.stderr)
+        exit(1)
+    elif isinstance(program_val, Success):
+        try:
+            objfile.dump(program_val.value, target)
+        except objfile.ObjectFileError as e:
+            print(e, file=sys.stderr)
+            exit(1)
+
+
+if __name__ == "__main__":
+    main()
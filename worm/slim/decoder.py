@@ -0,0 +1,134 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from worm.slim.resolver import COMMANDS, ResolvedCommand, ResolvedLine
+
+Instruction = Tuple[int, int, int, int]
+
+ADD = 0
+SUB = 1
+MUL = 2
+DIV = 3
+QUO = 4
+REM = 5
+SEQ = 6
+SNE = 7
+SLT = 8
+SGT = 9
+SLE = 10
+SGE = 11
+LD = 12
+ST = 13
+LI = 14
+READ = 15
+WRITE = 16
+J = 17
+JEQZ = 18
+HALT = 19
+
+# fused opcodes, produced by fusion.fuse and never by decoding
+JUMP_TO = 20
+BRANCH_TO = 21
+MOVE = 22
+PUSH = 23
+POP = 24
+RETURN = 25
+MOVE_MOVE = 26
+MOVE_LI = 27
+
+NUM_REGISTERS = 32
+
+OPCODES: Dict[str, int] = {
+    "add": ADD,
+    "sub": SUB,
+    "mul": MUL,
+    "div": DIV,
+    "quo": QUO,
+    "rem": REM,
+    "seq": SEQ,
+    "sne": SNE,
+    "slt": SLT,
+    "sgt": SGT,
+    "sle": SLE,
+    "sge": SGE,
+    "ld": LD,
+    "st": ST,
+    "li": LI,
+    "read": READ,
+    "write": WRITE,
+    "j": J,
+    "jeqz": JEQZ,
+    "halt": HALT,
+}
+
+NAMES: Dict[int, str] = {
+    **{opcode: name for name, opcode in OPCODES.items()},
+    JUMP_TO: "jump-to",
+    BRANCH_TO: "branch-to",
+    MOVE: "move",
+    PUSH: "push",
+    POP: "pop",
+    RETURN: "return",
+    MOVE_MOVE: "move-move",
+    MOVE_LI: "move-li",
+}
+
+# the number of leading operands holding register indices, per opcode
+REGISTER_OPERANDS: Dict[int, int] = {
+    ADD: 3, SUB: 3, MUL: 3, DIV: 3, QUO: 3, REM: 3,
+    SEQ: 3, SNE: 3, SLT: 3, SGT: 3, SLE: 3, SGE: 3,
+    LD: 2, ST: 2, LI: 1, READ: 1, WRITE: 1, J: 1, JEQZ: 2, HALT: 0,
+    JUMP_TO: 1, BRANCH_TO: 2, MOVE: 2, PUSH: 3, POP: 3, RETURN: 3, MOVE_MOVE: 3, MOVE_LI: 2,
+}
+
+
+class Program:
+    """
+    A resolved program decoded into fixed-width instructions.
+
+    Each instruction is a tuple (opcode, a, b, c), with unused operands set to 0.
+    The register and label names are kept when known, for writing object files.
+    """
+
+    def __init__(self, code: List[Instruction], registers: Optional[Dict[str, int]] = None,
+                 labels: Optional[Dict[str, int]] = None):
+        self.code = code
+        self.registers = registers or {}
+        self.labels = labels or {}
+        self.cache: Dict[str, object] = {}
+
+    def __len__(self) -> int:
+        return len(self.code)
+
+
+def normalize(instruction: Instruction) -> Instruction:
+    """Maps the register operands of an instruction into the range of register indices."""
+    op, *args = instruction
+    count = REGISTER_OPERANDS[op]
+    a, b, c = [arg % NUM_REGISTERS if i < count else arg for i, arg in enumerate(args)]
+    return op, a, b, c
+
+
+def in_range(instruction: Instruction) -> bool:
+    """Checks whether all register operands of an instruction name a register."""
+    op, *args = instruction
+    return all(-NUM_REGISTERS <= arg < NUM_REGISTERS for arg in args[:REGISTER_OPERANDS[op]])
+
+
+def decode_command(command: ResolvedCommand) -> Instruction:
+    args = command.args + (0,) * (3 - len(command.args))
+    return OPCODES[command.cmd], args[0], args[1], args[2]
+
+
+def decode(commands: Sequence[ResolvedLine], registers: Optional[Dict[str, int]] = None,
+           labels: Optional[Dict[str, int]] = None) -> Program:
+    code = [decode_command(command) for command in commands if isinstance(command, ResolvedCommand)]
+    return Program(code, registers, labels)
+
+
+def encode(program: Program) -> List[ResolvedCommand]:
+    """Converts an unfused program back into resolved commands."""
+    commands = []
+    for op, *args in program.code:
+        name = NAMES[op]
+        commands.append(ResolvedCommand(name, args[:len(COMMANDS[name])]))
+    return commands
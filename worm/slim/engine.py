@@ -0,0 +1,173 @@
+from typing import List, Optional
+
+from worm.slim.decoder import Program
+from worm.slim.memory import Memory
+from worm.util.console import Console
+
+INT_MIN = -2 ** 31
+INT_MAX = 2 ** 31 - 1
+INT_RANGE = 2 ** 32
+
+
+class DecodedSLIM:
+    """
+    A SLIM machine executing a decoded program, fused or not.
+
+    The dispatch loop keeps the pointer, the registers and the memory in local variables,
+    and branches on integer opcodes rather than looking up a method per instruction.
+    `steps` counts the instructions dispatched, each fused instruction counting once.
+    The memory is a dictionary unless another, such as a FlatMemory, is given.
+    """
+
+    def __init__(self, program: Program, console: Console, memory: Optional[Memory] = None):
+        self.mem: Memory = {} if memory is None else memory
+        self.registers: List[int] = [0 for _ in range(32)]
+        self.program = program
+        self.pointer = 0
+        self.console = console
+        self.steps = 0
+
+    def execute(self) -> None:
+        self.run(0, len(self.program.code), False)
+
+    def run(self, low: int, high: int, backward: bool, quantum: int = 0) -> bool:
+        """
+        Runs instructions for as long as the pointer stays within [low, high).
+        :param low: the first address of the range to run
+        :param high: the address just past the range to run
+        :param backward: whether to stop as soon as a jump to an earlier or the same address is taken
+        :param quantum: the number of instructions to run before stopping at such a jump, if stopping at all
+        :return: whether execution stopped at such a backward jump
+        """
+        code = self.program.code
+        r = self.registers
+        mem = self.mem
+        read = self.console.read_int
+        write = self.console.write_int
+        pc = self.pointer
+        steps = 0
+        try:
+            while low <= pc < high:
+                op, a, b, c = code[pc]
+                steps += 1
+                if op == 0:  # add
+                    v = r[b] + r[c]
+                    r[a] = v if INT_MIN <= v <= INT_MAX else (v - INT_MIN) % INT_RANGE + INT_MIN
+                    pc += 1
+                elif op == 14:  # li
+                    r[a] = b
+                    pc += 1
+                elif op == 17:  # j
+                    if backward and r[a] <= pc and steps >= quantum:
+                        pc = r[a]
+                        return True
+                    pc = r[a]
+                elif op == 18:  # jeqz
+                    if r[a] != 0:
+                        pc += 1
+                    elif backward and r[b] <= pc and steps >= quantum:
+                        pc = r[b]
+                        return True
+                    else:
+                        pc = r[b]
+                elif op == 20:  # jump-to: li a, b; j a
+                    r[a] = b
+                    if backward and b <= pc + 1 and steps >= quantum:
+                        pc = b
+                        return True
+                    pc = b
+                elif op == 21:  # branch-to: li b, c; jeqz a, b
+                    r[b] = c
+                    if r[a] != 0:
+                        pc += 2
+                    elif backward and c <= pc + 1 and steps >= quantum:
+                        pc = c
+                        return True
+                    else:
+                        pc = c
+                elif op == 22:  # move: add a, zero, b
+                    v = r[b]
+                    r[a] = v if INT_MIN <= v <= INT_MAX else (v - INT_MIN) % INT_RANGE + INT_MIN
+                    pc += 1
+                elif op == 26:  # move-move: add c, zero, ...; add a, zero, b
+                    v = r[c]
+                    r[b] = v = v if INT_MIN <= v <= INT_MAX else (v - INT_MIN) % INT_RANGE + INT_MIN
+                    r[a] = v
+                    pc += 2
+                elif op == 27:  # move-li: add a, zero, b; li b, c
+                    v = r[b]
+                    r[a] = v if INT_MIN <= v <= INT_MAX else (v - INT_MIN) % INT_RANGE + INT_MIN
+                    r[b] = c
+                    pc += 2
+                elif op == 23:  # push: st a, b; add b, b, c
+                    mem[r[b]] = r[a]
+                    v = r[b] + r[c]
+                    r[b] = v if INT_MIN <= v <= INT_MAX else (v - INT_MIN) % INT_RANGE + INT_MIN
+                    pc += 2
+                elif op == 24:  # pop: sub b, b, c; ld a, b
+                    v = r[b] - r[c]
+                    r[b] = v if INT_MIN <= v <= INT_MAX else (v - INT_MIN) % INT_RANGE + INT_MIN
+                    r[a] = mem[r[b]]
+                    pc += 2
+                elif op == 25:  # return: sub b, b, c; ld a, b; j a
+                    v = r[b] - r[c]
+                    r[b] = v if INT_MIN <= v <= INT_MAX else (v - INT_MIN) % INT_RANGE + INT_MIN
+                    r[a] = mem[r[b]]
+                    if backward and r[a] <= pc + 2 and steps >= quantum:
+                        pc = r[a]
+                        return True
+                    pc = r[a]
+                elif op == 1:  # sub
+                    v = r[b] - r[c]
+                    r[a] = v if INT_MIN <= v <= INT_MAX else (v - INT_MIN) % INT_RANGE + INT_MIN
+                    pc += 1
+                elif op == 13:  # st
+                    mem[r[b]] = r[a]
+                    pc += 1
+                elif op == 12:  # ld
+                    r[a] = mem[r[b]]
+                    pc += 1
+                elif op == 2:  # mul
+                    v = r[b] * r[c]
+                    r[a] = v if INT_MIN <= v <= INT_MAX else (v - INT_MIN) % INT_RANGE + INT_MIN
+                    pc += 1
+                elif op == 6:  # seq
+                    r[a] = int(r[b] == r[c])
+                    pc += 1
+                elif op == 7:  # sne
+                    r[a] = int(r[b] != r[c])
+                    pc += 1
+                elif op == 8:  # slt
+                    r[a] = int(r[b] < r[c])
+                    pc += 1
+                elif op == 9:  # sgt
+                    r[a] = int(r[b] > r[c])
+                    pc += 1
+                elif op == 10:  # sle
+                    r[a] = int(r[b] <= r[c])
+                    pc += 1
+                elif op == 11:  # sge
+                    r[a] = int(r[b] >= r[c])
+                    pc += 1
+                elif op == 3 or op == 4:  # div, quo
+                    v = r[b] // r[c]
+                    r[a] = v if INT_MIN <= v <= INT_MAX else (v - INT_MIN) % INT_RANGE + INT_MIN
+                    pc += 1
+                elif op == 5:  # rem
+                    x = r[b]
+                    y = r[c]
+                    v = -x % -y if (x < 0) != (y < 0) else x % y
+                    r[a] = v if INT_MIN <= v <= INT_MAX else (v - INT_MIN) % INT_RANGE + INT_MIN
+                    pc += 1
+                elif op == 15:  # read
+                    r[a] = read()
+                    pc += 1
+                elif op == 16:  # write
+                    write(r[a])
+                    pc += 1
+                else:  # halt
+                    return False
+        finally:
+            self.pointer = pc
+            self.steps += steps
+        return False
@@ -0,0 +1,77 @@
+from typing import List, Optional, Set
+
+from worm.slim.decoder import (Instruction, Program, ADD, SUB, MUL, DIV, QUO, REM, SEQ, SNE, SLT, SGT, SLE, SGE, LD, ST,
+                               LI, READ, J, JEQZ, HALT, JUMP_TO, BRANCH_TO, MOVE, PUSH, POP, RETURN, MOVE_MOVE, MOVE_LI,
+                               NUM_REGISTERS, in_range,
+                               normalize)
+
+# opcodes writing the register named by their first operand
+WRITERS = {ADD, SUB, MUL, DIV, QUO, REM, SEQ, SNE, SLT, SGT, SLE, SGE, LD, LI, READ}
+
+
+def zero_registers(code: List[Instruction]) -> Set[int]:
+    """Finds the registers that always hold zero, being written only by li with a constant of 0."""
+    zeros = set(range(NUM_REGISTERS))
+    for op, a, b, c in code:
+        if op in WRITERS and not (op == LI and b == 0):
+            zeros.discard(a)
+    return zeros
+
+
+def move_source(instruction: Instruction, zeros: Set[int]) -> Optional[int]:
+    """Gets the register an instruction copies into its first operand, if it is an add of a zero register."""
+    op, a, b, c = instruction
+    if op == ADD and b in zeros:
+        return c
+    elif op == ADD and c in zeros:
+        return b
+    return None
+
+
+def fuse_at(code: List[Instruction], i: int, zeros: Set[int]) -> Instruction:
+    """Gets the instruction to dispatch at an address, fusing it with the instructions following it if possible."""
+    op, a, b, c = code[i]
+    following = code[i + 1] if i + 1 < len(code) else (HALT, 0, 0, 0)
+    next_op, next_a, next_b, next_c = following
+    source = move_source(code[i], zeros)
+    if op == LI and next_op == J and next_a == a:
+        # li x, label; j x
+        return JUMP_TO, a, b, 0
+    elif op == LI and next_op == JEQZ and next_b == a:
+        # li x, label; jeqz src, x
+        return BRANCH_TO, next_a, a, b
+    elif op == ST and next_op == ADD and next_a == b and next_b == b:
+        # st src, sp; add sp, sp, step
+        return PUSH, a, b, next_c
+    elif op == SUB and b == a and next_op == LD and next_b == a:
+        # sub sp, sp, step; ld dest, sp
+        after = code[i + 2] if i + 2 < len(code) else (HALT, 0, 0, 0)
+        if after[0] == J and after[1] == next_a:
+            # ...; j dest
+            return RETURN, next_a, a, c
+        return POP, next_a, a, c
+    elif source is not None and move_source(following, zeros) == a:
+        # add x, zero, src; add dest, zero, x
+        return MOVE_MOVE, next_a, a, source
+    elif source is not None and next_op == LI and next_a == source:
+        # add dest, zero, src; li src, const
+        return MOVE_LI, a, source, next_b
+    elif source is not None:
+        # add dest, zero, src
+        return MOVE, a, source, 0
+    return op, a, b, c
+
+
+def fuse(program: Program) -> Program:
+    """
+    Rewrites common instruction sequences of compiled code into fused instructions.
+
+    The fused instruction replaces the first instruction of its sequence and leaves the following ones
+    in place, so every address keeps its meaning and jumps into the middle of a sequence still work.
+    Programs using register indices outside the register file are returned unfused.
+    """
+    if not all(in_range(instruction) for instruction in program.code):
+        return Program(list(program.code))
+    code = [normalize(instruction) for instruction in program.code]
+    zeros = zero_registers(code)
+    return Program([fuse_at(code, i, zeros) for i in range(len(code))])
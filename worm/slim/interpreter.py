@@ -1,12 +1,20 @@
 #!/usr/bin/env python3
 
 import sys
-from typing import Dict, List, Tuple
-
-from worm.slim import parser, namer, resolver
-from worm.slim.resolver import ResolvedCommand
-from worm.util.console import Console, StdIoConsole
-from worm.util.validation import Failure, Success, flatmap
+from typing import Callable, Dict, Iterable, List, Optional, Protocol, Tuple
+
+from worm.slim import objfile
+from worm.slim.decoder import Program, encode
+from worm.slim.engine import DecodedSLIM
+from worm.slim.fusion import fuse
+from worm.slim.memory import FlatMemory, Memory
+from worm.slim.error import CompilationError
+from worm.slim.resolver import ResolvedCommand, ResolvedLine
+from worm.slim.stream import assemble_lines
+from worm.slim.tracer import TracingSLIM
+from worm.slim.translator import TranslatedSLIM
+from worm.util.console import BufferedConsole, Console, StdIoConsole
+from worm.util.validation import Failure, Success, Validation, flatmap
 
 
 class HaltException(Exception):
@@ -34,8 +42,8 @@ def swap_sign(a: int, b: int) -> Tuple[int, int]:
 
 
 class SLIM:
-    def __init__(self, commands: List[ResolvedCommand], console: Console):
-        self.mem: Dict[int, int] = {}
+    def __init__(self, commands: List[ResolvedCommand], console: Console, memory: Optional[Memory] = None):
+        self.mem: Memory = {} if memory is None else memory
         self.registers = [0 for _ in range(32)]
         self.commands = commands
         self.pointer = 0
@@ -116,11 +124,11 @@ class SLIM:
         self.next_line()
 
     def read(self, dest):
-        self.registers[dest] = int(self.console.read())
+        self.registers[dest] = self.console.read_int()
         self.next_line()
 
     def write(self, src):
-        self.console.write(str(self.registers[src]))
+        self.console.write_int(self.registers[src])
         self.next_line()
 
     def j(self, addr):
@@ -136,29 +144,92 @@ class SLIM:
         raise HaltException
 
 
-class Interpreter:
+def assemble(code: str) -> Validation[List[ResolvedLine], CompilationError]:
+    def resolved(program: Program) -> Validation[List[ResolvedLine], CompilationError]:
+        lines: List[ResolvedLine] = list(encode(program))
+        return Success(lines)
+
+    return flatmap(assemble_program(code), resolved)
+
+
+def assemble_program(code: str) -> Validation[Program, CompilationError]:
+    """Assembles the code into a decoded program, keeping its register and label names."""
+    return assemble_lines(code.splitlines())
 
-    def __init__(self, console: Console):
-        self.console = console
 
-    def interpret(self, code: str) -> None:
+class Machine(Protocol):
+    def execute(self) -> None:
+        pass
 
-        parsed_val = parser.parse(code.splitlines())
-        named_val = flatmap(parsed_val, namer.do_name)
-        resolved_val = flatmap(named_val, resolver.resolve)
 
-        if isinstance(resolved_val, Failure):
-            for error in resolved_val.value:
+ENGINES: Dict[str, Callable[[Program, Console, Memory], Machine]] = {
+    "reference": lambda program, console, memory: SLIM(encode(program), console, memory),
+    "decoded": DecodedSLIM,
+    "fused": lambda program, console, memory: DecodedSLIM(fuse(program), console, memory),
+    "translated": TranslatedSLIM,
+    "tracing": lambda program, console, memory: TracingSLIM(program, console, memory=memory),
+}
+
+
+class Interpreter:
+
+    def __init__(self, console: Console, engine: str = "decoded", flat_memory: bool = False):
+        """
+        :param console: the console the programs read from and write to
+        :param engine: the name of the engine to run the programs on
+        :param flat_memory: whether to give the machines a FlatMemory rather than a dictionary as their memory
+        """
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine '{engine}'.")
+        self.console = console
+        self.engine = engine
+        self.flat_memory = flat_memory
+
+    def interpret(self, code: str) -> Optional[Machine]:
+        """
+        Runs the code on the selected engine.
+        :param code: the SLIM source to run
+        :return: the machine after running, or None if the code failed to compile
+        """
+        return self.interpret_lines(code.splitlines())
+
+    def interpret_lines(self, lines: Iterable[str]) -> Optional[Machine]:
+        """
+        Runs the code read line by line, such as from an open file, on the selected engine.
+        :param lines: the lines of SLIM source to run
+        :return: the machine after running, or None if the code failed to compile
+        """
+        program_val = assemble_lines(lines)
+        if isinstance(program_val, Failure):
+            for error in program_val.value:
                 self.console.write_error(error.get_message())
-        elif isinstance(resolved_val, Success):
-            compiled = resolved_val.value
-            SLIM(compiled, self.console).execute()
+        elif isinstance(program_val, Success):
+            return self.execute(program_val.value)
+        return None
+
+    def execute(self, program: Program) -> Machine:
+        """
+        Runs an assembled program on the selected engine, flushing the console once it stops, even on an error.
+        :param program: the program to run
+        :return: the machine after running
+        """
+        memory: Memory = FlatMemory() if self.flat_memory else {}
+        machine = ENGINES[self.engine](program, self.console, memory)
+        try:
+            machine.execute()
+        finally:
+            self.console.flush()
+        return machine
 
 
 def main():
-    with open(sys.argv[1]) as input_file:
-        lines = [line for line in input_file.readlines()]
-    Interpreter(StdIoConsole("")).interpret("".join(lines))
+    # prompt for input only when someone is there to type it
+    console = StdIoConsole("") if sys.stdin.isatty() else BufferedConsole()
+    if objfile.is_object_file(sys.argv[1]):
+        Interpreter(console).execute(objfile.load(sys.argv[1]))
+    else:
+        with open(sys.argv[1]) as input_file:
+            Interpreter(console).interpret_lines(input_file)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,94 @@
+"""
+A flat memory for the SLIM machines, holding the values at low addresses in a growable array.
+
+Programs from the compiler keep their spilled registers at the bottom of memory and their stack just above, so the
+addresses they use run densely up from 0. A dictionary spends a hashed entry on each of them, and keeps every entry
+once a deep recursion has returned; the array holds each value in four bytes, doubling in size as higher addresses
+are written, up to a ceiling. Negative addresses, addresses at or above the ceiling, and values outside the 32-bit
+range of the array are kept in a dictionary instead.
+
+Reading an address never written raises a KeyError, as it does for the dictionary the machines use by default.
+"""
+
+from array import array
+from typing import Dict, Iterator, MutableMapping
+
+# held at the addresses in the array never written; a value equal to it is kept in the dictionary instead
+UNWRITTEN = -2 ** 31
+INT_MAX = 2 ** 31 - 1
+
+INITIAL_CAPACITY = 64
+# the default number of addresses the array may grow to, taking 64MiB
+DEFAULT_CEILING = 2 ** 24
+
+# the memory of a SLIM machine, a dictionary unless a FlatMemory is given
+Memory = MutableMapping[int, int]
+
+
+class FlatMemory(MutableMapping[int, int]):
+    """
+    A memory holding the addresses from 0 up to a ceiling in an array, and any others in a dictionary.
+
+    `high_water` is one past the highest address written, which for compiled programs is the number of spill slots
+    plus the deepest the stack has grown. `capacity` is the number of addresses the array has grown to hold.
+    """
+
+    def __init__(self, ceiling: int = DEFAULT_CEILING):
+        if ceiling < 0:
+            raise ValueError("The ceiling of a flat memory cannot be negative.")
+        self.ceiling = ceiling
+        self.cells = array("i", [UNWRITTEN]) * min(INITIAL_CAPACITY, ceiling)
+        self.others: Dict[int, int] = {}
+        self.high_water = 0
+
+    @property
+    def capacity(self) -> int:
+        return len(self.cells)
+
+    def __getitem__(self, address: int) -> int:
+        # negative indices would count back from the end of the array
+        if address >= 0:
+            try:
+                value = self.cells[address]
+                if value != UNWRITTEN:
+                    return value
+            except IndexError:
+                pass
+        return self.others[address]
+
+    def __setitem__(self, address: int, value: int) -> None:
+        if address >= self.high_water:
+            self.high_water = address + 1
+        if 0 <= address < self.ceiling and UNWRITTEN < value <= INT_MAX:
+            if address >= len(self.cells):
+                self.grow(address)
+            self.cells[address] = value
+            if self.others:
+                self.others.pop(address, None)
+        else:
+            if 0 <= address < len(self.cells):
+                self.cells[address] = UNWRITTEN
+            self.others[address] = value
+
+    def __delitem__(self, address: int) -> None:
+        if 0 <= address < len(self.cells) and self.cells[address] != UNWRITTEN:
+            self.cells[address] = UNWRITTEN
+        else:
+            del self.others[address]
+
+    def __iter__(self) -> Iterator[int]:
+        for address, value in enumerate(self.cells):
+            if value != UNWRITTEN:
+                yield address
+        yield from self.others
+
+    def __len__(self) -> int:
+        return len(self.cells) - self.cells.count(UNWRITTEN) + len(self.others)
+
+    def grow(self, address: int) -> None:
+        """Doubles the size of the array until it holds the address, which must be below the ceiling."""
+        capacity = max(len(self.cells), 1)
+        while capacity <= address:
+            capacity *= 2
+        capacity = min(capacity, self.ceiling)
+        self.cells.extend(array("i", [UNWRITTEN]) * (capacity - len(self.cells)))
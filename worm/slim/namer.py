@@ -1,4 +1,4 @@
-from typing import List, Dict
+from typing import Dict, List, Sequence
 
 from worm.slim.error import CompilationError
 from worm.slim.parser import ParsedLine, ParsedAlloc, ParsedCommand, ParsedLabel
@@ -6,35 +6,23 @@ from worm.util.validation import Validation, Success, Failure
 
 
 class NamedCommand:
-    def __init__(self, cmd: str, args: List[str], line: int):
+    __slots__ = ("cmd", "args", "line")
+
+    def __init__(self, cmd: str, args: Sequence[str], line: int):
         self.cmd = cmd
-        self.args = args
+        self.args = tuple(args)
         self.line = line
 
 
 class NamedProgram:
+    __slots__ = ("lines", "registers", "labels", "cache")
+
     def __init__(self, lines: List[NamedCommand], registers: Dict[str, int], labels: Dict[str, int]):
         self.lines = lines
         self.registers = registers
         self.labels = labels
-
-
-class NamingResult:
-    pass
-
-
-class Label(NamingResult):
-    def __init__(self, name: str):
-        self.name = name
-
-
-class Line(NamingResult):
-    def __init__(self, value: NamedCommand):
-        self.value = value
-
-
-class Noop(NamingResult):
-    pass
+        # analyses of the program, by name
+        self.cache: Dict[str, object] = {}
 
 
 class NoMoreRegistersError(CompilationError):
@@ -68,20 +56,19 @@ NUM_REGISTERS = 32
 
 
 def do_name(code: List[ParsedLine]) -> Validation[NamedProgram, CompilationError]:
+    """
+    Associates labels with the commands following them, and register names with their indices.
+    :param code: the parsed lines
+    :return: the named program, or the naming errors
+    """
     registers: Dict[str, int] = {}
     labels: Dict[str, int] = {}
-
-    # TODO docs
-    def visit(line: ParsedLine, line_num: int, acc_labels: List[str]) -> Validation[NamingResult, CompilationError]:
-        """
-        Performs naming on the given line.
-        :param line: the line on which to perform naming
-        :param line_num: the line number of this line in the output
-        :param acc_labels: the labels to associate with this line
-        :return: a tuple (line, label) of the new line and next label, or a list of naming errors
-        """
+    errors: List[CompilationError] = []
+    named_lines: List[NamedCommand] = []
+    # the labels to associate with the next command
+    label_list: List[str] = []
+    for line in code:
         if isinstance(line, ParsedAlloc):
-            errors: List[CompilationError] = []
             for name in line.names:
                 if name in registers or name in labels:
                     errors.append(RegisterInUseError(name, line.line))
@@ -89,37 +76,18 @@ def do_name(code: List[ParsedLine]) -> Validation[NamedProgram, CompilationError
                     errors.append(NoMoreRegistersError(name, line.line))
                 else:
                     registers[name] = len(registers)
-            if errors:
-                return Failure(errors)
-            else:
-                return Success(Noop())
         elif isinstance(line, ParsedCommand):
-            for label in acc_labels:
-                labels[label] = line_num
-            return Success(Line(NamedCommand(line.cmd, line.args, line.line)))
+            for label in label_list:
+                labels[label] = len(named_lines)
+            label_list = []
+            named_lines.append(NamedCommand(line.cmd, line.args, line.line))
         elif isinstance(line, ParsedLabel):
             if line.name in registers or line.name in labels:
-                return Failure([LabelInUseError(line.name, line.line)])
+                errors.append(LabelInUseError(line.name, line.line))
             else:
-                return Success(Label(line.name))
+                label_list.append(line.name)
         else:
             raise TypeError
-
-    errors = []
-    named_lines = []
-    label_list: List[str] = []
-    line_num = 0
-    for line in code:
-        result = visit(line, line_num, label_list)
-        if isinstance(result, Success):
-            if isinstance(result.value, Label):
-                label_list.append(result.value.name)
-            elif isinstance(result.value, Line):
-                named_lines.append(result.value.value)
-                line_num += 1
-                label_list = []
-        elif isinstance(result, Failure):
-            errors.extend(result.value)
     if errors:
         return Failure(errors)
     else:
@@ -0,0 +1,132 @@
+"""
+Reads and writes assembled SLIM programs as binary object files.
+
+An object file holds, in little-endian order:
+
+1. A header: the magic bytes, the format version, and the numbers of instructions, registers and labels.
+2. The opcodes, one byte per instruction, padded to a multiple of 4 bytes.
+3. The operands, three signed 32-bit integers per instruction.
+4. The register names in index order, each as a 16-bit length followed by UTF-8 bytes.
+5. The labels, each as a name like the registers' followed by its 32-bit address.
+"""
+
+import array
+import mmap
+import pathlib
+import struct
+import sys
+from typing import Dict, Tuple, Union
+
+from worm.slim.decoder import NAMES, Program
+
+MAGIC = b"SLIMOBJ\0"
+VERSION = 1
+SUFFIX = ".slimo"
+
+HEADER = struct.Struct("<8sHxxIII")
+NAME_LENGTH = struct.Struct("<H")
+ADDRESS = struct.Struct("<I")
+
+INT32_MIN = -2 ** 31
+INT32_MAX = 2 ** 31 - 1
+
+Path = Union[str, pathlib.Path]
+
+
+class ObjectFileError(Exception):
+    pass
+
+
+def pad(size: int) -> int:
+    return -size % 4
+
+
+def dumps(program: Program) -> bytes:
+    """Encodes the program as the contents of an object file."""
+    opcodes = array.array("B", [op for op, _, _, _ in program.code])
+    operands = array.array("i")
+    for op, a, b, c in program.code:
+        if not all(INT32_MIN <= arg <= INT32_MAX for arg in (a, b, c)):
+            raise ObjectFileError(f"Operand of instruction {len(operands) // 3} does not fit in 32 bits.")
+        operands.extend((a, b, c))
+    if sys.byteorder == "big":
+        operands.byteswap()
+
+    parts = [HEADER.pack(MAGIC, VERSION, len(program.code), len(program.registers), len(program.labels)),
+             opcodes.tobytes(), bytes(pad(len(opcodes))), operands.tobytes()]
+    for name in sorted(program.registers, key=program.registers.__getitem__):
+        encoded = name.encode()
+        parts += [NAME_LENGTH.pack(len(encoded)), encoded]
+    for name, address in program.labels.items():
+        encoded = name.encode()
+        parts += [NAME_LENGTH.pack(len(encoded)), encoded, ADDRESS.pack(address)]
+    return b"".join(parts)
+
+
+def read_name(data: memoryview, offset: int) -> Tuple[str, int]:
+    (length,) = NAME_LENGTH.unpack_from(data, offset)
+    offset += NAME_LENGTH.size
+    return bytes(data[offset:offset + length]).decode(), offset + length
+
+
+def loads(data: Union[bytes, memoryview, mmap.mmap]) -> Program:
+    """Decodes a program from the contents of an object file."""
+    with memoryview(data) as view:
+        if len(view) < HEADER.size:
+            raise ObjectFileError("Object file is truncated.")
+        magic, version, size, register_count, label_count = HEADER.unpack_from(view)
+        if magic != MAGIC:
+            raise ObjectFileError("Not a SLIM object file.")
+        elif version != VERSION:
+            raise ObjectFileError(f"Unsupported object file version {version}.")
+
+        offset = HEADER.size
+        opcodes = view[offset:offset + size].tolist()
+        if opcodes and max(opcodes) not in NAMES:
+            raise ObjectFileError(f"Unknown opcode {max(opcodes)}.")
+        offset += size + pad(size)
+        if len(view) < offset + 12 * size:
+            raise ObjectFileError("Object file is truncated.")
+        operands = array.array("i")
+        operands.frombytes(view[offset:offset + 12 * size])
+        if sys.byteorder == "big":
+            operands.byteswap()
+        offset += 12 * size
+        code = list(zip(opcodes, operands[0::3], operands[1::3], operands[2::3]))
+
+        registers: Dict[str, int] = {}
+        labels: Dict[str, int] = {}
+        try:
+            for index in range(register_count):
+                name, offset = read_name(view, offset)
+                registers[name] = index
+            for _ in range(label_count):
+                name, offset = read_name(view, offset)
+                (labels[name],) = ADDRESS.unpack_from(view, offset)
+                offset += ADDRESS.size
+        except struct.error as e:
+            raise ObjectFileError("Object file is truncated.") from e
+    return Program(code, registers, labels)
+
+
+def dump(program: Program, path: Path) -> None:
+    pathlib.Path(path).write_bytes(dumps(program))
+
+
+def load(path: Path) -> Program:
+    """Loads a program from an object file, mapping it into memory rather than reading it."""
+    with open(path, "rb") as file:
+        if not is_object(file.read(len(MAGIC))):
+            raise ObjectFileError("Not a SLIM object file.")
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return loads(mapped)
+
+
+def is_object(prefix: bytes) -> bool:
+    return prefix.startswith(MAGIC)
+
+
+def is_object_file(path: Path) -> bool:
+    """Checks whether the file starts like an object file rather than SLIM text."""
+    with open(path, "rb") as file:
+        return is_object(file.read(len(MAGIC)))
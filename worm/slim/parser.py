@@ -1,32 +1,37 @@
 import re
-from typing import List
+from typing import List, Optional, Sequence
 
 from worm.slim.error import CompilationError
-from worm.util.option import Option, Some, Nothing, flatten
 from worm.util.regex import either, capture, separated
 from worm.util.validation import Validation, Success
 
 
 class ParsedLine:
-    pass
+    __slots__ = ()
 
 
 class ParsedCommand(ParsedLine):
-    def __init__(self, cmd: str, args: List[str], line: int):
+    __slots__ = ("cmd", "args", "line")
+
+    def __init__(self, cmd: str, args: Sequence[str], line: int):
         self.cmd = cmd
-        self.args = args
+        self.args = tuple(args)
         self.line = line
 
 
 class ParsedLabel(ParsedLine):
+    __slots__ = ("name", "line")
+
     def __init__(self, name: str, line: int):
         self.name = name
         self.line = line
 
 
 class ParsedAlloc(ParsedLine):
-    def __init__(self, name: List[str], line: int):
-        self.names = name
+    __slots__ = ("names", "line")
+
+    def __init__(self, name: Sequence[str], line: int):
+        self.names = tuple(name)
         self.line = line
 
 
@@ -37,31 +42,41 @@ ARG = either(NAME, NUMBER)
 COMMAND = r"[a-z-]+"
 
 
+LABEL_PATTERN = re.compile(capture(NAME) + ":")
+ALLOC_PATTERN = re.compile(r"allocate-registers\s+" + capture(separated(NAME, ARG_SPLIT)))
+COMMAND_PATTERN = re.compile(capture(COMMAND) + capture(ARG_SPLIT + separated(ARG, ARG_SPLIT)) + "?")
+SPLIT_PATTERN = re.compile(ARG_SPLIT)
+
+
 def parse(code: List[str]) -> Validation[List[ParsedLine], CompilationError]:
     # removes comments and leading/trailing whitespace
     def clean_line(line: str) -> str:
         return line.split(";", maxsplit=1)[0].strip()
 
-    def visit(line: str, line_num: int) -> Option[ParsedLine]:
+    def visit(line: str, line_num: int) -> Optional[ParsedLine]:
         if line == "":
-            return Nothing()
+            return None
         # TODO allow space between name and colon?
-        elif match := re.fullmatch(capture(NAME) + ":", line):
-            return Some(ParsedLabel(match[1], line_num))  # type: ignore
-        elif match := re.fullmatch(r"allocate-registers\s+" + capture(separated(NAME, ARG_SPLIT)), line):
-            names = [name.strip() for name in re.split(ARG_SPLIT, match[1])]  # type: ignore
-            return Some(ParsedAlloc(names, line_num))
-        elif match := re.fullmatch(capture(COMMAND) + capture(ARG_SPLIT + separated(ARG, ARG_SPLIT)) + "?", line):
-            cmd = match[1]  # type: ignore
-            arg_string = match[2]  # type: ignore
+        elif match := LABEL_PATTERN.fullmatch(line):
+            return ParsedLabel(match[1], line_num)
+        elif match := ALLOC_PATTERN.fullmatch(line):
+            names = [name.strip() for name in SPLIT_PATTERN.split(match[1])]
+            return ParsedAlloc(names, line_num)
+        elif match := COMMAND_PATTERN.fullmatch(line):
+            cmd = match[1]
+            arg_string = match[2]
             if arg_string is None:
                 args = []
             else:
-                args = [arg.strip() for arg in re.split(ARG_SPLIT, arg_string) if arg.strip()]  # TODO slightly hacky
+                args = [arg.strip() for arg in SPLIT_PATTERN.split(arg_string) if arg.strip()]  # TODO slightly hacky
 
-            return Some(ParsedCommand(cmd, args, line_num))
+            return ParsedCommand(cmd, args, line_num)
         else:
             raise Exception  # TODO collect
 
-    parsed_lines = [visit(clean_line(line), i) for i, line in enumerate(code, start=1)]
-    return Success(flatten(parsed_lines))
+    parsed_lines = []
+    for i, line in enumerate(code, start=1):
+        parsed = visit(clean_line(line), i)
+        if parsed is not None:
+            parsed_lines.append(parsed)
+    return Success(parsed_lines)
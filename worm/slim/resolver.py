@@ -1,10 +1,10 @@
 from enum import Enum
-from typing import List, Dict
+from typing import Dict, List, Sequence
 import re
 
 from worm.slim.error import CompilationError
 from worm.slim.namer import NamedProgram, NamedCommand
-from worm.util.validation import Validation, Success, Failure, sequence
+from worm.util.validation import Validation, Success, Failure
 
 
 class Value(Enum):
@@ -36,14 +36,19 @@ COMMANDS: Dict[str, List[Value]] = {
 }
 
 
+INTEGER_PATTERN = re.compile(r"-?\d+")
+
+
 class ResolvedLine:
-    pass
+    __slots__ = ()
 
 
 class ResolvedCommand(ResolvedLine):
-    def __init__(self, cmd: str, args: List[int]):
+    __slots__ = ("cmd", "args")
+
+    def __init__(self, cmd: str, args: Sequence[int]):
         self.cmd = cmd
-        self.args = args
+        self.args = tuple(args)
 
 
 class UnknownOpcodeError(CompilationError):
@@ -109,7 +114,7 @@ class ExpectedLabelError(CompilationError):
 
 def resolve(program: NamedProgram) -> Validation[List[ResolvedLine], CompilationError]:
     def visit_arg(arg: str, expected: Value, line: int) -> Validation[int, CompilationError]:
-        if re.fullmatch(r"-?\d+", arg):
+        if INTEGER_PATTERN.fullmatch(arg):
             return Success(int(arg))
         elif arg in program.registers:
             if expected == Value.Register:
@@ -148,4 +153,15 @@ def resolve(program: NamedProgram) -> Validation[List[ResolvedLine], Compilation
         else:
             raise Exception
 
-    return sequence([visit(line) for line in program.lines])
+    errors: List[CompilationError] = []
+    resolved_lines: List[ResolvedLine] = []
+    for line in program.lines:
+        result = visit(line)
+        if isinstance(result, Failure):
+            errors.extend(result.value)
+        elif isinstance(result, Success) and not errors:
+            resolved_lines.append(result.value)
+    if errors:
+        return Failure(errors)
+    else:
+        return Success(resolved_lines)
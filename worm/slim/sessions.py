@@ -0,0 +1,126 @@
+"""
+Runs many interactive sessions of SLIM programs at once on an asyncio event loop, in one thread.
+
+Each session is an AsyncSLIM machine, which runs the decoded dispatch loop until it must wait for input or has run a
+quantum of instructions, then yields to the event loop so the other sessions get their turn. The loop can only stop
+at a jump to an earlier or the same address, which every loop and any unbounded run of instructions takes, so a
+session runs at most the length of its program past its quantum before yielding.
+
+The sessions of an AsyncInterpreter share one decoded program, fused once if at all, which no machine modifies.
+"""
+
+import asyncio
+from typing import Optional
+
+from worm.slim.decoder import Program
+from worm.slim.engine import DecodedSLIM
+from worm.slim.fusion import fuse
+from worm.slim.memory import Memory
+from worm.util.console import AsyncConsole, Console
+
+# the number of instructions a session runs before yielding to the others
+QUANTUM = 10000
+
+
+class QuotaExceededError(Exception):
+    def __init__(self, steps: int):
+        super().__init__(f"Session stopped after {steps} instructions, exceeding its quota.")
+        self.steps = steps
+
+
+class InputNotReady(Exception):
+    """Raised by the dispatch loop reading a value which has not yet been awaited."""
+    pass
+
+
+class AwaitedInput(Console):
+    """Passes the dispatch loop the value last awaited from an async console, and writes through to it."""
+
+    def __init__(self, console: AsyncConsole):
+        self.console = console
+        self.value: Optional[int] = None
+
+    def read(self) -> str:
+        return str(self.read_int())
+
+    def read_int(self) -> int:
+        if self.value is None:
+            raise InputNotReady
+        value = self.value
+        self.value = None
+        return value
+
+    def write(self, message: str) -> None:
+        self.console.write(message)
+
+    def write_int(self, value: int) -> None:
+        self.console.write_int(value)
+
+    def write_error(self, message: str) -> None:
+        self.console.write_error(message)
+
+
+class AsyncSLIM(DecodedSLIM):
+    """
+    A SLIM machine running as a coroutine, awaiting its input and yielding to the event loop every quantum.
+
+    Given a quota, the machine raises a QuotaExceededError once it has run that many instructions, at the first point
+    it could yield after, and `steps` holds how many it ran.
+    """
+
+    def __init__(self, program: Program, console: AsyncConsole, quantum: int = QUANTUM,
+                 quota: Optional[int] = None, memory: Optional[Memory] = None):
+        self.awaited = AwaitedInput(console)
+        super().__init__(program, self.awaited, memory)
+        self.async_console = console
+        self.quantum = quantum
+        self.quota = quota
+
+    async def execute(self) -> None:  # type: ignore
+        size = len(self.program.code)
+        while True:
+            quantum = self.quantum if self.quota is None else min(self.quantum, self.quota - self.steps)
+            try:
+                running = self.run(0, size, True, quantum)
+            except InputNotReady:
+                # the read was counted, but is run again once the input arrives
+                self.steps -= 1
+                self.awaited.value = await self.async_console.read_int()
+                continue
+            if not running:
+                return
+            if self.quota is not None and self.steps >= self.quota:
+                raise QuotaExceededError(self.steps)
+            await asyncio.sleep(0)
+
+
+class AsyncInterpreter:
+    """Runs sessions of one decoded program, each with its own console, registers and memory."""
+
+    def __init__(self, program: Program, fused: bool = False, quantum: int = QUANTUM, quota: Optional[int] = None):
+        """
+        :param program: the program every session runs
+        :param fused: whether to run the program fused, which is done once for all sessions
+        :param quantum: the number of instructions each session runs before yielding to the others
+        :param quota: the most instructions each session may run, if limited
+        """
+        self.program = fuse(program) if fused else program
+        self.quantum = quantum
+        self.quota = quota
+
+    def session(self, console: AsyncConsole, memory: Optional[Memory] = None) -> AsyncSLIM:
+        return AsyncSLIM(self.program, console, self.quantum, self.quota, memory)
+
+    async def run(self, console: AsyncConsole, memory: Optional[Memory] = None) -> AsyncSLIM:
+        """
+        Runs a session to its end, flushing the console once it stops, even on an error.
+        :param console: the console the session reads from and writes to
+        :param memory: the memory of the session, a dictionary if not given
+        :return: the machine after running
+        """
+        machine = self.session(console, memory)
+        try:
+            await machine.execute()
+        finally:
+            console.flush()
+        return machine
@@ -0,0 +1,156 @@
+"""
+Assembles SLIM source into a decoded program in a single pass over its lines.
+
+Each line is tokenized with precompiled patterns and its instruction encoded as soon as it is read, so lines may come
+from any iterator, such as an open file, and are never held all at once. Registers and labels named before their use
+are resolved straight away; the others are recorded with the operand they fill and patched in once all lines are read.
+
+The result and the errors are those of parsing, naming and resolving the lines in turn: naming errors are reported
+alone, and otherwise the resolution errors are reported in the order of their lines.
+"""
+
+from typing import Dict, Iterable, List, Tuple
+
+from worm.slim.decoder import NUM_REGISTERS, OPCODES, Instruction, Program
+from worm.slim.error import CompilationError
+from worm.slim.namer import LabelInUseError, NoMoreRegistersError, RegisterInUseError
+from worm.slim.parser import ALLOC_PATTERN, COMMAND_PATTERN, LABEL_PATTERN, SPLIT_PATTERN
+from worm.slim.resolver import (COMMANDS, INTEGER_PATTERN, ExpectedLabelError, ExpectedRegisterError,
+                                MissingArgumentError, TooManyArgumentsError, UnknownNameError, UnknownOpcodeError,
+                                Value)
+from worm.util.validation import Failure, Success, Validation
+
+# an operand naming a register or label not yet seen: (address, operand position, name, expected kind, line)
+Fixup = Tuple[int, int, str, Value, int]
+# an error to report, sorted by the address and operand position it was found at
+Located = Tuple[int, int, CompilationError]
+
+# the instruction held at the address of a command which did not resolve, never run as the program is not returned
+INVALID: Instruction = (0, 0, 0, 0)
+
+
+class Assembler:
+    def __init__(self):
+        self.code: List[Instruction] = []
+        self.registers: Dict[str, int] = {}
+        self.labels: Dict[str, int] = {}
+        # the labels to give to the next command
+        self.pending: List[str] = []
+        self.fixups: List[Fixup] = []
+        self.naming_errors: List[CompilationError] = []
+        self.resolve_errors: List[Located] = []
+
+    def feed(self, line: str, line_num: int) -> None:
+        """Assembles a line of source, with comments and surrounding whitespace."""
+        if ";" in line:
+            line = line[:line.index(";")]
+        line = line.strip()
+        if not line:
+            return
+        if line.endswith(":"):
+            match = LABEL_PATTERN.fullmatch(line)
+            if match:
+                self.label(match[1], line_num)
+                return
+        if line.startswith("allocate-registers"):
+            match = ALLOC_PATTERN.fullmatch(line)
+            if match:
+                self.allocate([name.strip() for name in SPLIT_PATTERN.split(match[1])], line_num)
+                return
+        match = COMMAND_PATTERN.fullmatch(line)
+        if not match:
+            raise Exception(f"Cannot parse line {line_num}.")
+        arg_string = match[2]
+        args = [] if arg_string is None else [arg.strip() for arg in SPLIT_PATTERN.split(arg_string) if arg.strip()]
+        self.command(match[1], args, line_num)
+
+    def label(self, name: str, line_num: int) -> None:
+        if name in self.registers or name in self.labels:
+            self.naming_errors.append(LabelInUseError(name, line_num))
+        else:
+            self.pending.append(name)
+
+    def allocate(self, names: List[str], line_num: int) -> None:
+        for name in names:
+            if name in self.registers or name in self.labels:
+                self.naming_errors.append(RegisterInUseError(name, line_num))
+            elif len(self.registers) >= NUM_REGISTERS:
+                self.naming_errors.append(NoMoreRegistersError(name, line_num))
+            else:
+                self.registers[name] = len(self.registers)
+
+    def command(self, cmd: str, args: List[str], line_num: int) -> None:
+        address = len(self.code)
+        for label in self.pending:
+            self.labels[label] = address
+        self.pending = []
+
+        kinds = COMMANDS.get(cmd)
+        if kinds is None:
+            self.resolve_errors.append((address, -1, UnknownOpcodeError(cmd, line_num)))
+        elif len(args) < len(kinds):
+            self.resolve_errors.append((address, -1, MissingArgumentError(line_num)))
+        elif len(args) > len(kinds):
+            self.resolve_errors.append((address, -1, TooManyArgumentsError(line_num)))
+        else:
+            operands = [0, 0, 0]
+            valid = True
+            for position, arg in enumerate(args):
+                kind = kinds[position]
+                names = self.registers if kind is Value.Register else self.labels
+                # names never start with a digit, and only integers are taken for negative numbers
+                if arg in names and arg[0] != "-" and (names is self.registers or arg not in self.registers):
+                    operands[position] = names[arg]
+                elif INTEGER_PATTERN.fullmatch(arg):
+                    operands[position] = int(arg)
+                elif arg in self.registers or arg in self.labels:
+                    value = self.resolve(arg, kind, line_num)
+                    if isinstance(value, CompilationError):
+                        self.resolve_errors.append((address, position, value))
+                        valid = False
+                    else:
+                        operands[position] = value
+                else:
+                    self.fixups.append((address, position, arg, kind, line_num))
+            if valid:
+                self.code.append((OPCODES[cmd], operands[0], operands[1], operands[2]))
+                return
+        self.code.append(INVALID)
+
+    def resolve(self, name: str, kind: Value, line_num: int):
+        """Gets the index of a register or the address of a label, or the error if it is of the wrong kind."""
+        if name in self.registers:
+            return self.registers[name] if kind == Value.Register else ExpectedLabelError(name, line_num)
+        elif name in self.labels:
+            return self.labels[name] if kind == Value.Label else ExpectedRegisterError(name, line_num)
+        return UnknownNameError(name, line_num)
+
+    def finish(self) -> Validation[Program, CompilationError]:
+        """Patches the operands naming registers and labels which came after them, and gets the program."""
+        if self.naming_errors:
+            return Failure(self.naming_errors)
+        code = self.code
+        for address, position, name, kind, line_num in self.fixups:
+            value = self.resolve(name, kind, line_num)
+            if isinstance(value, CompilationError):
+                self.resolve_errors.append((address, position, value))
+            elif code[address] is not INVALID:
+                operands = list(code[address])
+                operands[position + 1] = value
+                code[address] = (operands[0], operands[1], operands[2], operands[3])
+        if self.resolve_errors:
+            self.resolve_errors.sort(key=lambda located: located[:2])
+            return Failure([error for _, _, error in self.resolve_errors])
+        return Success(Program(code, self.registers, self.labels))
+
+
+def assemble_lines(lines: Iterable[str]) -> Validation[Program, CompilationError]:
+    """
+    Assembles SLIM source read line by line into a decoded program, keeping its register and label names.
+    :param lines: the lines of source, with or without their line endings
+    :return: the program, or the errors in the source
+    """
+    assembler = Assembler()
+    for line_num, line in enumerate(lines, start=1):
+        assembler.feed(line, line_num)
+    return assembler.finish()
@@ -0,0 +1,142 @@
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from worm.slim.decoder import Instruction, Program, J, JEQZ, HALT, REGISTER_OPERANDS, in_range, normalize
+from worm.slim.engine import DecodedSLIM
+from worm.slim.memory import Memory
+from worm.slim.translator import statements, update_known
+from worm.util.console import Console
+
+HOT_LOOP_THRESHOLD = 50
+MAX_TRACE_LENGTH = 1000
+
+# A compiled trace is called with (registers, memory, read, write),
+# loops until one of its guards fails, and returns the address to continue from.
+Trace = Callable[[List[int], Memory, Callable[[], int], Callable[[int], None]], int]
+
+# (address, instruction, address of the next instruction executed)
+TraceStep = Tuple[int, Instruction, int]
+
+
+class TraceGenerator:
+    """Generates the Python source of a recorded loop trace."""
+
+    def __init__(self, steps: List[TraceStep]):
+        self.steps = [(pc, normalize(instruction), next_pc) for pc, instruction, next_pc in steps]
+        self.lines: List[str] = []
+
+    def emit(self, depth: int, line: str) -> None:
+        self.lines.append("    " * depth + line)
+
+    def registers(self) -> List[int]:
+        used: Set[int] = set()
+        for _, (op, *args), _ in self.steps:
+            used.update(args[:REGISTER_OPERANDS[op]])
+        return sorted(used)
+
+    def emit_target_guard(self, reg: int, target: int, known: Dict[int, int]) -> None:
+        """Emits a guard leaving the trace unless the jump through the register goes to the recorded target."""
+        if reg not in known:
+            self.emit(3, f"if r{reg} != {target}:")
+            self.emit(4, f"return r{reg}")
+
+    def generate(self) -> str:
+        registers = self.registers()
+        self.emit(0, "def trace(r, mem, read, write):")
+        for reg in registers:
+            self.emit(1, f"r{reg} = r[{reg}]")
+        self.emit(1, "try:")
+        self.emit(2, "while True:")
+        # registers known to hold a constant, reset on every iteration
+        known: Dict[int, int] = {}
+        for pc, (op, a, b, c), next_pc in self.steps:
+            if op == J:
+                self.emit_target_guard(a, next_pc, known)
+            elif op == JEQZ and next_pc == pc + 1:
+                self.emit(3, f"if r{a} == 0:")
+                self.emit(4, f"return r{b}")
+            elif op == JEQZ:
+                self.emit(3, f"if r{a} != 0:")
+                self.emit(4, f"return {pc + 1}")
+                self.emit_target_guard(b, next_pc, known)
+            else:
+                for statement in statements((op, a, b, c)):
+                    self.emit(3, statement)
+                update_known(known, (op, a, b, c))
+        self.emit(1, "finally:")
+        for reg in registers:
+            self.emit(2, f"r[{reg}] = r{reg}")
+        if not registers:
+            self.emit(2, "pass")
+        return "".join(line + "\n" for line in self.lines)
+
+
+def compile_trace(steps: List[TraceStep]) -> Optional[Trace]:
+    """
+    Compiles a recorded loop trace into a Python function, or None if it cannot be compiled.
+
+    The trace runs the recorded instructions over local registers, guarding every branch and every
+    jump through a register not loaded earlier in the trace, and repeats while all guards hold.
+    """
+    if not all(in_range(instruction) for _, instruction, _ in steps):
+        return None
+    namespace: Dict[str, object] = {}
+    exec(compile(TraceGenerator(steps).generate(), "<slim-trace>", "exec"), namespace)
+    return namespace["trace"]  # type: ignore
+
+
+class TracingSLIM(DecodedSLIM):
+    """
+    A SLIM machine compiling hot loops into Python as it runs them.
+
+    Every taken jump to an earlier or the same address is counted against its target. Once a target
+    has been jumped back to `threshold` times, the next iteration starting there is recorded and
+    compiled into a trace, which then runs in place of the loop until one of its guards fails.
+    """
+
+    def __init__(self, program: Program, console: Console, threshold: int = HOT_LOOP_THRESHOLD,
+                 memory: Optional[Memory] = None):
+        super().__init__(program, console, memory)
+        self.threshold = threshold
+        self.counters: Dict[int, int] = {}
+        self.traces: Dict[int, Trace] = {}
+        # loop headers whose recording was abandoned
+        self.untraceable: Set[int] = set()
+        self.traces_compiled = 0
+        self.trace_exits = 0
+
+    def execute(self) -> None:
+        size = len(self.program.code)
+        while True:
+            trace = self.traces.get(self.pointer)
+            if trace is not None:
+                self.pointer = trace(self.registers, self.mem, self.console.read_int, self.console.write_int)
+                self.trace_exits += 1
+            elif not self.run(0, size, True):
+                break
+            elif self.pointer not in self.traces and self.pointer not in self.untraceable:
+                count = self.counters.get(self.pointer, 0) + 1
+                self.counters[self.pointer] = count
+                if count >= self.threshold:
+                    self.record()
+
+    def record(self) -> None:
+        """Runs one iteration of the loop starting at the pointer, compiling it into a trace if possible."""
+        code = self.program.code
+        header = self.pointer
+        steps: List[TraceStep] = []
+        while True:
+            pc = self.pointer
+            if not 0 <= pc < len(code) or code[pc][0] == HALT or len(steps) >= MAX_TRACE_LENGTH \
+                    or (pc != header and pc in self.traces):
+                self.untraceable.add(header)
+                return
+            self.run(pc, pc + 1, False)
+            steps.append((pc, code[pc], self.pointer))
+            if self.pointer == header:
+                break
+        trace = compile_trace(steps)
+        if trace is None:
+            self.untraceable.add(header)
+        else:
+            self.traces[header] = trace
+            self.traces_compiled += 1
@@ -0,0 +1,198 @@
+from typing import Callable, Dict, List, Optional, Set
+
+from worm.slim.decoder import (Instruction, Program, ADD, SUB, MUL, DIV, QUO, REM, SEQ, SNE, SLT, SGT, SLE, SGE, LD, ST, LI,
+                               READ, WRITE, J, JEQZ, HALT, REGISTER_OPERANDS, in_range, normalize)
+from worm.slim.analysis import analyze
+from worm.slim.engine import DecodedSLIM
+from worm.slim.memory import Memory
+from worm.util.console import Console
+
+# A translated program is called with (registers, memory, read, write, pointer),
+# runs until it halts or leaves the translated code, and returns the pointer it stopped at.
+Translation = Callable[[List[int], Memory, Callable[[], int], Callable[[int], None], int], int]
+
+ARITHMETIC = {ADD: "+", SUB: "-", MUL: "*", DIV: "//", QUO: "//"}
+COMPARISONS = {SEQ: "==", SNE: "!=", SLT: "<", SGT: ">", SLE: "<=", SGE: ">="}
+
+BOUND = "v if -2147483648 <= v <= 2147483647 else (v + 2147483648) % 4294967296 - 2147483648"
+
+
+def find_leaders(program: Program) -> List[int]:
+    """
+    Finds the first instruction of each basic block.
+
+    Blocks start wherever the analysis finds a jump may land, and after every jump or halt. A jump landing
+    anywhere else, through an address computed by arithmetic, leaves the translated code.
+    """
+    return analyze(program).starts
+
+
+def used_registers(program: Program) -> Optional[Set[int]]:
+    """Gets the register indices used by the program, or None if any index is out of range."""
+    used = set()
+    for instruction in program.code:
+        if not in_range(instruction):
+            return None
+        op, *args = normalize(instruction)
+        used.update(args[:REGISTER_OPERANDS[op]])
+    return used
+
+
+def statements(instruction: Instruction) -> List[str]:
+    """
+    Gets Python statements performing a normalized instruction other than a jump or halt.
+
+    Register i is held in the local variable ri, and v is used as a temporary.
+    """
+    op, a, b, c = instruction
+    if op in ARITHMETIC:
+        return [f"v = r{b} {ARITHMETIC[op]} r{c}", f"r{a} = {BOUND}"]
+    elif op in COMPARISONS:
+        return [f"r{a} = 1 if r{b} {COMPARISONS[op]} r{c} else 0"]
+    elif op == REM:
+        return [f"v = -r{b} % -r{c} if (r{b} < 0) != (r{c} < 0) else r{b} % r{c}", f"r{a} = {BOUND}"]
+    elif op == LD:
+        return [f"r{a} = mem[r{b}]"]
+    elif op == ST:
+        return [f"mem[r{b}] = r{a}"]
+    elif op == LI:
+        return [f"r{a} = {b}"]
+    elif op == READ:
+        return [f"r{a} = read()"]
+    elif op == WRITE:
+        return [f"write(r{a})"]
+    else:
+        raise ValueError(f"Cannot translate opcode {op}.")
+
+
+def update_known(known: Dict[int, int], instruction: Instruction) -> None:
+    """Updates the registers known to hold a constant after a normalized instruction runs."""
+    op, a, b, c = instruction
+    if op == LI:
+        known[a] = b
+    elif op not in (ST, WRITE, J, JEQZ, HALT):
+        known.pop(a, None)
+
+
+class Generator:
+    """Generates the Python source of a translated program."""
+
+    def __init__(self, program: Program, registers: Set[int]):
+        self.code = program.code
+        self.registers = sorted(registers)
+        self.leaders = find_leaders(program)
+        self.blocks = {leader: i for i, leader in enumerate(self.leaders)}
+        self.lines: List[str] = []
+
+    def emit(self, depth: int, line: str) -> None:
+        self.lines.append("    " * depth + line)
+
+    def generate(self) -> str:
+        self.emit(0, "def run(r, mem, read, write, pc):")
+        for reg in self.registers:
+            self.emit(1, f"r{reg} = r[{reg}]")
+        self.emit(1, "b = BLOCKS.get(pc)")
+        self.emit(1, "if b is None:")
+        self.emit(2, "return pc")
+        self.emit(1, "try:")
+        self.emit(2, "while True:")
+        if self.leaders:
+            self.emit_tree(3, 0, len(self.leaders))
+        else:
+            self.emit(3, "return pc")
+        self.emit(1, "finally:")
+        for reg in self.registers:
+            self.emit(2, f"r[{reg}] = r{reg}")
+        if not self.registers:
+            self.emit(2, "pass")
+        return "".join(line + "\n" for line in self.lines)
+
+    def emit_tree(self, depth: int, low: int, high: int) -> None:
+        """Emits a binary search over the block ids in [low, high)."""
+        if high - low == 1:
+            self.emit_block(depth, low)
+        else:
+            mid = (low + high) // 2
+            self.emit(depth, f"if b < {mid}:")
+            self.emit_tree(depth + 1, low, mid)
+            self.emit(depth, "else:")
+            self.emit_tree(depth + 1, mid, high)
+
+    def emit_goto(self, depth: int, target: int) -> None:
+        if target in self.blocks:
+            self.emit(depth, f"b = {self.blocks[target]}")
+        else:
+            self.emit(depth, f"return {target}")
+
+    def emit_jump(self, depth: int, reg: int, known: Dict[int, int]) -> None:
+        if reg in known:
+            self.emit_goto(depth, known[reg])
+        else:
+            self.emit(depth, f"pc = r{reg}")
+            self.emit(depth, "b = BLOCKS.get(pc)")
+            self.emit(depth, "if b is None:")
+            self.emit(depth + 1, "return pc")
+
+    def emit_block(self, depth: int, block: int) -> None:
+        start = self.leaders[block]
+        end = self.leaders[block + 1] if block + 1 < len(self.leaders) else len(self.code)
+        # registers holding a value known from an li earlier in this block
+        known: Dict[int, int] = {}
+        for pc in range(start, end):
+            op, a, b, c = normalize(self.code[pc])
+            if op == J:
+                self.emit_jump(depth, a, known)
+                return
+            elif op == JEQZ:
+                self.emit(depth, f"if r{a} == 0:")
+                self.emit_jump(depth + 1, b, known)
+                self.emit(depth, "else:")
+                self.emit_goto(depth + 1, pc + 1)
+                return
+            elif op == HALT:
+                self.emit(depth, f"return {pc}")
+                return
+            for statement in statements((op, a, b, c)):
+                self.emit(depth, statement)
+            update_known(known, (op, a, b, c))
+        self.emit_goto(depth, end)
+
+
+def translate(program: Program) -> Optional[Translation]:
+    """
+    Translates the program into a Python function, caching it on the program.
+
+    Each basic block becomes a branch of a dispatch loop over block ids, with the registers held
+    in local variables. Jumps through a register loaded by an li in the same block go straight to
+    the target block; other jumps look their target up in a table of block starts. Programs using
+    register indices outside the register file are not translated.
+    """
+    if "translation" not in program.cache:
+        registers = used_registers(program)
+        if registers is None:
+            program.cache["translation"] = None
+        else:
+            generator = Generator(program, registers)
+            namespace: Dict[str, object] = {"BLOCKS": generator.blocks}
+            exec(compile(generator.generate(), "<slim>", "exec"), namespace)
+            program.cache["translation"] = namespace["run"]
+    return program.cache["translation"]  # type: ignore
+
+
+class TranslatedSLIM(DecodedSLIM):
+    """
+    A SLIM machine running a program translated ahead of time into Python.
+
+    When the translated code cannot continue, such as on a jump to an address that does not start
+    a block, execution falls back to the decoded dispatch loop from that point.
+    """
+
+    def __init__(self, program: Program, console: Console, memory: Optional[Memory] = None):
+        super().__init__(program, console, memory)
+        self.translation = translate(program)
+
+    def execute(self) -> None:
+        if self.translation is not None:
+            self.pointer = self.translation(self.registers, self.mem, self.console.read_int, self.console.write_int,
+                                            self.pointer)
+        super().execute()
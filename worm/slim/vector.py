@@ -0,0 +1,222 @@
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from worm.slim.decoder import (Program, ADD, SUB, MUL, DIV, QUO, REM, SEQ, SNE, SLT, SGT, SLE, SGE, LD, ST, LI, READ,
+                               WRITE, J, JEQZ, HALT, NUM_REGISTERS, in_range, normalize)
+from worm.util.console import StaticConsole
+
+INT64_MIN = -2 ** 63
+INT64_MAX = 2 ** 63 - 1
+
+# the initial and largest number of addresses per lane held in the dense memory array;
+# addresses outside it are kept in a dictionary per lane
+INITIAL_MEMORY = 64
+MAX_DENSE_MEMORY = 2 ** 16
+
+RUNNING = 0
+FINISHED = 1
+FAILED = 2
+
+
+def wrap(values: np.ndarray) -> np.ndarray:
+    """Wraps values to 32-bit integers, as bound_int does."""
+    return ((values + 2 ** 31) & 0xFFFFFFFF) - 2 ** 31
+
+
+class VectorSLIM:
+    """
+    Runs one SLIM program over many inputs at once, one lane per input.
+
+    Lanes run in lockstep: each step executes the instruction at the lowest pointer among running lanes
+    for every lane at that pointer, so lanes taking different branches still make progress and join up
+    again where their paths meet. Registers are an (N, 32) int64 array, so values loaded by li or read
+    outside the 32-bit range behave as in SLIM, while arithmetic wraps to 32 bits as bound_int does. Division
+    floors, and rem negates both operands when their signs differ before taking the floored modulo, as SLIM does.
+
+    After execution, `consoles` holds a StaticConsole per lane with its output, and `exceptions` holds
+    the exception each lane stopped with, if any, in place of the exception SLIM would raise.
+    """
+
+    def __init__(self, program: Program, inputs: List[List[str]]):
+        if not all(in_range(instruction) for instruction in program.code):
+            raise ValueError("Program uses register indices outside the register file.")
+        if not all(INT64_MIN <= b <= INT64_MAX for op, a, b, c in program.code if op == LI):
+            raise ValueError("Program loads constants outside the 64-bit range.")
+        self.code = [normalize(instruction) for instruction in program.code]
+        lanes = len(inputs)
+        self.registers = np.zeros((lanes, NUM_REGISTERS), dtype=np.int64)
+        self.pointers = np.zeros(lanes, dtype=np.int64)
+        self.states = np.full(lanes, RUNNING, dtype=np.int8)
+        self.memory = np.zeros((lanes, INITIAL_MEMORY), dtype=np.int64)
+        self.written = np.zeros((lanes, INITIAL_MEMORY), dtype=bool)
+        self.sparse_memory: Dict[int, Dict[int, int]] = {}
+        self.consoles = [StaticConsole(lines) for lines in inputs]
+        self.exceptions: List[Optional[Exception]] = [None] * lanes
+        self.load_inputs(inputs)
+        self.steps = 0
+
+    def load_inputs(self, inputs: List[List[str]]) -> None:
+        """Parses each lane's input up to its first line that is not a 64-bit integer."""
+        width = max((len(lines) for lines in inputs), default=0)
+        self.inputs = np.zeros((len(inputs), width), dtype=np.int64)
+        self.input_lengths = np.zeros(len(inputs), dtype=np.int64)
+        self.input_cursors = np.zeros(len(inputs), dtype=np.int64)
+        # the exception raised by reading past each lane's parsed input
+        self.input_errors: List[Exception] = []
+        for lane, lines in enumerate(inputs):
+            error: Exception = StopIteration()
+            for i, line in enumerate(lines):
+                try:
+                    value = int(line)
+                except ValueError as e:
+                    error = e
+                    break
+                if not INT64_MIN <= value <= INT64_MAX:
+                    error = OverflowError(f"Input '{line}' is outside the 64-bit range.")
+                    break
+                self.inputs[lane, i] = value
+                self.input_lengths[lane] = i + 1
+            self.input_errors.append(error)
+
+    def fail(self, lanes: np.ndarray, error: Exception) -> None:
+        for lane in lanes.tolist():
+            self.states[lane] = FAILED
+            self.exceptions[lane] = error
+
+    def execute(self) -> None:
+        size = len(self.code)
+        running = np.flatnonzero(self.states == RUNNING)
+        while running.size:
+            pointers = self.pointers[running]
+            outside = (pointers < 0) | (pointers >= size)
+            if outside.any():
+                self.states[running[outside]] = FINISHED
+                running = running[~outside]
+                continue
+            pc = int(pointers.min())
+            lanes = running[pointers == pc]
+            self.steps += 1
+            if not self.step(pc, lanes):
+                running = np.flatnonzero(self.states == RUNNING)
+
+    def step(self, pc: int, lanes: np.ndarray) -> bool:
+        """
+        Executes the instruction at the pointer for the given lanes.
+        :return: whether all of the lanes are still running
+        """
+        op, a, b, c = self.code[pc]
+        r = self.registers
+        if op in (ADD, SUB, MUL):
+            x = r[lanes, b]
+            y = r[lanes, c]
+            r[lanes, a] = wrap(x + y if op == ADD else x - y if op == SUB else x * y)
+        elif op in (DIV, QUO, REM):
+            x = r[lanes, b]
+            y = r[lanes, c]
+            zero = y == 0
+            if zero.any():
+                self.fail(lanes[zero], ZeroDivisionError("integer division or modulo by zero"))
+                lanes, x, y = lanes[~zero], x[~zero], y[~zero]
+            if op == REM:
+                # as swap_sign does, negate both operands when their signs differ before taking the floored modulo
+                r[lanes, a] = wrap(np.where(np.sign(x) == np.sign(y), np.mod(x, y), np.mod(-x, -y)))
+            else:
+                r[lanes, a] = wrap(np.floor_divide(x, y))
+            self.pointers[lanes] += 1
+            return not zero.any()
+        elif op == SEQ:
+            r[lanes, a] = r[lanes, b] == r[lanes, c]
+        elif op == SNE:
+            r[lanes, a] = r[lanes, b] != r[lanes, c]
+        elif op == SLT:
+            r[lanes, a] = r[lanes, b] < r[lanes, c]
+        elif op == SGT:
+            r[lanes, a] = r[lanes, b] > r[lanes, c]
+        elif op == SLE:
+            r[lanes, a] = r[lanes, b] <= r[lanes, c]
+        elif op == SGE:
+            r[lanes, a] = r[lanes, b] >= r[lanes, c]
+        elif op == LD:
+            return self.load(pc, lanes, a, b)
+        elif op == ST:
+            self.store(lanes, a, b)
+        elif op == LI:
+            r[lanes, a] = b
+        elif op == READ:
+            return self.read(lanes, a)
+        elif op == WRITE:
+            for lane, value in zip(lanes.tolist(), r[lanes, a].tolist()):
+                self.consoles[lane].write_int(value)
+        elif op == J:
+            self.pointers[lanes] = r[lanes, a]
+            return True
+        elif op == JEQZ:
+            self.pointers[lanes] = np.where(r[lanes, a] == 0, r[lanes, b], pc + 1)
+            return True
+        elif op == HALT:
+            self.states[lanes] = FINISHED
+            return False
+        self.pointers[lanes] += 1
+        return True
+
+    def dense(self, addresses: np.ndarray) -> np.ndarray:
+        """Finds the addresses held in the dense memory array, growing it if needed."""
+        in_dense = (addresses >= 0) & (addresses < MAX_DENSE_MEMORY)
+        if in_dense.any():
+            highest = int(addresses[in_dense].max())
+            capacity = self.memory.shape[1]
+            if highest >= capacity:
+                while capacity <= highest:
+                    capacity *= 2
+                grow = ((0, 0), (0, capacity - self.memory.shape[1]))
+                self.memory = np.pad(self.memory, grow)
+                self.written = np.pad(self.written, grow)
+        return in_dense
+
+    def store(self, lanes: np.ndarray, src: int, addr: int) -> None:
+        addresses = self.registers[lanes, addr]
+        values = self.registers[lanes, src]
+        in_dense = self.dense(addresses)
+        self.memory[lanes[in_dense], addresses[in_dense]] = values[in_dense]
+        self.written[lanes[in_dense], addresses[in_dense]] = True
+        sparse = ~in_dense
+        for lane, address, value in zip(lanes[sparse].tolist(), addresses[sparse].tolist(), values[sparse].tolist()):
+            self.sparse_memory.setdefault(lane, {})[address] = value
+
+    def load(self, pc: int, lanes: np.ndarray, dest: int, addr: int) -> bool:
+        addresses = self.registers[lanes, addr]
+        in_dense = self.dense(addresses)
+        found = np.zeros(lanes.size, dtype=bool)
+        values = np.zeros(lanes.size, dtype=np.int64)
+        found[in_dense] = self.written[lanes[in_dense], addresses[in_dense]]
+        values[in_dense] = self.memory[lanes[in_dense], addresses[in_dense]]
+        for i in np.flatnonzero(~in_dense).tolist():
+            memory = self.sparse_memory.get(int(lanes[i]), {})
+            address = int(addresses[i])
+            if address in memory:
+                found[i] = True
+                values[i] = memory[address]
+        for i in np.flatnonzero(~found).tolist():
+            self.fail(lanes[i:i + 1], KeyError(int(addresses[i])))
+        self.registers[lanes[found], dest] = values[found]
+        self.pointers[lanes[found]] += 1
+        return bool(found.all())
+
+    def read(self, lanes: np.ndarray, dest: int) -> bool:
+        cursors = self.input_cursors[lanes]
+        available = cursors < self.input_lengths[lanes]
+        for lane in lanes[~available].tolist():
+            self.fail(np.array([lane]), self.input_errors[lane])
+        lanes, cursors = lanes[available], cursors[available]
+        self.registers[lanes, dest] = self.inputs[lanes, cursors]
+        self.input_cursors[lanes] += 1
+        self.pointers[lanes] += 1
+        return bool(available.all())
+
+
+def run_batch(program: Program, inputs: List[List[str]]) -> VectorSLIM:
+    """Runs the program once per input, returning the machine holding each lane's console and exception."""
+    machine = VectorSLIM(program, inputs)
+    machine.execute()
+    return machine
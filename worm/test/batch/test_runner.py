@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+
+import json
+import pathlib
+import tempfile
+import unittest
+
+from worm.batch.runner import find_jobs, read_manifest, run_job, run_jobs
+
+DOUBLE = """
+x = int(input())
+print(int(x * 2))
+"""
+
+DIVIDE = """
+print(int(10 // int(input())))
+"""
+
+
+class RunnerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = pathlib.Path(self.directory.name)
+        self.path.joinpath("double.py").write_text(DOUBLE)
+        self.path.joinpath("double.in").write_text("21\n")
+        self.path.joinpath("divide.py").write_text(DIVIDE)
+        self.path.joinpath("divide.in").write_text("0\n")
+        self.path.joinpath("bad.py").write_text("print(int(1.5))")
+        self.path.joinpath("notes.txt").write_text("not a job")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_find_jobs(self):
+        jobs = find_jobs(self.path)
+        self.assertEqual([pathlib.Path(source).name for source, _ in jobs], ["bad.py", "divide.py", "double.py"])
+        self.assertIsNone(jobs[0][1])
+
+    def test_read_manifest(self):
+        manifest = self.path.joinpath("jobs.jsonl")
+        manifest.write_text(json.dumps({"source": "double.py", "input": "double.in"}) + "\n"
+                            + json.dumps({"source": "double.py"}) + "\n")
+        jobs = read_manifest(manifest)
+        self.assertEqual(jobs, [(str(self.path.joinpath("double.py")), str(self.path.joinpath("double.in"))),
+                                (str(self.path.joinpath("double.py")), None)])
+
+    def test_run_job(self):
+        result = run_job((str(self.path.joinpath("double.py")), str(self.path.joinpath("double.in"))))
+        self.assertEqual(result["output"], ["42"])
+        self.assertEqual(result["errors"], [])
+        self.assertGreater(result["instructions"], 0)
+
+    def test_run_job_runtime_error(self):
+        result = run_job((str(self.path.joinpath("divide.py")), str(self.path.joinpath("divide.in"))))
+        self.assertEqual(result["output"], [])
+        self.assertEqual(len(result["errors"]), 1)
+        self.assertTrue(result["errors"][0].startswith("ZeroDivisionError"))
+
+    def test_run_job_compile_error(self):
+        result = run_job((str(self.path.joinpath("bad.py")), None))
+        self.assertEqual(result["errors"], ["Error on line 1:", "Non-integer literal."])
+
+    def test_run_jobs_ordered(self):
+        jobs = find_jobs(self.path) * 3
+        results = list(run_jobs(jobs, workers=2, chunk_size=2, ordered=True))
+        self.assertEqual([result["source"] for result in results], [source for source, _ in jobs])
+
+    def test_run_jobs_unordered(self):
+        jobs = find_jobs(self.path) * 3
+        results = list(run_jobs(jobs, workers=2))
+        self.assertEqual(sorted(result["source"] for result in results), sorted(source for source, _ in jobs))
+
+    def test_run_jobs_streamed(self):
+        jobs = find_jobs(self.path) * 3
+        # the whole batch is one chunk, and the batch can be abandoned after its first result
+        results = run_jobs(jobs, workers=1, chunk_size=len(jobs))
+        self.assertEqual(next(results)["source"], jobs[0][0])
+        results.close()
+
+    def test_run_jobs_cached(self):
+        jobs = find_jobs(self.path)
+        cache_directory = self.path.joinpath("cache")
+        uncached = list(run_jobs(jobs, workers=1, ordered=True))
+        for _ in range(2):
+            cached = list(run_jobs(jobs, workers=1, ordered=True, cache_directory=str(cache_directory)))
+            self.assertEqual([result["output"] for result in cached], [result["output"] for result in uncached])
+            self.assertEqual([result["errors"] for result in cached], [result["errors"] for result in uncached])
+        self.assertTrue(list(cache_directory.glob("*/*.slimo")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+"""Runs scripts under Python and compiled to SLIM, for the tests of the compiler and its passes."""
+
+import unittest
+from typing import Iterable, List, Tuple
+
+from worm.compiler.compiler import Compiler
+from worm.slim.decoder import decode
+from worm.slim.engine import DecodedSLIM
+from worm.slim.interpreter import Interpreter, assemble
+from worm.util.console import StaticConsole
+from worm.util.validation import Success
+
+
+def execute_python(script: str, input: List[str]) -> List[str]:
+    input_lines = iter(input)
+    output_lines: List[str] = []
+    env = {
+        "print": output_lines.append,
+        "input": input_lines.__next__
+    }
+    exec(script, env)
+    return [str(i) for i in output_lines]
+
+
+def execute_worm(script: str, input: List[str], engine: str = "decoded", flat_memory: bool = False) -> List[str]:
+    console = StaticConsole(input)
+    compiler = Compiler()
+    interpreter = Interpreter(console, engine, flat_memory)
+
+    slim_code = compiler.compile(script)
+    interpreter.interpret(slim_code)
+
+    return console.output
+
+
+def execute_slim(code: str, input: List[str]) -> DecodedSLIM:
+    """Runs compiled code on the decoded engine, returning the machine to inspect its output, steps and memory."""
+    resolved = assemble(code)
+    assert isinstance(resolved, Success)
+    machine = DecodedSLIM(decode(resolved.value), StaticConsole(list(input)))
+    machine.execute()
+    return machine
+
+
+def output(machine: DecodedSLIM) -> List[str]:
+    """Gets the output of a machine run by execute_slim."""
+    assert isinstance(machine.console, StaticConsole)
+    return machine.console.output
+
+
+class PassTest(unittest.TestCase):
+    """Checks that a compiler pass keeps the behaviour of scripts, and that it makes them faster."""
+
+    def assert_equivalent(self, script: str, input: List[str], compilers: Iterable[Compiler]) -> None:
+        """Asserts that the script writes the same output under Python as compiled by each of the compilers."""
+        expected = execute_python(script, input)
+        for compiler in compilers:
+            self.assertEqual(output(execute_slim(compiler.compile(script), input)), expected)
+
+    def assert_fewer_steps(self, script: str, input: List[str], optimized: Compiler, plain: Compiler,
+                           ratio: float = 1) -> Tuple[DecodedSLIM, DecodedSLIM]:
+        """
+        Asserts that the script compiled by the optimized compiler writes the same output as under Python and as
+        compiled by the plain compiler, in fewer than the given ratio of the steps the plain compiler's code takes.
+        :return: the machines which ran the optimized and the plain compiler's code
+        """
+        fast = execute_slim(optimized.compile(script), input)
+        slow = execute_slim(plain.compile(script), input)
+        self.assertEqual(output(fast), execute_python(script, input))
+        self.assertEqual(output(fast), output(slow))
+        self.assertLess(fast.steps, slow.steps * ratio)
+        return fast, slow
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+
+import unittest
+from typing import List
+
+from worm.compiler.compiler import Compiler
+from worm.test.compiler.helpers import PassTest, execute_python, execute_slim, output
+
+# more variables are live at once than there are registers
+MANY_VARIABLES = "".join(f"v{i} = int(input())\n" for i in range(40)) \
+    + "".join(f"print(int(v{i} * {i}))\n" for i in range(40))
+
+# nested deeper than there are registers
+DEEP_EXPRESSION = "x = int(input())\nprint(int(" + " + ".join(["(x"] * 40) + ")" * 40 + "))\n"
+
+# a recursive function with more locals than there are registers, live across the call
+RECURSIVE_LOCALS = """
+def f(a, b):
+""" + "".join(f"    w{i} = a + {i}\n" for i in range(35)) + """    if a > 0:
+        return f(a - 1, b) + """ + " + ".join(f"w{i}" for i in range(35)) + """
+    return b
+print(int(f(int(input()), 5)))
+"""
+
+FIBONACCI = """
+def fib(x):
+    if x <= 1:
+        return x
+    else:
+        a = fib(x - 1)
+        b = fib(x - 2)
+        return a + b
+print(int(fib(int(input()))))
+"""
+
+
+def allocated_registers(code: str) -> List[str]:
+    return code.splitlines()[0][len("allocate-registers "):].split(", ")
+
+
+class AllocationTest(PassTest):
+
+    def test_large_programs(self):
+        input = [str(7 * i + 1) for i in range(40)]
+        for name, script in [("many variables", MANY_VARIABLES), ("deep expression", DEEP_EXPRESSION),
+                             ("recursive locals", RECURSIVE_LOCALS)]:
+            with self.subTest(script=name):
+                code = Compiler().compile(script)
+                self.assertLessEqual(len(allocated_registers(code)), 32)
+                self.assertEqual(output(execute_slim(code, input)), execute_python(script, input))
+
+    def test_too_many_registers_without_allocation(self):
+        with self.assertRaises(SystemExit):
+            Compiler(allocate=False).compile(MANY_VARIABLES)
+
+    def test_fewer_registers(self):
+        allocated = Compiler().compile(FIBONACCI)
+        unallocated = Compiler(allocate=False).compile(FIBONACCI)
+        self.assertLess(len(allocated_registers(allocated)), len(allocated_registers(unallocated)))
+        self.assert_equivalent(FIBONACCI, ["10"], [Compiler(), Compiler(allocate=False)])
+
+    def test_no_spilling_when_registers_suffice(self):
+        code = Compiler().compile(FIBONACCI)
+        self.assertIn("li stack-pointer, 0", code)
+        self.assertNotIn("spill-address", code)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+
+import pathlib
+import tempfile
+import unittest
+from unittest import mock
+
+from worm.compiler.cache import CompileCache, cache_key
+from worm.compiler.compiler import VERSION, Compiler
+from worm.slim.engine import DecodedSLIM
+from worm.util.console import StaticConsole
+from worm.util.validation import Success
+
+SQUARE = """
+x = int(input())
+print(int(x * x))
+"""
+
+
+def script(n: int) -> str:
+    return f"print(int({n}))"
+
+
+class CompileCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = pathlib.Path(self.directory.name)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_memory_hit(self):
+        cache = CompileCache()
+        compiler = Compiler(cache)
+        compiled = compiler.compile(SQUARE)
+        with mock.patch.object(Compiler, "do_compile") as do_compile:
+            self.assertEqual(compiler.compile(SQUARE), compiled)
+            do_compile.assert_not_called()
+        self.assertEqual(compiled, Compiler().compile(SQUARE))
+        self.assertEqual((cache.stats.memory_hits, cache.stats.disk_hits, cache.stats.misses), (1, 0, 1))
+
+    def test_disk_hit(self):
+        compiled = Compiler(CompileCache(self.path)).compile(SQUARE)
+        cache = CompileCache(self.path)
+        with mock.patch.object(Compiler, "do_compile") as do_compile:
+            self.assertEqual(Compiler(cache).compile(SQUARE), compiled)
+            do_compile.assert_not_called()
+        self.assertEqual((cache.stats.hits, cache.stats.disk_hits, cache.stats.misses), (1, 1, 0))
+        self.assertEqual(list(self.path.glob("*/.tmp-*")), [])
+
+    def test_program_from_disk(self):
+        first = Compiler(CompileCache(self.path)).compile_program(SQUARE)
+        assert isinstance(first, Success)
+        with mock.patch.object(Compiler, "do_compile") as do_compile:
+            second = Compiler(CompileCache(self.path)).compile_program(SQUARE)
+            do_compile.assert_not_called()
+        assert isinstance(second, Success)
+        self.assertEqual(second.value.code, first.value.code)
+        console = StaticConsole(["12"])
+        DecodedSLIM(second.value, console).execute()
+        self.assertEqual(console.output, ["144"])
+
+    def test_key(self):
+        key = cache_key(SQUARE, VERSION, {})
+        self.assertEqual(key, cache_key(SQUARE, VERSION, {}))
+        self.assertNotEqual(key, cache_key(SQUARE + "\n", VERSION, {}))
+        self.assertNotEqual(key, cache_key(SQUARE, VERSION + 1, {}))
+        self.assertNotEqual(key, cache_key(SQUARE, VERSION, {"optimize": True}))
+
+    def test_lru_bound(self):
+        cache = CompileCache(max_entries=2)
+        compiler = Compiler(cache)
+        for n in [1, 2, 1, 3, 1, 2]:
+            compiler.compile(script(n))
+        # 2 was the least recently used when 3 was added
+        self.assertEqual((cache.stats.memory_hits, cache.stats.misses), (2, 4))
+        self.assertEqual(len(cache.entries), 2)
+
+    def test_eviction(self):
+        cache = CompileCache(self.path, max_bytes=2000)
+        compiler = Compiler(cache)
+        for n in range(20):
+            compiler.compile(script(n))
+        self.assertGreater(cache.stats.evictions, 0)
+        self.assertLessEqual(sum(path.stat().st_size for path in self.path.glob("*/*")), 2000)
+
+
+if __name__ == "__main__":
+    unittest.main()
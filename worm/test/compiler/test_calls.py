@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+
+import unittest
+from typing import List
+
+from worm.compiler.compiler import Compiler
+from worm.slim.interpreter import SLIM, assemble
+from worm.test.compiler.helpers import PassTest, execute_slim
+from worm.util.console import StaticConsole
+from worm.util.validation import Success
+
+FIBONACCI = """
+def fib(x):
+    if x <= 1:
+        return x
+    else:
+        return fib(x - 1) + fib(x - 2)
+print(int(fib(int(input()))))
+"""
+
+SCRIPTS = {
+    "fibonacci": FIBONACCI,
+    "untouched by callee": """
+def f(a):
+    return a * 2
+x = int(input())
+y = x + 1
+z = f(x)
+print(int(x + y + z))
+""",
+    "mutual recursion": """
+def even(n):
+    if n == 0:
+        return 1
+    return odd(n - 1)
+def odd(n):
+    if n == 0:
+        return 0
+    return even(n - 1)
+x = int(input())
+print(int(even(x)))
+print(int(x))
+""",
+    "nested calls": """
+def g(a):
+    b = a + 1
+    return b * b
+def f(a, b):
+    c = g(a) + g(b)
+    return c - a
+x = int(input())
+print(int(f(x, g(x)) + x))
+""",
+    "call in loop": """
+def sq(a):
+    return a * a
+i = 0
+total = 0
+n = int(input())
+while i < n:
+    total += sq(i)
+    i += 1
+print(int(total))
+print(int(i))
+""",
+}
+
+
+class PruneSavesTest(PassTest):
+
+    def test_equivalent(self):
+        for name, script in SCRIPTS.items():
+            for input in (["0"], ["5"]):
+                with self.subTest(script=name, input=input):
+                    self.assert_equivalent(script, input, [Compiler(), Compiler(allocate=False), Compiler(peephole=False)])
+
+    def test_fewer_steps(self):
+        self.assert_fewer_steps(FIBONACCI, ["12"], Compiler(), Compiler(prune_saves=False))
+
+    def test_no_saves_without_clobbers(self):
+        script = "def f():\n    return 3\nx = int(input())\nprint(int(f() + x))"
+        code = Compiler(allocate=False, peephole=False).compile(script)
+        self.assertNotIn("st local-0", code)
+
+
+class TailCallTest(unittest.TestCase):
+
+    def test_constant_stack(self):
+        script = """
+def count(n, acc):
+    if n == 0:
+        return acc
+    return count(n - 1, acc + 2)
+print(int(count(int(input()), 0)))
+"""
+        machine = execute_slim(Compiler().compile(script), ["5000"])
+        self.assertEqual(machine.console.output, ["10000"])
+        self.assertEqual(len(machine.mem), 1)
+        machine = execute_slim(Compiler(tail_calls=False).compile(script), ["5000"])
+        self.assertEqual(len(machine.mem), 5001)
+
+    def test_mutual_recursion_returns_to_caller(self):
+        script = SCRIPTS["mutual recursion"]
+        machine = execute_slim(Compiler().compile(script), ["1001"])
+        self.assertEqual(machine.console.output, ["0", "1001"])
+        self.assertLessEqual(len(machine.mem), 2)
+
+
+class CountingSLIM(SLIM):
+    """Counts the loads and stores executed."""
+
+    def __init__(self, commands, console):
+        super().__init__(commands, console)
+        self.memory_accesses = 0
+
+    def ld(self, dest, addr):
+        self.memory_accesses += 1
+        super().ld(dest, addr)
+
+    def st(self, src, addr):
+        self.memory_accesses += 1
+        super().st(src, addr)
+
+
+def count_memory_accesses(code: str, input: List[str]) -> CountingSLIM:
+    resolved = assemble(code)
+    assert isinstance(resolved, Success)
+    machine = CountingSLIM(resolved.value, StaticConsole(input))
+    machine.execute()
+    return machine
+
+
+class LeafCallTest(PassTest):
+    SCRIPT = """
+def sq(x):
+    return x * x
+def sum_sq(n):
+    if n == 0:
+        return 0
+    return sq(n) + sum_sq(n - 1)
+n = int(input())
+print(int(sq(n)))
+print(int(sum_sq(n)))
+"""
+
+    def test_equivalent(self):
+        self.assert_equivalent(self.SCRIPT, ["20"],
+                               [Compiler(inline_threshold=0), Compiler(inline_threshold=0, allocate=False, peephole=False)])
+
+    def test_fewer_memory_accesses(self):
+        leaf = count_memory_accesses(Compiler(inline_threshold=0).compile(self.SCRIPT), ["20"])
+        stack = count_memory_accesses(Compiler(inline_threshold=0, leaf_calls=False).compile(self.SCRIPT), ["20"])
+        self.assertEqual(leaf.console.output, stack.console.output)
+        self.assertLess(leaf.memory_accesses, stack.memory_accesses)
+
+    def test_leaf_uses_no_stack(self):
+        script = "def sq(x):\n    return x * x\nprint(int(sq(int(input()))))"
+        leaf = execute_slim(Compiler(inline_threshold=0).compile(script), ["7"])
+        stack = execute_slim(Compiler(inline_threshold=0, leaf_calls=False).compile(script), ["7"])
+        self.assertEqual(leaf.console.output, ["49"])
+        self.assertEqual(len(leaf.mem), 0)
+        self.assertEqual(len(stack.mem), 1)
+
+    def test_tail_call_to_leaf(self):
+        script = """
+def sq(x):
+    return x * x
+def f(x):
+    if x > 100:
+        return 0
+    return sq(x + 1)
+print(int(f(int(input())) + f(1000)))
+"""
+        machine = execute_slim(Compiler(inline_threshold=0).compile(script), ["4"])
+        self.assertEqual(machine.console.output, ["25"])
+
+
+if __name__ == "__main__":
+    unittest.main()
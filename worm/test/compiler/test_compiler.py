@@ -1,38 +1,23 @@
 #!/usr/bin/env python3
-from worm.slim.interpreter import Interpreter
+from worm.slim.decoder import decode
+from worm.slim.engine import DecodedSLIM
+from worm.slim.fusion import fuse
+from worm.slim.interpreter import assemble
 from worm.util.console import StaticConsole
+from worm.util.validation import Success
 from worm.compiler.compiler import Compiler
+from worm.test.compiler.helpers import execute_python, execute_worm
 import unittest
 from typing import List
 
 
-def execute_python(script: str, input: List[str]) -> List[str]:
-    input_lines = iter(input)
-    output_lines: List[str] = []
-    env = {
-        "print": output_lines.append,
-        "input": input_lines.__next__
-    }
-    exec(script, env)
-    return [str(i) for i in output_lines]
-
-
-def execute_worm(script: str, input: List[str]) -> List[str]:
-    console = StaticConsole(input)
-    compiler = Compiler()
-    interpreter = Interpreter(console)
-
-    slim_code = compiler.compile(script)
-    interpreter.interpret(slim_code)
-
-    return console.output
-
-
 class CompilerTest(unittest.TestCase):
+    engine = "decoded"
+    flat_memory = False
 
     def do_test_script(self, script: str, input: List[str]) -> None:
         python_result = execute_python(script, input)
-        worm_result = execute_worm(script, input)
+        worm_result = execute_worm(script, input, self.engine, self.flat_memory)
         self.assertEqual(python_result, worm_result)
 
     def test_print(self):
@@ -185,6 +170,34 @@ def choose(n, k):
     else:
         return choose(n - 1, k - 1) + choose(n - 1, k)
 print(int(choose(10, 4)))
+"""
+        self.do_test_script(script, [])
+
+    def test_tail_recursion(self):
+        script = """
+def fact(n, acc):
+    if n <= 1:
+        return acc
+    return fact(n - 1, acc * n)
+
+print(int(fact(10, 1)))
+"""
+        self.do_test_script(script, [])
+
+    def test_mutual_tail_recursion(self):
+        script = """
+def even(n):
+    if n == 0:
+        return 1
+    return odd(n - 1)
+
+def odd(n):
+    if n == 0:
+        return 0
+    return even(n - 1)
+
+print(int(even(7)))
+print(int(odd(7)))
 """
         self.do_test_script(script, [])
 
@@ -253,5 +266,40 @@ while (x := x + 1) < 10:
         self.do_test_script(script, [])
 
 
+class FlatMemoryCompilerTest(CompilerTest):
+    flat_memory = True
+
+
+class FusedCompilerTest(CompilerTest):
+    engine = "fused"
+
+    def test_fewer_dispatches(self):
+        script = """
+def fact(x):
+    if x == 1:
+        return 1
+    else:
+        return x * fact(x - 1)
+
+print(int(fact(10)))
+"""
+        resolved = assemble(Compiler().compile(script))
+        assert isinstance(resolved, Success)
+        program = decode(resolved.value)
+        unfused = DecodedSLIM(program, StaticConsole([]))
+        unfused.execute()
+        fused = DecodedSLIM(fuse(program), StaticConsole([]))
+        fused.execute()
+        self.assertLess(fused.steps, unfused.steps * 0.7)
+
+
+class TranslatedCompilerTest(CompilerTest):
+    engine = "translated"
+
+
+class TracingCompilerTest(CompilerTest):
+    engine = "tracing"
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+
+import unittest
+
+from worm.compiler.compiler import Compiler
+from worm.test.compiler.helpers import PassTest
+
+CONDITIONS = [
+    "x < y",
+    "not x < y",
+    "x",
+    "not x",
+    "x == y and y != 0",
+    "x == y or y == 0",
+    "not (x > y and y >= 1)",
+    "not (x <= y or x == 2)",
+    "x and y",
+    "x or y",
+    "not (x and not y)",
+    "x > 0 and y > 0 and x != y",
+    "x > 1 or y > 1 or x == y",
+    "(x or y) and not (x and y)",
+    "(x > 1 and y < 1) or (x < 1 and y > 1)",
+    "not not x",
+    "(z := x - y) and z > 0",
+]
+
+LOOP = """
+n = int(input())
+i = 0
+c = 0
+while i < n and not (i > 900 and i % 7 == 3):
+    i += 1
+    if i % 3 == 0 or i % 5 == 0 and not i % 2 == 0:
+        c += 1
+print(int(i))
+print(int(c))
+"""
+
+
+class BranchConditionsTest(PassTest):
+
+    def test_equivalent(self):
+        for condition in CONDITIONS:
+            script = f"""
+x = int(input())
+y = int(input())
+if {condition}:
+    print(int(1))
+else:
+    print(int(0))
+i = 0
+while i < 4 and ({condition}):
+    i += 1
+    x -= 1
+    y -= 1
+print(int(i))
+"""
+            for x in range(-1, 3):
+                for y in range(-1, 3):
+                    with self.subTest(condition=condition, x=x, y=y):
+                        self.assert_equivalent(script, [str(x), str(y)], [Compiler()])
+
+    def test_no_boolean_values(self):
+        code = Compiler(peephole=False).compile("x = int(input())\nif not (x > 1 and x < 5):\n    print(int(x))")
+        self.assertNotIn("seq result, zero", code)
+        self.assertNotIn("boolop", code)
+
+    def test_fewer_steps(self):
+        self.assert_fewer_steps(LOOP, ["1000"], Compiler(), Compiler(branch_conditions=False), 0.9)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+
+import ast
+import unittest
+
+from worm.compiler.compiler import Compiler, used_functions, terminates
+from worm.test.compiler.helpers import PassTest
+
+SCRIPTS = {
+    "unused functions": """
+def unused(x):
+    return unused(x - 1)
+def helper(x):
+    return x + 1
+def used(x):
+    if x > 0:
+        return helper(used(x - 1))
+    return 0
+print(int(used(int(input()))))
+""",
+    "after return": """
+def f(x):
+    if x > 0:
+        return 1
+    else:
+        return 2
+    print(int(3))
+print(int(f(int(input()))))
+""",
+    "after break": """
+x = 0
+while True:
+    x += 1
+    if x > int(input()):
+        break
+        print(int(99))
+    continue
+    print(int(98))
+print(int(x))
+""",
+    "infinite loop": """
+def f(n):
+    while True:
+        if n > 10:
+            return n
+        n += 5
+    print(int(0))
+print(int(f(int(input()))))
+""",
+}
+
+
+class DeadCodeTest(PassTest):
+
+    def test_equivalent(self):
+        for name, script in SCRIPTS.items():
+            for input in (["0"], ["4"]):
+                with self.subTest(script=name, input=input):
+                    # the loop after a break reads its input each iteration
+                    self.assert_equivalent(script, input * 10, [Compiler(inline_threshold=0)])
+
+    def test_unused_functions_dropped(self):
+        code = Compiler(inline_threshold=0).compile(SCRIPTS["unused functions"])
+        self.assertNotIn("def-unused", code)
+        self.assertIn("def-helper", code)
+        self.assertNotIn("end-used", code)
+        self.assertIn("def-unused", Compiler(inline_threshold=0, dead_code=False).compile(SCRIPTS["unused functions"]))
+
+    def test_used_functions(self):
+        module = ast.parse(SCRIPTS["unused functions"])
+        self.assertEqual(used_functions(module, {}), {"used", "helper"})
+        self.assertEqual(used_functions(module, {"helper": None}), {"used"})
+
+    def test_unreachable_statements_dropped(self):
+        for name in ("after return", "after break", "infinite loop"):
+            with self.subTest(script=name):
+                code = Compiler(inline_threshold=0, peephole=False).compile(SCRIPTS[name])
+                self.assertNotIn("li result, 3", code)
+                self.assertNotIn("li result, 9", code)
+                self.assertNotIn("li result, 0\nwrite", code)
+
+    def test_terminates(self):
+        statements = ast.parse("""
+if x:
+    return 1
+else:
+    break
+if x:
+    return 1
+while True:
+    pass
+while True:
+    if x:
+        break
+while True:
+    while True:
+        break
+""").body
+        self.assertEqual([terminates(statement) for statement in statements], [True, False, True, False, True])
+
+
+if __name__ == "__main__":
+    unittest.main()
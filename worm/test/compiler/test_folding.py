@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+
+import ast
+import unittest
+
+from worm.compiler.compiler import Compiler
+from worm.compiler.folding import fold
+from worm.slim.interpreter import Interpreter
+from worm.util.console import StaticConsole
+
+# scripts whose folded output must match the unfolded output, including where SLIM differs from Python
+SCRIPTS = {
+    "arithmetic": "print(int(2 * 3 + 1))",
+    "remainder sign": "print(int(-7 % 2))\nprint(int(7 % -2))\nprint(int(-7 // 2))",
+    "overflow": "print(int(2147483647 + 1))\nprint(int(65536 * 65536))\nprint(int(-(-2147483647 - 1)))",
+    "large literal": "x = 4294967297\nprint(int(x))\nprint(int(4294967297 == 1))",
+    "boolop": "print(int(0 and 5))\nprint(int(3 and 5))\nprint(int(0 or 5))\nprint(int(not 0))",
+    "propagation": """
+x = 5
+y = x * 2
+x += y
+print(int(x))
+print(int(y))
+""",
+    "branches": """
+x = int(input())
+y = 1
+if x > 0:
+    y = 2
+else:
+    y = 2
+z = 1
+if x > 0:
+    z = 3
+print(int(y))
+print(int(z))
+""",
+    "constant if": """
+x = 1
+if x == 1:
+    print(int(10))
+else:
+    print(int(20))
+""",
+    "loop": """
+i = 0
+n = 3
+while i < n:
+    print(int(i))
+    i += 1
+print(int(i))
+""",
+    "while true": """
+x = 0
+while True:
+    x += 1
+    if x > 3:
+        break
+print(int(x))
+""",
+    "while false": """
+x = 1
+while x == 2:
+    x = 0
+print(int(x))
+""",
+    "walrus": """
+x = 1
+y = int(input()) and (x := 2)
+print(int(x))
+z = 1 and (x := 3)
+print(int(x))
+""",
+    "function": """
+x = 7
+def f(x):
+    y = 3
+    return x + y
+print(int(f(1)))
+print(int(x))
+""",
+}
+
+
+def run(code: str, input=()) -> list:
+    console = StaticConsole(list(input))
+    Interpreter(console).interpret(code)
+    return console.output
+
+
+class ConstantFolderTest(unittest.TestCase):
+
+    def test_equivalent(self):
+        for name, script in SCRIPTS.items():
+            for input in (["0"], ["4"]):
+                with self.subTest(script=name, input=input):
+                    unfolded = run(Compiler(fold=False).compile(script), input)
+                    folded = run(Compiler().compile(script), input)
+                    self.assertEqual(unfolded, folded)
+
+    def test_fold_expression(self):
+        tree = fold(ast.parse("print(int(12 + 34 - 56 * 78 // 90))"))
+        self.assertEqual(tree.body[0].value.args[0].args[0].value, -2)
+
+    def test_division_by_zero_not_folded(self):
+        tree = fold(ast.parse("print(int(1 // 0))"))
+        self.assertIsInstance(tree.body[0].value.args[0].args[0], ast.BinOp)
+
+    def test_skip_constant_branch(self):
+        tree = fold(ast.parse("if 1 < 2:\n    print(int(1))\nelse:\n    print(int(2))"))
+        self.assertEqual(ast.dump(tree), ast.dump(ast.parse("print(int(1))")))
+
+    def test_no_propagation_out_of_loop(self):
+        tree = fold(ast.parse("x = 1\nwhile int(input()):\n    x = 2\nprint(int(x))"))
+        self.assertIsInstance(tree.body[-1].value.args[0].args[0], ast.Name)
+
+    def test_while_true_has_no_test(self):
+        compiled = Compiler(peephole=False).compile("while True:\n    break")
+        self.assertNotIn("jeqz", compiled)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+
+import ast
+import unittest
+
+from worm.compiler.compiler import Compiler, inlinable_functions
+from worm.test.compiler.helpers import PassTest
+
+SQUARES = """
+def sq(x):
+    return x * x
+n = int(input())
+i = 0
+total = 0
+while i < n:
+    total += sq(i)
+    i += 1
+print(int(total))
+"""
+
+SCRIPTS = {
+    "squares": SQUARES,
+    "early return": """
+def sign(x):
+    if x < 0:
+        return 0 - 1
+    if x == 0:
+        return 0
+    return 1
+x = int(input())
+print(int(sign(x) + sign(0 - x) * 10 + sign(0)))
+""",
+    "shadowing": """
+def f(x, y):
+    z = x - y
+    x = z * 2
+    return x
+x = int(input())
+y = 3
+z = 4
+print(int(f(y, x)))
+print(int(x))
+print(int(y))
+print(int(z))
+""",
+    "nested": """
+def sq(x):
+    return x * x
+def sum_sq(a, b):
+    return sq(a) + sq(b)
+def outer(n):
+    return sum_sq(n, n + 1) - sq(n)
+print(int(outer(int(input()))))
+""",
+    "calling recursive": """
+def fact(n):
+    if n <= 1:
+        return 1
+    return n * fact(n - 1)
+def twice(n):
+    a = fact(n)
+    return a + a
+x = int(input())
+print(int(twice(x) + x))
+""",
+    "loop in body": """
+def tri(n):
+    t = 0
+    while n > 0:
+        t += n
+        n -= 1
+    return t
+x = int(input())
+print(int(tri(x) + tri(x + 1)))
+print(int(x))
+""",
+}
+
+
+class InliningTest(PassTest):
+
+    def test_equivalent(self):
+        for name, script in SCRIPTS.items():
+            for input in (["0"], ["5"], ["-3"]):
+                with self.subTest(script=name, input=input):
+                    self.assert_equivalent(script, input, [Compiler(), Compiler(allocate=False, peephole=False)])
+
+    def test_fewer_steps(self):
+        inlined, _ = self.assert_fewer_steps(SQUARES, ["20"], Compiler(), Compiler(inline_threshold=0))
+        self.assertEqual(len(inlined.mem), 0)
+
+    def test_recursive_not_inlined(self):
+        module = ast.parse("""
+def fact(n):
+    return n * fact(n - 1)
+def even(n):
+    return odd(n - 1)
+def odd(n):
+    return even(n - 1)
+def sq(x):
+    return x * x
+""")
+        self.assertEqual(set(inlinable_functions(module, 1000)), {"sq"})
+
+    def test_threshold(self):
+        module = ast.parse(SCRIPTS["loop in body"])
+        self.assertEqual(set(inlinable_functions(module, 1000)), {"tri"})
+        self.assertEqual(set(inlinable_functions(module, 10)), set())
+
+
+if __name__ == "__main__":
+    unittest.main()
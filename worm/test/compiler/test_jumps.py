@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+
+import unittest
+from typing import List, Optional
+
+from worm.compiler.compiler import Compiler
+from worm.compiler.flow import Instruction, Label
+from worm.compiler.jumps import thread_jumps
+from worm.test.compiler.helpers import PassTest
+
+NESTED = """
+n = int(input())
+i = 0
+c = 0
+while i < n:
+    if i % 2 == 0:
+        if i % 3 == 0:
+            if i % 4 == 0:
+                c += 1
+            else:
+                c += 2
+        else:
+            c += 3
+    elif i % 5 == 0 or i % 7 == 0:
+        c += 4
+    i += 1
+print(int(c))
+"""
+
+
+def jump(target: str, condition: Optional[str] = None) -> List[Instruction]:
+    load = Instruction("li", ("jump-label", target))
+    if condition is None:
+        return [load, Instruction("j", ("jump-label",))]
+    return [load, Instruction("jeqz", (condition, "jump-label"))]
+
+
+class ThreadJumpsTest(PassTest):
+
+    def test_thread_chain(self):
+        lines = [*jump("a", "x"), Instruction("write", ("x",)), Instruction("halt", ()),
+                 Label("a"), *jump("b"), Label("b"), Label("c"), *jump("d"), Label("d"), Instruction("write", ("y",))]
+        self.assertEqual(thread_jumps(lines, "jump-label"),
+                         [*jump("d", "x"), Instruction("write", ("x",)), Instruction("halt", ()),
+                          Label("d"), Instruction("write", ("y",))])
+
+    def test_jump_to_next(self):
+        lines = [*jump("a", "x"), Label("a"), Instruction("write", ("x",)), *jump("b"), Label("b")]
+        self.assertEqual(thread_jumps(lines, "jump-label"), [Instruction("write", ("x",))])
+
+    def test_merge_labels(self):
+        lines = [Label("a"), Label("b"), Instruction("write", ("x",)), *jump("a", "x"), *jump("b")]
+        self.assertEqual(thread_jumps(lines, "jump-label"),
+                         [Label("a"), Instruction("write", ("x",)), *jump("a", "x"), *jump("a")])
+
+    def test_keeps_escaping_labels(self):
+        lines = [Instruction("li", ("link", "return")), *jump("f"), Label("return"), Instruction("halt", ()),
+                 Label("f"), Instruction("j", ("link",))]
+        self.assertEqual(thread_jumps(lines, "jump-label"), lines)
+
+    def test_infinite_loop(self):
+        lines = [Label("a"), *jump("a")]
+        self.assertEqual(thread_jumps(lines, "jump-label"), lines)
+
+    def test_fewer_jumps(self):
+        threaded = Compiler().compile(NESTED)
+        plain = Compiler(thread_jumps=False).compile(NESTED)
+        self.assertLess(threaded.count("\nj "), plain.count("\nj "))
+        self.assertLess(threaded.count(":\n"), plain.count(":\n"))
+        for n in range(0, 50, 7):
+            with self.subTest(n=n):
+                if n:
+                    self.assert_fewer_steps(NESTED, [str(n)], Compiler(), Compiler(thread_jumps=False))
+                else:
+                    # the loop never runs, so none of the threaded jumps are taken
+                    self.assert_equivalent(NESTED, [str(n)], [Compiler(), Compiler(thread_jumps=False)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+
+import ast
+import unittest
+from typing import List
+
+from worm.compiler.compiler import Compiler
+from worm.compiler.loops import loop_invariants
+from worm.test.compiler.helpers import PassTest
+
+SCRIPTS = [
+    """
+n = int(input())
+m = int(input())
+i = 0
+t = 0
+while i < n * m:
+    i += 1
+    if i == m + 1:
+        continue
+    t += n * m - i
+    if t > 100:
+        break
+print(int(i))
+print(int(t))
+""",
+    """
+n = int(input())
+m = int(input())
+c = 0
+i = 0
+while i < n:
+    j = 0
+    while j < m + i:
+        if (n - m) * 2 > j and not i == m:
+            c += j - i
+        j += 1
+    i += 1
+print(int(c))
+""",
+    """
+def count(a, b):
+    c = 0
+    while a > b:
+        a -= 1
+        c += b + 1
+    return c
+n = int(input())
+m = int(input())
+print(int(count(n, m)))
+while True:
+    n -= 1
+    if n < m:
+        break
+print(int(n))
+""",
+    """
+n = int(input())
+m = int(input())
+i = 0
+while (k := i + 1) < n and m - 1 < i + n:
+    i = k
+    m = m + (n > 1)
+print(int(i))
+print(int(m))
+""",
+]
+
+HOT_LOOP = """
+n = int(input())
+m = int(input())
+i = 0
+t = 0
+while i < n:
+    t += (n * m + 3) * (m - 1)
+    i += 1
+print(int(t))
+"""
+
+
+def invariants(script: str) -> List[str]:
+    """Gets the dumps of the invariant expressions in the first loop of the script."""
+    loop = next(node for node in ast.walk(ast.parse(script)) if isinstance(node, ast.While))
+    return list(loop_invariants(loop))
+
+
+def dumps(*expressions: str) -> List[str]:
+    return [ast.dump(ast.parse(expression, mode="eval").body) for expression in expressions]
+
+
+class LoopTest(PassTest):
+
+    def test_equivalent(self):
+        options = [{}, {"rotate_loops": False}, {"hoist_invariants": False}, {"branch_conditions": False},
+                   {"peephole": False, "allocate": False}]
+        for i, script in enumerate(SCRIPTS):
+            for n in range(-1, 5):
+                for m in range(-1, 4):
+                    for kwargs in options:
+                        with self.subTest(script=i, n=n, m=m, options=kwargs):
+                            self.assert_equivalent(script, [str(n), str(m)], [Compiler(**kwargs)])
+
+    def test_invariants(self):
+        self.assertEqual(invariants("while i < n:\n    t += n * m + 1\n    i += 1"), dumps("n * m + 1"))
+        self.assertEqual(invariants("while i < n - 1:\n    i += n - 1"), dumps("n - 1"))
+        self.assertEqual(invariants("while i < n:\n    i += 1\n    n += 1"), [])
+        self.assertEqual(invariants("while i < n:\n    i += n // m"), [])
+        self.assertEqual(invariants("while i < n:\n    i += f(n + 1)"), dumps("n + 1"))
+        self.assertEqual(invariants("while i < 10:\n    i += 2 * 3"), [])
+
+    def test_rotated(self):
+        code = Compiler(peephole=False, hoist_invariants=False).compile("i = int(input())\nwhile i < 10:\n    i += 1")
+        # the test appears once as the guard and once at the bottom, and the loop has no unconditional back-edge
+        self.assertEqual(code.count("li result, 10"), 2)
+        self.assertNotIn("j ", code)
+
+    def test_fewer_steps(self):
+        self.assert_fewer_steps(HOT_LOOP, ["1000", "7"], Compiler(), Compiler(rotate_loops=False, hoist_invariants=False),
+                                0.7)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+
+import unittest
+
+from worm.compiler import peephole
+from worm.compiler.compiler import Compiler
+from worm.compiler.flow import Instruction, Label
+from worm.slim.interpreter import Interpreter
+from worm.util.console import StaticConsole
+
+FACTORIAL = """
+def fact(x):
+    if x == 1:
+        return 1
+    else:
+        return x * fact(x - 1)
+
+print(int(fact(int(input()))))
+"""
+
+COUNT = """
+i = 10
+while i > 0:
+    print(int(i))
+    i -= 1
+"""
+
+
+def count_instructions(code: str) -> int:
+    return sum(1 for line in code.splitlines() if line and not line.endswith(":") and not line.startswith(";;"))
+
+
+def run(code: str, input=()) -> list:
+    console = StaticConsole(list(input))
+    Interpreter(console).interpret(code)
+    return console.output
+
+
+class PeepholeTest(unittest.TestCase):
+
+    def test_fewer_instructions(self):
+        for script in (FACTORIAL, COUNT):
+            with self.subTest(script=script):
+                unoptimized = Compiler(peephole=False).compile(script)
+                optimized = Compiler().compile(script)
+                self.assertLess(count_instructions(optimized), count_instructions(unoptimized))
+                self.assertEqual(run(optimized, ["7"]), run(unoptimized, ["7"]))
+
+    def test_copy_chain(self):
+        lines = [
+            Instruction("li", ("result", 5)),
+            Instruction("add", ("local-0", "zero", "result")),
+            Instruction("add", ("result", "zero", "local-0")),
+            Instruction("write", ("result",)),
+        ]
+        optimized = peephole.optimize(lines, {"result", "local-0", "zero"}, "zero")
+        self.assertEqual(optimized, [Instruction("li", ("result", 5)), Instruction("write", ("result",))])
+
+    def test_redundant_jump_label(self):
+        lines = [
+            Instruction("read", ("result",)),
+            Instruction("li", ("jump-label", "end")),
+            Instruction("jeqz", ("result", "jump-label")),
+            Instruction("li", ("jump-label", "end")),
+            Instruction("j", ("jump-label",)),
+            Label("end"),
+        ]
+        optimized = peephole.optimize(lines, {"result", "jump-label", "zero"}, "zero")
+        self.assertEqual(peephole.count_instructions(optimized), 4)
+
+    def test_reload_after_label_kept(self):
+        lines = [
+            Instruction("li", ("jump-label", "end")),
+            Instruction("read", ("result",)),
+            Instruction("jeqz", ("result", "jump-label")),
+            Label("middle"),
+            Instruction("li", ("jump-label", "end")),
+            Instruction("j", ("jump-label",)),
+            Label("end"),
+        ]
+        optimized = peephole.optimize(lines, {"result", "jump-label", "zero"}, "zero")
+        self.assertEqual(peephole.count_instructions(optimized), 5)
+
+    def test_unbounded_copy_not_propagated(self):
+        # the read value may exceed 32 bits, so result only equals it once wrapped by the copy
+        lines = [
+            Instruction("read", ("local-0",)),
+            Instruction("add", ("result", "zero", "local-0")),
+            Instruction("seq", ("result", "result", "local-0")),
+            Instruction("write", ("result",)),
+        ]
+        optimized = peephole.optimize(lines, {"result", "local-0", "zero"}, "zero")
+        self.assertEqual(optimized, lines)
+
+    def test_unused_load_kept(self):
+        # the address may never have been stored to, in which case the load fails
+        lines = [
+            Instruction("read", ("local-0",)),
+            Instruction("ld", ("result", "local-0")),
+            Instruction("write", ("local-0",)),
+        ]
+        optimized = peephole.optimize(lines, {"local-0", "zero"}, "zero")
+        self.assertEqual(optimized, lines)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,7 @@
+def make_code(size: int) -> str:
+    """Repeats the body of a small loop until the program has about the given number of instructions."""
+    lines = ["allocate-registers n, one, acc, target"]
+    for i in range(size // 5):
+        lines += [f"block-{i}:", "   read n", "   li one, 1", "   add acc, acc, n", f"   li target, block-{i}",
+                  "   sub n, n, one"]
+    return "\n".join(lines)
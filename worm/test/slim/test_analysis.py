@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+
+import pathlib
+import unittest
+
+from worm.compiler.compiler import Compiler
+from worm.slim import namer, parser
+from worm.slim.analysis import analyze
+from worm.slim.decoder import decode
+from worm.slim.fusion import fuse
+from worm.slim.interpreter import assemble, assemble_program
+from worm.util.validation import Success
+
+LOOP_WITH_CALLS = """
+def square(x):
+    return x * x + 1
+n = int(input())
+i = 0
+t = 0
+while i < n:
+    t += square(i) + square(n)
+    i += 1
+print(int(t))
+"""
+
+
+def get_test_file(name: str) -> str:
+    path = pathlib.Path(__file__).parent.joinpath("resources").joinpath(name)
+    return path.read_text()
+
+
+def assemble_labelled(code: str):
+    program_val = assemble_program(code)
+    assert isinstance(program_val, Success)
+    return program_val.value
+
+
+def make_loops(count: int) -> str:
+    """Writes a program of the given number of loops in a row, each calling the same function on every iteration."""
+    lines = ["allocate-registers n, one, acc, target, link, zero", "li one, 1", "li zero, 0"]
+    for i in range(count):
+        lines += ["read n", f"loop-{i}:", "li link, back-" + str(i), "li target, function", "j target",
+                  f"back-{i}:", "sub n, n, one", f"li target, loop-{i}", "sne acc, n, zero", "jeqz acc, target",
+                  "write n"]
+    lines += ["halt", "function:", "add acc, acc, n", "j link"]
+    return "\n".join(lines)
+
+
+class AnalysisTest(unittest.TestCase):
+
+    def test_blocks(self):
+        graph = analyze(assemble_labelled(get_test_file("count-to-ten.slim")))
+        self.assertEqual(graph.starts, [0, 4, 8])
+        self.assertEqual(graph.successors, [[1], [1, 2], []])
+        self.assertEqual(graph.dynamic_jumps, [])
+        self.assertEqual(graph.block_of(6), 1)
+
+    def test_registers(self):
+        program = assemble_labelled(get_test_file("count-to-ten.slim"))
+        graph = analyze(program)
+        count, one, ten, start, done = (program.registers[name] for name in
+                                        ("count", "one", "ten", "loop-start", "done"))
+        self.assertEqual(graph.defs[1], 1 << count | 1 << done)
+        self.assertEqual(graph.uses[1], 1 << count | 1 << one | 1 << ten | 1 << start)
+        self.assertEqual(graph.defs[0], 1 << count | 1 << one | 1 << ten | 1 << start)
+        self.assertEqual(graph.uses[0], 0)
+
+    def test_returns(self):
+        program = assemble_labelled(get_test_file("recursive-factorial.slim"))
+        graph = analyze(program)
+        # only the two jumps through the continuation are dynamic
+        self.assertEqual([program.code[address] for address in graph.dynamic_jumps],
+                         [(17, program.registers["cont"], 0, 0)] * 2)
+        after_call = graph.block_of(program.labels["after-recursive-invocation"])
+        self.assertEqual(list(graph.calls.values()), [[after_call]])
+        self.assertIn(after_call, graph.entries)
+        self.assertIn(graph.block_of(program.labels["after-top-level"]), graph.entries)
+
+    def test_dominators(self):
+        program = assemble_labelled(get_test_file("recursive-factorial.slim"))
+        graph = analyze(program)
+        entry = graph.block_of(program.labels["factorial-label"])
+        base = graph.block_of(program.labels["base-case-label"])
+        after_call = graph.block_of(program.labels["after-recursive-invocation"])
+        self.assertEqual(graph.dominators()[base], entry)
+        self.assertTrue(graph.dominates(entry, after_call))
+        self.assertFalse(graph.dominates(base, after_call))
+        self.assertFalse(graph.dominates(0, entry))
+
+    def test_loop_with_calls(self):
+        program = assemble_labelled(Compiler(inline_threshold=0).compile(LOOP_WITH_CALLS))
+        graph = analyze(program)
+        loops = graph.loops()
+        self.assertEqual(len(loops), 1)
+        header, blocks = loops[0]
+        self.assertEqual(graph.starts[header], program.labels["start-while-1"])
+        # the loop includes the blocks before and after the call, but not the function called
+        self.assertIn(graph.block_of(program.labels["return-1"]), blocks)
+        self.assertNotIn(graph.block_of(program.labels["def-square"]), blocks)
+        # the function is called from two places, so returns through a register loaded with either
+        self.assertEqual(len(graph.dynamic_jumps), 1)
+
+    def test_without_labels(self):
+        resolved = assemble(get_test_file("count-to-ten.slim"))
+        assert isinstance(resolved, Success)
+        graph = analyze(decode(resolved.value))
+        self.assertEqual(len(graph.loops()), 1)
+        self.assertEqual(graph.dynamic_jumps, [])
+
+    def test_named(self):
+        named = namer.do_name(parser.parse(get_test_file("count-to-ten.slim").splitlines()).value)
+        assert isinstance(named, Success)
+        graph = analyze(named.value)
+        self.assertEqual(graph.starts, [0, 4, 8])
+        self.assertIs(analyze(named.value), graph)
+
+    def test_cached(self):
+        program = assemble_labelled(get_test_file("iterative-factorial.slim"))
+        self.assertIs(analyze(program), analyze(program))
+
+    def test_fused(self):
+        with self.assertRaises(ValueError):
+            analyze(fuse(assemble_labelled(get_test_file("recursive-factorial.slim"))))
+
+    def test_large(self):
+        count = 2000
+        program = assemble_labelled(make_loops(count))
+        graph = analyze(program)
+        self.assertEqual(len(program), 9 * count + 5)
+        self.assertEqual(len(graph.loops()), count)
+        self.assertEqual(graph.dynamic_jumps, [len(program) - 1])
+        self.assertTrue(all(len(blocks) == 2 for _, blocks in graph.loops()))
+
+
+if __name__ == "__main__":
+    unittest.main()
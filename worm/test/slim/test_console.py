@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+
+import io
+import tempfile
+import unittest
+from unittest import mock
+
+from worm.slim.interpreter import ENGINES, Interpreter
+from worm.test.slim.test_interpreter import get_test_file
+from worm.util import console as console_module
+from worm.util.console import BufferedConsole, IntConsole, StaticConsole
+
+# reads a count, then writes each of that many values read back
+ECHO = get_test_file("echo.slim")
+
+
+class BufferedConsoleTest(unittest.TestCase):
+
+    def test_read(self):
+        console = BufferedConsole(b"1\n -2 \r\nthree\n\n4", io.StringIO())
+        self.assertEqual(console.read_int(), 1)
+        self.assertEqual(console.read_int(), -2)
+        self.assertEqual(console.read(), "three")
+        self.assertEqual(console.read(), "")
+        self.assertEqual(console.read_int(), 4)
+        with self.assertRaises(EOFError):
+            console.read()
+
+    def test_bad_integer(self):
+        console = BufferedConsole(b"x\n", io.StringIO())
+        with self.assertRaises(ValueError):
+            console.read_int()
+
+    def test_stdin(self):
+        stdin = io.TextIOWrapper(io.BytesIO(b"5\n6\n"))
+        with mock.patch("sys.stdin", stdin):
+            console = BufferedConsole(output=io.StringIO())
+            self.assertEqual([console.read_int(), console.read_int()], [5, 6])
+
+    def test_chunks(self):
+        output = io.StringIO()
+        console = BufferedConsole(b"", output)
+        with mock.patch.object(console_module, "FLUSH_EVERY", 3):
+            for value in range(5):
+                console.write_int(value)
+            self.assertEqual(output.getvalue(), "0\n1\n2\n")
+            console.write("x")
+            console.flush()
+        self.assertEqual(output.getvalue(), "0\n1\n2\n3\n4\nx\n")
+
+    def test_error_flushes(self):
+        output = io.StringIO()
+        console = BufferedConsole(b"", output)
+        console.write_int(1)
+        with mock.patch("sys.stderr", io.StringIO()) as stderr:
+            console.write_error("oops")
+        self.assertEqual(output.getvalue(), "1\n")
+        self.assertEqual(stderr.getvalue(), "oops\n")
+
+    def test_from_file(self):
+        for data in [b"7\n8\n", b""]:
+            with self.subTest(data), tempfile.NamedTemporaryFile() as file:
+                file.write(data)
+                file.flush()
+                console = BufferedConsole.from_file(file.name, io.StringIO())
+                self.assertEqual([int(line) for line in data.split()], [console.read_int() for _ in data.split()])
+                with self.assertRaises(EOFError):
+                    console.read_int()
+
+    def test_interpreter(self):
+        values = [str(i * 7919 - 50000) for i in range(20)]
+        for engine in ENGINES:
+            with self.subTest(engine):
+                output = io.StringIO()
+                data = "\n".join([str(len(values))] + values).encode()
+                Interpreter(BufferedConsole(data, output), engine).interpret(ECHO)
+                self.assertEqual(output.getvalue().split(), values)
+
+    def test_flushed_on_error(self):
+        output = io.StringIO()
+        with self.assertRaises(EOFError):
+            Interpreter(BufferedConsole(b"3\n1\n2\n", output)).interpret(ECHO)
+        self.assertEqual(output.getvalue(), "1\n2\n")
+
+
+class IntConsoleTest(unittest.TestCase):
+
+    def test_interpreter(self):
+        values = [i * 7919 - 50000 for i in range(20)] + [2 ** 40]
+        for engine in ENGINES:
+            with self.subTest(engine):
+                console = IntConsole([len(values)] + values)
+                Interpreter(console, engine).interpret(ECHO)
+                self.assertEqual(console.output, values)
+                static = StaticConsole([str(value) for value in [len(values)] + values])
+                Interpreter(static, engine).interpret(ECHO)
+                self.assertEqual(static.output, [str(value) for value in values])
+
+    def test_text(self):
+        console = IntConsole([3])
+        self.assertEqual(console.read(), "3")
+        console.write("4")
+        self.assertEqual(console.output, [4])
+
+
+if __name__ == "__main__":
+    unittest.main()
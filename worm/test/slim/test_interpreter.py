@@ -4,8 +4,11 @@ import pathlib
 import unittest
 from typing import List
 
-from worm.slim.interpreter import Interpreter
+from worm.slim.decoder import decode
+from worm.slim.interpreter import Interpreter, assemble
+from worm.slim.tracer import TracingSLIM
 from worm.util.console import StaticConsole
+from worm.util.validation import Success
 
 
 def get_test_file(name: str) -> str:
@@ -14,11 +17,13 @@ def get_test_file(name: str) -> str:
 
 
 class InterpreterTest(unittest.TestCase):
+    engine = "reference"
+    flat_memory = False
 
     def do_test(self, file_name: str, in_lines: List[str], out_lines: List[str], out_errors: List[str] = None) -> None:
         code = get_test_file(file_name)
         console = StaticConsole(in_lines)
-        interpreter = Interpreter(console)
+        interpreter = Interpreter(console, self.engine, self.flat_memory)
         interpreter.interpret(code)
         self.assertEqual(console.output, out_lines)
         self.assertEqual(console.error, out_errors or [])
@@ -61,6 +66,11 @@ class InterpreterTest(unittest.TestCase):
         expected = ["-2147483648"]
         self.do_test("overflow.slim", [], expected)
 
+    def test_nested_loops(self):
+        in_lines = ["20"]
+        expected = ["100"]
+        self.do_test("nested-loops.slim", in_lines, expected)
+
     def test_unknown_opcode(self):
         expected = [
             "Unknown opcode 'do' in line 3.",
@@ -105,3 +115,44 @@ class InterpreterTest(unittest.TestCase):
     def test_negative_divisor(self):
         expected = ["1"]
         self.do_test("negative-divisor.slim", [], expected)
+
+
+class DecodedInterpreterTest(InterpreterTest):
+    engine = "decoded"
+
+
+class FlatMemoryInterpreterTest(InterpreterTest):
+    engine = "decoded"
+    flat_memory = True
+
+
+class FusedInterpreterTest(InterpreterTest):
+    engine = "fused"
+
+
+class TranslatedInterpreterTest(InterpreterTest):
+    engine = "translated"
+
+
+class TracingInterpreterTest(InterpreterTest):
+    engine = "tracing"
+
+    def test_hot_loop(self):
+        resolved = assemble(get_test_file("iterative-factorial.slim"))
+        assert isinstance(resolved, Success)
+        console = StaticConsole(["12"])
+        machine = TracingSLIM(decode(resolved.value), console, threshold=3)
+        machine.execute()
+        self.assertEqual(console.output, ["479001600"])
+        self.assertEqual(machine.traces_compiled, 1)
+        self.assertEqual(machine.trace_exits, 1)
+
+    def test_traced_header(self):
+        # each outer iteration jumps back onto the inner loop's header once before running its trace
+        resolved = assemble(get_test_file("nested-loops.slim"))
+        assert isinstance(resolved, Success)
+        console = StaticConsole(["20"])
+        machine = TracingSLIM(decode(resolved.value), console, threshold=3)
+        machine.execute()
+        self.assertEqual(console.output, ["100"])
+        self.assertEqual(machine.traces_compiled, 1)
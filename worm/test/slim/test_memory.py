@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+
+import unittest
+
+from worm.slim.engine import DecodedSLIM
+from worm.slim.interpreter import assemble_program
+from worm.slim.memory import INITIAL_CAPACITY, FlatMemory
+from worm.test.slim.test_interpreter import get_test_file
+from worm.util.console import StaticConsole
+from worm.util.validation import Success
+
+
+class FlatMemoryTest(unittest.TestCase):
+
+    def test_read_write(self):
+        memory = FlatMemory()
+        memory[0] = 5
+        memory[3] = -7
+        self.assertEqual(memory[0], 5)
+        self.assertEqual(memory[3], -7)
+        self.assertEqual(dict(memory), {0: 5, 3: -7})
+
+    def test_unwritten(self):
+        memory = FlatMemory()
+        memory[1] = 1
+        for address in [0, 2, INITIAL_CAPACITY, 10 ** 9, -1]:
+            with self.subTest(address):
+                with self.assertRaises(KeyError):
+                    _ = memory[address]
+
+    def test_growth(self):
+        memory = FlatMemory()
+        self.assertEqual(memory.capacity, INITIAL_CAPACITY)
+        memory[INITIAL_CAPACITY] = 1
+        self.assertEqual(memory.capacity, 2 * INITIAL_CAPACITY)
+        memory[5 * INITIAL_CAPACITY] = 2
+        self.assertEqual(memory.capacity, 8 * INITIAL_CAPACITY)
+        self.assertEqual(memory.high_water, 5 * INITIAL_CAPACITY + 1)
+        self.assertEqual(memory[INITIAL_CAPACITY], 1)
+
+    def test_ceiling(self):
+        memory = FlatMemory(ceiling=100)
+        memory[99] = 1
+        memory[100] = 2
+        memory[10 ** 9] = 3
+        self.assertEqual(memory.capacity, 100)
+        self.assertEqual((memory[99], memory[100], memory[10 ** 9]), (1, 2, 3))
+        self.assertEqual(memory.high_water, 10 ** 9 + 1)
+
+    def test_other_addresses_and_values(self):
+        memory = FlatMemory()
+        memory[-4] = 1
+        memory[0] = 2 ** 40
+        memory[1] = -2 ** 31
+        memory[2] = 2 ** 31 - 1
+        self.assertEqual((memory[-4], memory[0], memory[1], memory[2]), (1, 2 ** 40, -2 ** 31, 2 ** 31 - 1))
+        self.assertEqual(memory.high_water, 3)
+        memory[0] = 6
+        memory[1] = 7
+        self.assertEqual(dict(memory), {-4: 1, 0: 6, 1: 7, 2: 2 ** 31 - 1})
+
+    def test_delete(self):
+        memory = FlatMemory()
+        memory[0] = 1
+        memory[1] = 2 ** 40
+        del memory[0]
+        del memory[1]
+        self.assertEqual(len(memory), 0)
+        with self.assertRaises(KeyError):
+            del memory[2]
+
+    def test_machine(self):
+        program = assemble_program(get_test_file("recursive-factorial.slim"))
+        assert isinstance(program, Success)
+        memory = FlatMemory()
+        console = StaticConsole(["500"])
+        DecodedSLIM(program.value, console, memory).execute()
+        expected = StaticConsole(["500"])
+        machine = DecodedSLIM(program.value, expected)
+        machine.execute()
+        self.assertEqual(console.output, expected.output)
+        self.assertEqual(dict(memory), machine.mem)
+        self.assertEqual(memory.high_water, 1000)
+
+
+if __name__ == "__main__":
+    unittest.main()
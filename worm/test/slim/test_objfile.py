@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+
+import pathlib
+import tempfile
+import unittest
+
+from worm.slim import objfile
+from worm.slim.decoder import Program
+from worm.slim.interpreter import Interpreter, assemble_program
+from worm.test.slim.test_interpreter import get_test_file
+from worm.util.console import StaticConsole
+from worm.util.validation import Success
+
+
+def load(file_name: str) -> Program:
+    program_val = assemble_program(get_test_file(file_name))
+    assert isinstance(program_val, Success)
+    return program_val.value
+
+
+class ObjectFileTest(unittest.TestCase):
+
+    def assert_same(self, program: Program, loaded: Program) -> None:
+        self.assertEqual(loaded.code, program.code)
+        self.assertEqual(loaded.registers, program.registers)
+        self.assertEqual(loaded.labels, program.labels)
+
+    def test_round_trip(self):
+        for file_name in ["count-to-ten.slim", "iterative-factorial.slim", "recursive-factorial.slim",
+                          "two-factorials.slim", "negative-dividend.slim"]:
+            with self.subTest(file_name):
+                program = load(file_name)
+                self.assert_same(program, objfile.loads(objfile.dumps(program)))
+
+    def test_names(self):
+        program = load("recursive-factorial.slim")
+        self.assertIn("sp", program.registers)
+        self.assertIn("factorial-label", program.labels)
+
+    def test_dump_and_load(self):
+        program = load("recursive-factorial.slim")
+        with tempfile.TemporaryDirectory() as directory:
+            path = pathlib.Path(directory).joinpath("factorial" + objfile.SUFFIX)
+            objfile.dump(program, path)
+            self.assertTrue(objfile.is_object_file(path))
+            loaded = objfile.load(path)
+        self.assert_same(program, loaded)
+
+        console = StaticConsole(["5"])
+        Interpreter(console).execute(loaded)
+        self.assertEqual(console.output, ["120"])
+
+    def test_text_is_not_object(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = pathlib.Path(directory).joinpath("count.slim")
+            path.write_text(get_test_file("count-to-ten.slim"))
+            self.assertFalse(objfile.is_object_file(path))
+            with self.assertRaises(objfile.ObjectFileError):
+                objfile.load(path)
+
+    def test_bad_magic(self):
+        data = objfile.dumps(load("count-to-ten.slim"))
+        with self.assertRaises(objfile.ObjectFileError):
+            objfile.loads(b"NOTSLIM\0" + data[len(objfile.MAGIC):])
+
+    def test_truncated(self):
+        data = objfile.dumps(load("recursive-factorial.slim"))
+        for size in [4, objfile.HEADER.size + 10, len(data) - 1]:
+            with self.subTest(size):
+                with self.assertRaises(objfile.ObjectFileError):
+                    objfile.loads(data[:size])
+
+    def test_large_operand(self):
+        with self.assertRaises(objfile.ObjectFileError):
+            objfile.dumps(Program([(1, 0, 2 ** 40, 0)]))
+
+
+if __name__ == "__main__":
+    unittest.main()
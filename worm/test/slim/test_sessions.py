@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+
+import asyncio
+import unittest
+
+from worm.slim.decoder import Program
+from worm.slim.engine import DecodedSLIM
+from worm.slim.interpreter import assemble_program
+from worm.slim.sessions import AsyncInterpreter, QuotaExceededError
+from worm.test.slim.test_interpreter import get_test_file
+from worm.util.console import QueueConsole, StaticConsole
+from worm.util.validation import Success
+
+# counts up forever, writing each number
+FOREVER = """
+allocate-registers count, one, loop
+li one, 1
+li loop, start
+start:
+write count
+add count, count, one
+j loop
+"""
+
+
+def load(code: str) -> Program:
+    program = assemble_program(code)
+    assert isinstance(program, Success)
+    return program.value
+
+
+class SessionsTest(unittest.IsolatedAsyncioTestCase):
+
+    async def test_sessions(self):
+        interpreter = AsyncInterpreter(load(get_test_file("echo.slim")), quantum=100)
+        consoles = [QueueConsole([str(i % 5)] + [str(i * j) for j in range(i % 5)]) for i in range(1000)]
+        machines = await asyncio.gather(*[interpreter.run(console) for console in consoles])
+        for i, console in enumerate(consoles):
+            self.assertEqual(console.output, [str(i * j) for j in range(i % 5)])
+        self.assertTrue(all(machine.program is interpreter.program for machine in machines))
+
+    async def test_waits_for_input(self):
+        interpreter = AsyncInterpreter(load(get_test_file("echo.slim")))
+        console = QueueConsole(["2"])
+        task = asyncio.create_task(interpreter.run(console))
+        await asyncio.sleep(0.01)
+        self.assertFalse(task.done())
+        console.feed("7")
+        await asyncio.sleep(0.01)
+        self.assertEqual(console.output, ["7"])
+        console.feed("8")
+        machine = await task
+        self.assertEqual(console.output, ["7", "8"])
+        expected = DecodedSLIM(interpreter.program, StaticConsole(["2", "7", "8"]))
+        expected.execute()
+        self.assertEqual(machine.steps, expected.steps)
+
+    async def test_closed_input(self):
+        console = QueueConsole(["3", "1"])
+        console.close()
+        with self.assertRaises(EOFError):
+            await AsyncInterpreter(load(get_test_file("echo.slim"))).run(console)
+        self.assertEqual(console.output, ["1"])
+
+    async def test_fair(self):
+        interpreter = AsyncInterpreter(load(FOREVER), quantum=30)
+        first, second = QueueConsole(), QueueConsole()
+        tasks = [asyncio.create_task(interpreter.run(console)) for console in (first, second)]
+        for _ in range(10):
+            await asyncio.sleep(0)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.assertGreater(len(first.output), 10)
+        self.assertLessEqual(abs(len(first.output) - len(second.output)), 10)
+
+    async def test_quota(self):
+        interpreter = AsyncInterpreter(load(FOREVER), quantum=50, quota=1000)
+        console = QueueConsole()
+        with self.assertRaises(QuotaExceededError) as context:
+            await interpreter.run(console)
+        self.assertGreaterEqual(context.exception.steps, 1000)
+        self.assertLess(context.exception.steps, 1003)
+        self.assertEqual(len(console.output), 333)
+
+    async def test_fused(self):
+        program = load(get_test_file("recursive-factorial.slim"))
+        interpreter = AsyncInterpreter(program, fused=True, quantum=10)
+        consoles = [QueueConsole([str(n)]) for n in range(8)]
+        await asyncio.gather(*[interpreter.run(console) for console in consoles])
+        self.assertEqual([console.output for console in consoles],
+                         [["1"], ["1"], ["2"], ["6"], ["24"], ["120"], ["720"], ["5040"]])
+
+
+if __name__ == "__main__":
+    unittest.main()
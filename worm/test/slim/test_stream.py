@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+
+import pathlib
+import unittest
+from typing import List
+
+from worm.compiler.compiler import Compiler
+from worm.slim import namer, parser, resolver
+from worm.slim.decoder import decode
+from worm.slim.namer import LabelInUseError, NoMoreRegistersError, RegisterInUseError
+from worm.slim.resolver import ExpectedLabelError, ExpectedRegisterError, TooManyArgumentsError, UnknownNameError
+from worm.slim.stream import assemble_lines
+from worm.util.validation import Failure, Success, flatmap
+
+RESOURCES = pathlib.Path(__file__).parent.joinpath("resources")
+
+WORM = """
+def fact(n):
+    if n < 2:
+        return 1
+    return n * fact(n - 1)
+i = 0
+while i < int(input()):
+    print(int(fact(i)))
+    i += 1
+"""
+
+
+def assemble_in_passes(lines: List[str]):
+    """Assembles the lines by parsing, naming and resolving them in turn."""
+    named_val = flatmap(parser.parse(lines), namer.do_name)
+    return flatmap(named_val, lambda named: flatmap(
+        resolver.resolve(named), lambda commands: Success(decode(commands, named.registers, named.labels))))
+
+
+class StreamTest(unittest.TestCase):
+
+    def assert_same(self, lines: List[str]) -> None:
+        expected = assemble_in_passes(lines)
+        actual = assemble_lines(iter(lines))
+        self.assertIs(type(actual), type(expected))
+        if isinstance(expected, Success):
+            assert isinstance(actual, Success)
+            self.assertEqual(actual.value.code, expected.value.code)
+            self.assertEqual(actual.value.registers, expected.value.registers)
+            self.assertEqual(actual.value.labels, expected.value.labels)
+        else:
+            assert isinstance(expected, Failure) and isinstance(actual, Failure)
+            self.assertEqual([(type(error), vars(error)) for error in actual.value],
+                             [(type(error), vars(error)) for error in expected.value])
+
+    def test_resources(self):
+        for path in sorted(RESOURCES.glob("*.slim")):
+            with self.subTest(path.name):
+                self.assert_same(path.read_text().splitlines())
+
+    def test_compiled(self):
+        self.assert_same(Compiler().compile(WORM).splitlines())
+        self.assert_same(Compiler(allocate=False, peephole=False).compile(WORM).splitlines())
+
+    def test_file(self):
+        with RESOURCES.joinpath("recursive-factorial.slim").open() as file:
+            program = assemble_lines(file)
+        self.assertIsInstance(program, Success)
+        self.assertEqual(program.value.labels["after-top-level"], len(program.value) - 2)
+
+    def test_forward_references(self):
+        lines = ["li r, end", "j r", "end:", "allocate-registers r", "halt"]
+        self.assert_same(lines)
+        self.assertEqual(assemble_lines(lines).value.code, [(14, 0, 2, 0), (17, 0, 0, 0), (19, 0, 0, 0)])
+
+    def test_odd_names(self):
+        self.assert_same(["allocate-registers -x, -1, r", "li -x, 1", "li r, -1", "add r, -x, r", "write r", "halt"])
+
+    def test_naming_errors(self):
+        lines = ["allocate-registers a, b", "a:", "li b, 1", "x:", "halt", "allocate-registers x",
+                 "allocate-registers " + ", ".join(f"r{i}" for i in range(31)), "li c, 1"]
+        self.assert_same(lines)
+        self.assertEqual([type(error) for error in assemble_lines(lines).value],
+                         [LabelInUseError, RegisterInUseError, NoMoreRegistersError])
+
+    def test_resolution_errors(self):
+        lines = ["allocate-registers a", "start:", "li start, later", "j a, a", "jeqz a, start", "li a, nowhere",
+                 "later:", "li a, a", "halt"]
+        self.assert_same(lines)
+        result = assemble_lines(lines)
+        self.assertIsInstance(result, Failure)
+        self.assertEqual([type(error) for error in result.value],
+                         [ExpectedRegisterError, TooManyArgumentsError, ExpectedRegisterError, UnknownNameError,
+                          ExpectedLabelError])
+
+
+if __name__ == "__main__":
+    unittest.main()
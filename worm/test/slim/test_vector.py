@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+
+import unittest
+from typing import List, Optional, Tuple
+
+from worm.compiler.compiler import Compiler
+from worm.slim.decoder import Program, decode
+from worm.slim.engine import DecodedSLIM
+from worm.slim.interpreter import assemble
+from worm.test.slim.test_interpreter import get_test_file
+from worm.util.console import StaticConsole
+from worm.util.validation import Success
+
+try:
+    from worm.slim.vector import run_batch
+except ImportError:  # numpy is not installed
+    run_batch = None  # type: ignore
+
+
+def load(code: str) -> Program:
+    resolved = assemble(code)
+    assert isinstance(resolved, Success)
+    return decode(resolved.value)
+
+
+def execute_single(program: Program, in_lines: List[str]) -> Tuple[Optional[str], List[str]]:
+    """Runs the program alone, returning the name of the exception it stopped with, if any, and its output."""
+    console = StaticConsole(in_lines)
+    try:
+        DecodedSLIM(program, console).execute()
+    except Exception as e:
+        return type(e).__name__, console.output
+    return None, console.output
+
+
+@unittest.skipIf(run_batch is None, "numpy is not installed")
+class VectorTest(unittest.TestCase):
+
+    def do_test(self, program: Program, inputs: List[List[str]]) -> None:
+        machine = run_batch(program, inputs)
+        for lane, in_lines in enumerate(inputs):
+            exception = machine.exceptions[lane]
+            result = type(exception).__name__ if exception is not None else None, machine.consoles[lane].output
+            self.assertEqual(result, execute_single(program, in_lines))
+
+    def test_iterative_factorial(self):
+        inputs = [[str(i)] for i in range(20)]
+        self.do_test(load(get_test_file("iterative-factorial.slim")), inputs)
+
+    def test_recursive_factorial(self):
+        inputs = [[str(i)] for i in range(20)]
+        self.do_test(load(get_test_file("recursive-factorial.slim")), inputs)
+
+    def test_write_larger(self):
+        inputs = [["1", "2"], ["2", "1"], ["-5", "5"], ["3", "3"]]
+        self.do_test(load(get_test_file("write-larger.slim")), inputs)
+
+    def test_overflow(self):
+        self.do_test(load(get_test_file("overflow.slim")), [[], []])
+
+    def test_bad_input(self):
+        inputs = [["5", "6"], [], ["5"], ["five", "6"], [str(2 ** 40), "6"]]
+        self.do_test(load(get_test_file("write-larger.slim")), inputs)
+
+    def test_mixed_sign_rem(self):
+        code = """
+   read 0
+   read 1
+   rem 2, 0, 1
+   write 2
+   halt
+"""
+        inputs = [["-7", "3"], ["1", "-7"], ["7", "-3"], ["-7", "-3"], ["7", "3"], ["0", "-3"], ["6", "-3"]]
+        machine = run_batch(load(code), inputs)
+        self.assertEqual([console.output for console in machine.consoles],
+                         [["-2"], ["6"], ["2"], ["-1"], ["1"], ["0"], ["0"]])
+        self.do_test(load(code), inputs)
+
+    def test_divergent_branches(self):
+        script = """
+def collatz(n):
+    steps = 0
+    while n != 1:
+        if n % 2 == 0:
+            n = n // 2
+        else:
+            n = 3 * n + 1
+        steps += 1
+    return steps
+
+print(int(collatz(int(input()))))
+print(int(10 // (int(input()) - 1)))
+"""
+        inputs = [[str(i), str(i % 3)] for i in range(1, 40)]
+        self.do_test(load(Compiler().compile(script)), inputs)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,11 @@
+import asyncio
+import mmap
 import sys
 from abc import ABC, abstractmethod
-from typing import List
+from typing import Iterable, List, Optional, TextIO, Union
+
+# the number of values a BufferedConsole holds before writing them out
+FLUSH_EVERY = 8192
 
 
 class Console(ABC):
@@ -17,6 +22,42 @@ class Console(ABC):
     def write_error(self, message: str) -> None:
         pass
 
+    def read_int(self) -> int:
+        """Reads a line holding an integer, as the SLIM machines do."""
+        return int(self.read())
+
+    def write_int(self, value: int) -> None:
+        self.write(str(value))
+
+    def flush(self) -> None:
+        """Writes out any output held back, which the interpreter does once a program stops."""
+        pass
+
+
+class AsyncConsole(ABC):
+    """A console whose reads may wait without blocking the thread, such as on a user at a remote terminal."""
+
+    @abstractmethod
+    async def read(self) -> str:
+        pass
+
+    @abstractmethod
+    def write(self, message: str) -> None:
+        pass
+
+    @abstractmethod
+    def write_error(self, message: str) -> None:
+        pass
+
+    async def read_int(self) -> int:
+        return int(await self.read())
+
+    def write_int(self, value: int) -> None:
+        self.write(str(value))
+
+    def flush(self) -> None:
+        pass
+
 
 class StdIoConsole(Console):
 
@@ -33,6 +74,72 @@ class StdIoConsole(Console):
         print(message, file=sys.stderr)
 
 
+class BufferedConsole(Console):
+    """
+    A console for programs reading and writing many values, without prompts.
+
+    The input is read all at once when first needed, from stdin unless given, and each line is only decoded or parsed
+    as it is read. The output is held and written in chunks of FLUSH_EVERY values, when an error is written, and when
+    flushed. As with input(), reading past the end of the input raises an EOFError.
+    """
+
+    def __init__(self, data: Union[bytes, mmap.mmap, None] = None, output: Optional[TextIO] = None):
+        self.data = data
+        self.position = 0
+        self.output = sys.stdout if output is None else output
+        self.buffer: List[str] = []
+
+    @staticmethod
+    def from_file(path: str, output: Optional[TextIO] = None) -> "BufferedConsole":
+        """Creates a console reading its input from a file mapped into memory."""
+        with open(path, "rb") as file:
+            if file.seek(0, 2) == 0:
+                # empty files cannot be mapped
+                return BufferedConsole(b"", output)
+            return BufferedConsole(mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ), output)
+
+    def next_line(self) -> bytes:
+        """Gets the next line of the input without its newline, as bytes whether the input is bytes or mapped."""
+        if self.data is None:
+            self.data = sys.stdin.buffer.read()
+        start = self.position
+        if start >= len(self.data):
+            raise EOFError
+        end = self.data.find(b"\n", start)
+        if end < 0:
+            end = len(self.data)
+        self.position = end + 1
+        return self.data[start:end]
+
+    def read(self) -> str:
+        return self.next_line().decode().rstrip("\r")
+
+    def read_int(self) -> int:
+        # int() parses bytes directly, ignoring the surrounding whitespace
+        return int(self.next_line())
+
+    def write(self, message: str) -> None:
+        self.buffer.append(message)
+        if len(self.buffer) >= FLUSH_EVERY:
+            self.flush()
+
+    def write_int(self, value: int) -> None:
+        self.buffer.append(str(value))
+        if len(self.buffer) >= FLUSH_EVERY:
+            self.flush()
+
+    def write_error(self, message: str) -> None:
+        self.flush()
+        print(message, file=sys.stderr)
+
+    def flush(self) -> None:
+        if self.buffer:
+            self.buffer.append("")
+            self.output.write("\n".join(self.buffer))
+            self.buffer = []
+        self.output.flush()
+
+
 class StaticConsole(Console):
 
     def __init__(self, lines: List[str]):
@@ -48,3 +155,73 @@ class StaticConsole(Console):
 
     def write_error(self, message: str) -> None:
         self.error.append(message)
+
+    def read_int(self) -> int:
+        return int(next(self.input))
+
+    def write_int(self, value: int) -> None:
+        self.output.append(str(value))
+
+
+class IntConsole(Console):
+    """
+    A console passing integers to and from a program running in the same process, without converting them to text.
+
+    `output` holds the integers written, and `error` the error messages.
+    """
+
+    def __init__(self, values: List[int]):
+        self.input = iter(values)
+        self.output: List[int] = []
+        self.error: List[str] = []
+
+    def read(self) -> str:
+        return str(next(self.input))
+
+    def write(self, message: str) -> None:
+        self.output.append(int(message))
+
+    def write_error(self, message: str) -> None:
+        self.error.append(message)
+
+    def read_int(self) -> int:
+        return next(self.input)
+
+    def write_int(self, value: int) -> None:
+        self.output.append(value)
+
+
+class QueueConsole(AsyncConsole):
+    """
+    An async console whose input lines are fed to it as they arrive, keeping its output.
+
+    Once the input is closed, reading past the lines fed raises an EOFError.
+    """
+
+    def __init__(self, lines: Iterable[str] = ()):
+        # None marks the end of the input
+        self.input: "asyncio.Queue[Optional[str]]" = asyncio.Queue()
+        for line in lines:
+            self.input.put_nowait(line)
+        self.output: List[str] = []
+        self.error: List[str] = []
+
+    def feed(self, line: str) -> None:
+        self.input.put_nowait(line)
+
+    def close(self) -> None:
+        self.input.put_nowait(None)
+
+    async def read(self) -> str:
+        line = await self.input.get()
+        if line is None:
+            # leave the input closed for any later reads
+            self.input.put_nowait(None)
+            raise EOFError
+        return line
+
+    def write(self, message: str) -> None:
+        self.output.append(message)
+
+    def write_error(self, message: str) -> None:
+        self.error.append(message)
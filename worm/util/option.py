@@ -4,16 +4,18 @@ T = TypeVar("T")
 
 
 class Option(Generic[T]):
-    pass
+    __slots__ = ()
 
 
 class Some(Generic[T], Option[T]):
+    __slots__ = ("value",)
+
     def __init__(self, value: T):
         self.value = value
 
 
 class Nothing(Generic[T], Option[T]):
-    pass
+    __slots__ = ()
 
 
 def flatten(xs: List[Option[T]]) -> List[T]:
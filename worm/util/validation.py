@@ -7,15 +7,19 @@ E = TypeVar("E")
 
 
 class Validation(Generic[T, E]):
-    pass
+    __slots__ = ()
 
 
 class Success(Generic[T, E], Validation[T, E]):
+    __slots__ = ("value",)
+
     def __init__(self, value: T):
         self.value = value
 
 
 class Failure(Generic[T, E], Validation[T, E]):
+    __slots__ = ("value",)
+
     def __init__(self, value: List[E]):
         self.value = value
 